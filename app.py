@@ -9,13 +9,29 @@ import streamlit as st
 import subprocess
 import sys
 import os
+import time
 import pandas as pd
 from mysql.connector import Error
-from utils import get_db_connection, get_business_list
+from utils import get_db_connection, pooled_connection, get_business_list, is_service_running, submit_job, get_job
 
 # Tablo adı
 TABLE_NAME = 'comments'
 
+# Scraper servisi işleri
+JOB_POLL_INTERVAL = 2
+JOB_LABELS = {'discover': 'Keşif', 'collect': 'Yorum Toplama', 'retry_failed': 'Tekrar Deneme'}
+JOB_STATUS_LABELS = {'queued': '⏳ Sırada', 'running': '🔄 Çalışıyor', 'done': '✅ Tamamlandı', 'failed': '❌ Başarısız'}
+COLLECT_MODES = {
+    'dom': 'Standart',
+    'stream': 'Streaming (düşük bellek)',
+    'incremental': 'Sadece yeni yorumlar',
+    'snapshot': 'HTML anlık görüntüsü (lxml)',
+    'network': 'Ağ yanıtlarından (servis --network gerekir)'
+}
+
+if 'batch_jobs' not in st.session_state:
+    st.session_state.batch_jobs = []
+
 # Ana uygulama
 st.set_page_config(page_title="Google Maps Yorum Yönetimi", layout="wide")
 st.title("Google Maps Yorum Toplama ve Etiketleme")
@@ -63,72 +79,61 @@ with tab2:
     with col3:
         ilce = st.text_input("İlçe", "merkez", key="batch_district")
     
-    batch_headless = st.checkbox("Headless Mod", value=False, key="batch_headless")
+    scraper_service_ok = is_service_running()
+    if not scraper_service_ok:
+        st.warning("⚠️ Scraper servisi çalışmıyor. Başlatmak için: `python scraper_service.py --headless`")
     
-    if st.button("🔍 İşletmeleri Keşfet", type="primary", key="batch_discover"):
+    if st.button("🔍 İşletmeleri Keşfet", type="primary", key="batch_discover", disabled=not scraper_service_ok):
         search_query = f"{isletme_turu} {sehir} {ilce}"
-        with st.spinner(f"'{search_query}' için işletmeler aranıyor..."):
-            try:
-                cmd = [sys.executable, "batch_scraper.py", "--discover", search_query]
-                if batch_headless:
-                    cmd.append("--headless")
-                
-                result = subprocess.run(cmd, capture_output=True, text=True,
-                                        cwd=os.path.dirname(os.path.abspath(__file__)),
-                                        encoding='utf-8', errors='replace')
-                
-                st.subheader("Keşif Sonucu:")
-                if result.stdout:
-                    st.text_area("Çıktı", result.stdout, height=300)
-                if result.stderr:
-                    st.error("Hata:")
-                    st.text_area("Hata Detayı", result.stderr, height=200)
-                
-                if result.returncode == 0:
-                    st.success("Keşif tamamlandı! İşletmeler veritabanına kaydedildi.")
-                else:
-                    st.error(f"Keşif başarısız. Çıkış kodu: {result.returncode}")
-                    
-            except Exception as e:
-                st.error(f"Hata: {e}")
+        try:
+            job = submit_job('discover', query=search_query)
+            st.session_state.batch_jobs.append(job['id'])
+            st.success(f"Keşif işi kuyruğa eklendi (#{job['id']}): '{search_query}'")
+        except Exception as e:
+            st.error(f"Hata: {e}")
     
     st.divider()
     
     st.subheader("2️⃣ Yorum Toplama")
     st.write("Kaydedilen işletmelerin yorumlarını sırayla toplar.")
     
-    limit = st.number_input("Maksimum İşletme Sayısı (0 = hepsi)", min_value=0, value=5, key="batch_limit")
+    col_limit, col_mode = st.columns(2)
+    with col_limit:
+        limit = st.number_input("Maksimum İşletme Sayısı (0 = hepsi)", min_value=0, value=5, key="batch_limit")
+    with col_mode:
+        collect_mode = st.selectbox("Toplama Modu", list(COLLECT_MODES), format_func=COLLECT_MODES.get, key="batch_mode")
+    
+    if st.button("📥 Yorumları Topla", type="primary", key="batch_collect", disabled=not scraper_service_ok):
+        try:
+            job = submit_job('collect', limit=int(limit), mode=collect_mode)
+            st.session_state.batch_jobs.append(job['id'])
+            st.success(f"Toplama işi kuyruğa eklendi (#{job['id']}).")
+        except Exception as e:
+            st.error(f"Hata: {e}")
     
-    if st.button("📥 Yorumları Topla", type="primary", key="batch_collect"):
-        with st.spinner("Bekleyen işletmelerin yorumları toplanıyor..."):
+    if st.session_state.batch_jobs:
+        st.divider()
+        st.subheader("⚙️ İşler")
+        any_running = False
+        for job_id in reversed(st.session_state.batch_jobs):
             try:
-                cmd = [sys.executable, "batch_scraper.py", "--collect"]
-                if limit > 0:
-                    cmd.extend(["--limit", str(limit)])
-                if batch_headless:
-                    cmd.append("--headless")
-                
-                result = subprocess.run(cmd, capture_output=True, text=True,
-                                        cwd=os.path.dirname(os.path.abspath(__file__)),
-                                        encoding='utf-8', errors='replace',
-                                        timeout=1800)  # 30 dakika timeout
-                
-                st.subheader("Toplama Sonucu:")
-                if result.stdout:
-                    st.text_area("Çıktı", result.stdout, height=400)
-                if result.stderr:
-                    st.error("Hata:")
-                    st.text_area("Hata Detayı", result.stderr, height=200)
-                
-                if result.returncode == 0:
-                    st.success("Yorum toplama tamamlandı!")
-                else:
-                    st.error(f"Toplama başarısız. Çıkış kodu: {result.returncode}")
-                    
-            except subprocess.TimeoutExpired:
-                st.warning("İşlem zaman aşımına uğradı (30 dakika). Kalan işletmeler için tekrar çalıştırın.")
+                job = get_job(job_id)
             except Exception as e:
-                st.error(f"Hata: {e}")
+                st.error(f"İş #{job_id} sorgulanamadı: {e}")
+                continue
+            
+            status = job['status']
+            any_running = any_running or status in ('queued', 'running')
+            label = f"#{job_id} {JOB_LABELS.get(job['type'], job['type'])} — {JOB_STATUS_LABELS.get(status, status)}"
+            with st.expander(label, expanded=status in ('queued', 'running')):
+                if job.get('result'):
+                    st.json(job['result'])
+                if job.get('error'):
+                    st.error(job['error'])
+                if job.get('log'):
+                    st.text_area("Çıktı", job['log'][-20000:], height=300, key=f"job_log_{job_id}")
+        
+        st.session_state.batch_jobs_running = any_running
     
     st.divider()
     
@@ -138,64 +143,53 @@ with tab2:
     with col_status1:
         if st.button("🔄 Durumu Güncelle", key="batch_status"):
             try:
-                conn = get_db_connection(silent=True)
-                if conn:
-                    cursor = conn.cursor(dictionary=True)
-                    
-                    # Tablo var mı kontrol et
-                    cursor.execute("SHOW TABLES LIKE 'pending_businesses'")
-                    if cursor.fetchone():
-                        cursor.execute("""
-                            SELECT status, COUNT(*) as cnt
-                            FROM pending_businesses
-                            GROUP BY status
-                        """)
-                        status_data = cursor.fetchall()
+                with pooled_connection(silent=True) as conn:
+                    if conn:
+                        cursor = conn.cursor(dictionary=True)
                         
-                        if status_data:
-                            col1, col2, col3, col4 = st.columns(4)
-                            for item in status_data:
-                                status = item['status']
-                                cnt = item['cnt']
-                                if status == 'pending':
-                                    col1.metric("⏳ Bekleyen", cnt)
-                                elif status == 'processing':
-                                    col2.metric("🔄 İşleniyor", cnt)
-                                elif status == 'completed':
-                                    col3.metric("✅ Tamamlanan", cnt)
-                                elif status == 'failed':
-                                    col4.metric("❌ Başarısız", cnt)
+                        # Tablo var mı kontrol et
+                        cursor.execute("SHOW TABLES LIKE 'pending_businesses'")
+                        if cursor.fetchone():
+                            cursor.execute("""
+                                SELECT status, COUNT(*) as cnt
+                                FROM pending_businesses
+                                GROUP BY status
+                            """)
+                            status_data = cursor.fetchall()
+                            
+                            if status_data:
+                                col1, col2, col3, col4 = st.columns(4)
+                                for item in status_data:
+                                    status = item['status']
+                                    cnt = item['cnt']
+                                    if status == 'pending':
+                                        col1.metric("⏳ Bekleyen", cnt)
+                                    elif status == 'processing':
+                                        col2.metric("🔄 İşleniyor", cnt)
+                                    elif status == 'completed':
+                                        col3.metric("✅ Tamamlanan", cnt)
+                                    elif status == 'failed':
+                                        col4.metric("❌ Başarısız", cnt)
+                            else:
+                                st.info("Henüz bekleyen işletme yok. Önce keşif yapın.")
                         else:
-                            st.info("Henüz bekleyen işletme yok. Önce keşif yapın.")
+                            st.info("Henüz toplu tarama yapılmamış.")
+                        
+                        cursor.close()
                     else:
-                        st.info("Henüz toplu tarama yapılmamış.")
-                    
-                    cursor.close()
-                    conn.close()
-                else:
-                    st.error("Veritabanı bağlantısı kurulamadı.")
+                        st.error("Veritabanı bağlantısı kurulamadı.")
             except Exception as e:
                 st.error(f"Durum kontrol hatası: {e}")
     
     with col_status2:
-        if st.button("🔁 Başarısızları Tekrar Dene", key="batch_retry"):
-            with st.spinner("Başarısız işletmeler tekrar deneme için hazırlanıyor..."):
-                try:
-                    cmd = [sys.executable, "batch_scraper.py", "--retry-failed"]
-                    result = subprocess.run(cmd, capture_output=True, text=True,
-                                            cwd=os.path.dirname(os.path.abspath(__file__)),
-                                            encoding='utf-8', errors='replace')
-                    
-                    if result.stdout:
-                        st.text_area("Sonuç", result.stdout, height=100)
-                    
-                    if result.returncode == 0:
-                        st.success("Başarısız işletmeler tekrar deneme için hazır!")
-                        st.info("Şimdi 'Yorumları Topla' butonuna tıklayarak tekrar deneyin.")
-                    else:
-                        st.error("İşlem başarısız!")
-                except Exception as e:
-                    st.error(f"Hata: {e}")
+        if st.button("🔁 Başarısızları Tekrar Dene", key="batch_retry", disabled=not scraper_service_ok):
+            try:
+                job = submit_job('retry_failed')
+                st.session_state.batch_jobs.append(job['id'])
+                st.success("Başarısız işletmeler tekrar deneme için hazırlanıyor.")
+                st.info("Ardından 'Yorumları Topla' butonuna tıklayarak tekrar deneyin.")
+            except Exception as e:
+                st.error(f"Hata: {e}")
 
 # Sekme 3: Ön İşleme
 with tab3:
@@ -355,4 +349,9 @@ with tab5:
         finally:
             conn.close()
     else:
-        st.error("Veritabanı bağlantısı kurulamadı.")
\ No newline at end of file
+        st.error("Veritabanı bağlantısı kurulamadı.")
+
+# Serviste çalışan toplu tarama işi varsa sayfayı periyodik olarak yenile
+if st.session_state.get('batch_jobs_running'):
+    time.sleep(JOB_POLL_INTERVAL)
+    st.rerun()
\ No newline at end of file
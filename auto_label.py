@@ -19,7 +19,7 @@ python auto_label.py
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import torch
 import time
-from utils import get_db_connection
+from utils import get_db_connection, bulk_update
 
 # Model bilgileri
 MODEL_NAME = "tabularisai/multilingual-sentiment-analysis"
@@ -108,30 +108,27 @@ def auto_label_comments():
 
         # Batch processing (bellek yönetimi için küçük gruplar halinde)
         batch_size = 32
-        labeled_count = 0
-
-        for i in range(0, len(texts), batch_size):
-            batch_texts = texts[i:i + batch_size]
-            batch_ids = comment_ids[i:i + batch_size]
-            
-            try:
-                results = predict_sentiment(batch_texts, tokenizer, model)
-            except Exception as e:
-                print(f"Batch etiketleme hatası (batch {i // batch_size + 1}): {e}")
-                continue
-
-            for comment_id, (sentiment, score) in zip(batch_ids, results):
-                cursor.execute(
-                    "UPDATE comments SET sentiment = %s, sentiment_score = %s WHERE id = %s", 
-                    (sentiment, score, comment_id)
-                )
-                labeled_count += 1
-
-            # İlerleme bildirimi
-            if (i + batch_size) % 100 == 0 or (i + batch_size) >= len(texts):
-                print(f"İlerleme: {min(i + batch_size, len(texts))}/{len(texts)} yorum işlendi")
-
-        conn.commit()
+
+        def labeled_rows():
+            for i in range(0, len(texts), batch_size):
+                batch_texts = texts[i:i + batch_size]
+                batch_ids = comment_ids[i:i + batch_size]
+                
+                try:
+                    results = predict_sentiment(batch_texts, tokenizer, model)
+                except Exception as e:
+                    print(f"Batch etiketleme hatası (batch {i // batch_size + 1}): {e}")
+                    continue
+
+                for comment_id, (sentiment, score) in zip(batch_ids, results):
+                    yield comment_id, sentiment, score
+
+                # İlerleme bildirimi
+                if (i + batch_size) % 100 == 0 or (i + batch_size) >= len(texts):
+                    print(f"İlerleme: {min(i + batch_size, len(texts))}/{len(texts)} yorum işlendi")
+
+        # Etiketler üretildikçe parça parça toplu yazılır
+        labeled_count = bulk_update(conn, 'comments', ('sentiment', 'sentiment_score'), labeled_rows())
         elapsed_time = time.time() - start_time
         print(f"Etiketleme tamamlandı: {labeled_count} yorum etiketlendi.")
         print(f"Toplam süre: {elapsed_time:.2f} saniye")
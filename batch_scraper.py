@@ -15,12 +15,49 @@ Kullanım:
     
     # Headless modda
     python batch_scraper.py --collect --headless
+    
+    # 4 paralel tarayıcı ile toplama
+    python batch_scraper.py --collect --workers 4 --headless
+    
+    # Lean tarayıcı - resim, font, harita karosu ve medya yüklenmez
+    python batch_scraper.py --collect --headless --lean
+    
+    # Streaming mod - yorumlar scroll sırasında kaydedilir, tarayıcı belleği sabit kalır
+    python batch_scraper.py --collect --stream
+    
+    # Network mod - yorumlar DOM yerine arka plan RPC yanıtlarından çözülür
+    python batch_scraper.py --collect --network
+    
+    # Karo keşfi - bölgeyi harita karelerine bölüp 4 tarayıcıda paralel ara
+    python batch_scraper.py --discover "eczane bartın merkez" --tiled --workers 4 --headless
+    python batch_scraper.py --discover "eczane bartın merkez" --tiled --bbox 41.60,32.30,41.66,32.37
+    
+    # Boru hattı - yorumlar arka planda kaydedilirken tarayıcı sonraki işletmeye geçer,
+    # yeniden başlatmalar için yedek tarayıcı hazır tutulur
+    python batch_scraper.py --collect --pipeline --snapshot --headless
+    
+    # Aşama süreleri raporu (scrape_runs tablosundan p50/p95)
+    python batch_scraper.py --report --days 7
+    
+    # Incremental mod - daha önce toplanan işletmelerin sadece yeni yorumları
+    python batch_scraper.py --collect --incremental
+    
+    # Yorum paneli HTML'lerini de sakla (sonra: python reparse_snapshots.py)
+    SNAPSHOT_STORE=true python batch_scraper.py --collect
 """
 import sys
 import os
 import io
+import re
+import math
 import time
+import queue
+import socket
 import argparse
+import threading
+import urllib.parse
+from contextlib import ExitStack, contextmanager, nullcontext
+from concurrent.futures import Future, ThreadPoolExecutor
 
 # Konsol encoding sorununu çöz
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
@@ -30,53 +67,241 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
+from selenium.common.exceptions import TimeoutException
 
-from utils import connect_to_mysql, get_or_create_business, chrome_driver_baslat
-from scraper import isletme_ara, yorumlari_yukle, devamini_oku_tikla, yorumlari_cek_ve_kaydet
+from utils import (
+    connect_to_mysql,
+    get_db_connection,
+    pooled_connection,
+    get_or_create_business,
+    chrome_driver_baslat,
+    report_network_stats,
+    driver_alive,
+    DriverSupervisor,
+    DriverSessionLost,
+    current_run_id,
+    start_metrics,
+    use_metrics,
+    save_scrape_run,
+    print_scrape_report,
+    SCROLL_PAUSE_TIME,
+    TILE_SIZE_KM,
+    TILE_ZOOM,
+    TILE_DEFAULT_RADIUS_KM,
+    LEASE_SECONDS,
+    HEARTBEAT_INTERVAL,
+    MAX_ATTEMPTS,
+    RETRY_BACKOFF_SECONDS,
+    DRIVER_CRASH_RETRIES,
+    PIPELINE_MAX_PENDING
+)
+from utils.migrate import run_migrations
+from scraper import (
+    isletme_ara,
+    isletme_sayfasina_git,
+    place_id_from_url,
+    yorumlari_topla,
+    yorumlari_yakala,
+    yakalanan_yorumlari_kaydet
+)
 
 
-def ensure_batch_tables(db_connection):
-    """Toplu tarama için gerekli tabloları oluşturur."""
-    cursor = db_connection.cursor()
+# Sonuç listesini kaydırır; yeni kart eklenene, liste sonu yazısı görünene
+# ya da süre dolana kadar bekler. [kart sayısı, liste sonu mu] döndürür.
+_FEED_SCROLL_JS = """
+const container = arguments[0];
+const previousCount = arguments[1];
+const timeoutMs = arguments[2];
+const done = arguments[arguments.length - 1];
+
+function count() { return container.querySelectorAll('div.Nv2PK').length; }
+function atEnd() {
+    if (container.querySelector('span.HlvSq')) return true;
+    const text = container.lastElementChild ? container.lastElementChild.innerText || '' : '';
+    return text.includes('sonuna ulaştınız') || text.includes('reached the end');
+}
+
+let finished = false;
+let timer = null;
+const observer = new MutationObserver(() => {
+    if (count() > previousCount || atEnd()) finish();
+});
+
+function finish() {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    done([count(), atEnd()]);
+}
+
+observer.observe(container, {childList: true, subtree: true});
+timer = setTimeout(finish, timeoutMs);
+container.scrollTop = container.scrollHeight;
+if (count() > previousCount || atEnd()) finish();
+"""
+
+# Tüm işletme kartlarının adı, bağlantısı, puanı ve yorum sayısı tek çağrıda
+_EXTRACT_CARDS_JS = """
+function num(s) {
+    const m = /([\\d.,]+)/.exec(s || '');
+    return m ? parseFloat(m[1].replace(/\\.(?=\\d{3})/g, '').replace(',', '.')) : null;
+}
+
+const cards = [];
+for (const card of document.querySelectorAll('div.Nv2PK')) {
+    const link = card.querySelector('a.hfpxzc');
+    const nameEl = card.querySelector('div.qBF1Pd');
+    const name = ((nameEl && nameEl.innerText) || (link && link.getAttribute('aria-label')) || '').trim();
+    if (!name) continue;
+    const ratingEl = card.querySelector('span.MW4etd');
+    const countEl = card.querySelector('span.UY7F9');
+    cards.push({
+        name: name,
+        url: link ? link.href : null,
+        rating: ratingEl ? num(ratingEl.innerText) : null,
+        review_count: countEl ? num(countEl.innerText) : null
+    });
+}
+return cards;
+"""
+
+_FEED_SELECTOR = "div[role='feed'], div.m6QErb.DxyBCb.kA9KIf.dS8AEf"
+
+
+def _scroll_feed(driver, container, max_no_new=5):
+    """Sonuç listesini liste sonuna ya da art arda max_no_new boş scroll'a kadar kaydırır."""
+    driver.set_script_timeout(SCROLL_PAUSE_TIME + 5)
+    previous_count = 0
+    no_new_count = 0
     
-    # Bekleyen işletmeler tablosu
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS pending_businesses (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            business_type VARCHAR(255) NOT NULL,
-            city VARCHAR(100) NOT NULL,
-            district VARCHAR(100) NOT NULL,
-            business_name VARCHAR(500) NOT NULL,
-            status ENUM('pending', 'processing', 'completed', 'failed') DEFAULT 'pending',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            processed_at TIMESTAMP NULL,
-            error_message TEXT NULL,
-            UNIQUE KEY unique_business (business_type, city, district, business_name)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-    """)
+    while no_new_count < max_no_new:
+        try:
+            current_count, at_end = driver.execute_async_script(
+                _FEED_SCROLL_JS, container, previous_count, int(SCROLL_PAUSE_TIME * 1000)
+            )
+        except Exception as e:
+            print(f"Scroll hatası: {e}")
+            break
+        
+        if current_count > previous_count:
+            no_new_count = 0
+            previous_count = current_count
+            print(f"  Bulunan işletme: {current_count}")
+        else:
+            no_new_count += 1
+        
+        if at_end:
+            print("  Liste sonuna ulaşıldı.")
+            break
     
-    db_connection.commit()
-    cursor.close()
-    print("Tablo kontrolü tamamlandı.")
+    return previous_count
 
 
-def discover_businesses(driver, search_query, db_connection):
+def _extract_cards(driver):
     """
-    Belirli bir sorgu ile işletmeleri keşfeder ve veritabanına kaydeder.
+    Yüklenmiş tüm kartları tek execute_script ile okur, isme göre tekilleştirir.
     
-    Args:
-        driver: Selenium WebDriver
-        search_query: "işletme_türü şehir ilçe" formatında sorgu
-        db_connection: MySQL bağlantısı
+    Returns:
+        dict listesi: name, url, place_id, rating, review_count
+    """
+    cards = []
+    seen = set()
+    for card in driver.execute_script(_EXTRACT_CARDS_JS) or []:
+        if card['name'] in seen:
+            continue
+        seen.add(card['name'])
+        if not (card['url'] and '/maps/place/' in card['url']):
+            card['url'] = None
+        card['place_id'] = place_id_from_url(card['url'])
+        if card['review_count'] is not None:
+            card['review_count'] = int(card['review_count'])
+        cards.append(card)
+    return cards
+
+
+def _save_discovered(db_connection, business_type, city, district, cards):
+    """
+    Keşfedilen kartları tek çok satırlı INSERT ile pending_businesses'a yazar.
+    
+    Önceden keşfedilmiş satırlar tekrar eklenmez; eksik bağlantı ve güncel
+    puan/yorum sayısı bilgileri güncellenir. Toplu INSERT hata verirse (ör.
+    tek bir kartın değeri kolona sığmıyorsa) kartlar tek tek yazılır ve
+    yalnızca hatalı kart atlanır.
     
     Returns:
-        int: Bulunan işletme sayısı
+        int: Yeni eklenen işletme sayısı
     """
+    if not cards:
+        return 0
+    
+    cursor = db_connection.cursor()
+    try:
+        cursor.execute("""
+            SELECT business_name FROM pending_businesses
+            WHERE business_type = %s AND city = %s AND district = %s
+        """, (business_type, city, district))
+        existing = {row[0] for row in cursor.fetchall()}
+    except Exception as e:
+        print(f"  ✗ Kayıt hatası: {e}")
+        cursor.close()
+        return 0
+    
+    def insert(batch):
+        placeholders = ", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s, 'pending')"] * len(batch))
+        values = []
+        for card in batch:
+            values.extend((
+                business_type, city, district, card['name'],
+                card['url'], card['place_id'], card['rating'], card['review_count']
+            ))
+        cursor.execute(f"""
+            INSERT INTO pending_businesses 
+            (business_type, city, district, business_name, place_url, place_id, rating, review_count, status)
+            VALUES {placeholders}
+            ON DUPLICATE KEY UPDATE
+                place_url = COALESCE(place_url, VALUES(place_url)),
+                place_id = COALESCE(place_id, VALUES(place_id)),
+                rating = COALESCE(VALUES(rating), rating),
+                review_count = COALESCE(VALUES(review_count), review_count)
+        """, values)
+        db_connection.commit()
+    
+    failed = set()
+    try:
+        insert(cards)
+    except Exception as e:
+        print(f"  ! Toplu kayıt hatası, kartlar tek tek yazılıyor: {e}")
+        db_connection.rollback()
+        for card in cards:
+            try:
+                insert([card])
+            except Exception as e:
+                print(f"  ✗ Kayıt hatası ({card['name']}): {e}")
+                db_connection.rollback()
+                failed.add(card['name'])
+    finally:
+        cursor.close()
+    
+    saved_count = 0
+    for card in cards:
+        detail = f"{card['rating'] or '-'}★, {card['review_count'] or 0} yorum"
+        if card['name'] in failed:
+            continue
+        if card['name'] in existing:
+            print(f"  ○ Zaten mevcut: {card['name']} ({detail})")
+        else:
+            saved_count += 1
+            print(f"  ✓ Kaydedildi: {card['name']} ({detail})")
+    return saved_count
+
+
+def _parse_discovery_query(search_query):
+    """'işletme_türü şehir ilçe' sorgusunu parçalar, hatalıysa None döndürür."""
     parts = search_query.strip().split()
     if len(parts) < 3:
         print("HATA: Sorgu formatı 'İşletme_Türü Şehir İlçe' şeklinde olmalı.")
-        return 0
+        return None
     
     business_type = " ".join(parts[:-2])
     city = parts[-2]
@@ -87,10 +312,28 @@ def discover_businesses(driver, search_query, db_connection):
     print(f"  Şehir: '{city}'")
     print(f"  İlçe: '{district}'")
     print("=" * 60)
+    return business_type, city, district
+
+
+def discover_businesses(driver, search_query, db_connection):
+    """
+    Belirli bir sorgu ile işletmeleri keşfeder ve veritabanına kaydeder.
+    
+    Args:
+        driver: Selenium WebDriver
+        search_query: "işletme_türü şehir ilçe" formatında sorgu
+        db_connection: MySQL bağlantısı
+    
+    Returns:
+        int: Bulunan işletme sayısı
+    """
+    parsed = _parse_discovery_query(search_query)
+    if not parsed:
+        return 0
+    business_type, city, district = parsed
     
     # Google Maps'i aç
     driver.get("https://www.google.com/maps")
-    time.sleep(3)
     
     try:
         # Arama yap
@@ -104,117 +347,29 @@ def discover_businesses(driver, search_query, db_connection):
         search_box.send_keys(Keys.RETURN)
         
         print("Arama yapıldı, sonuçlar bekleniyor...")
-        time.sleep(5)
-        
-        # Sonuç listesini bul
-        businesses_found = []
-        scroll_container = None
-        
-        # Sonuç listesi container'ını bul
         try:
-            # Farklı seçiciler dene
-            selectors = [
-                "div[role='feed']",
-                "div.m6QErb.DxyBCb.kA9KIf.dS8AEf",
-                "div.m6QErb"
-            ]
-            
-            for selector in selectors:
-                try:
-                    scroll_container = driver.find_element(By.CSS_SELECTOR, selector)
-                    if scroll_container:
-                        break
-                except:
-                    continue
-            
-            if not scroll_container:
-                print("HATA: Sonuç listesi bulunamadı.")
-                return 0
-            
-        except Exception as e:
-            print(f"Container bulma hatası: {e}")
+            scroll_container = WebDriverWait(driver, 15).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, _FEED_SELECTOR))
+            )
+        except TimeoutException:
+            print("HATA: Sonuç listesi bulunamadı.")
             return 0
         
         # Scroll yaparak tüm işletmeleri yükle
         print("İşletmeler yükleniyor (scroll)...")
+        _scroll_feed(driver, scroll_container)
         
-        previous_count = 0
-        no_new_count = 0
-        max_no_new = 5
-        
-        while no_new_count < max_no_new:
-            # İşletme kartlarını bul
-            try:
-                cards = driver.find_elements(By.CSS_SELECTOR, "div.Nv2PK")
-                current_count = len(cards)
-                
-                if current_count > previous_count:
-                    no_new_count = 0
-                    previous_count = current_count
-                    print(f"  Bulunan işletme: {current_count}")
-                else:
-                    no_new_count += 1
-                
-                # Scroll yap
-                driver.execute_script(
-                    "arguments[0].scrollTop = arguments[0].scrollHeight;", 
-                    scroll_container
-                )
-                time.sleep(2)
-                
-            except StaleElementReferenceException:
-                time.sleep(1)
-                continue
-            except Exception as e:
-                print(f"Scroll hatası: {e}")
-                break
-        
-        # İşletme isimlerini çıkar
-        print("\nİşletme isimleri çıkarılıyor...")
-        cards = driver.find_elements(By.CSS_SELECTOR, "div.Nv2PK")
-        
-        for card in cards:
-            try:
-                # İşletme adını bul
-                name_elem = card.find_element(By.CSS_SELECTOR, "div.qBF1Pd")
-                business_name = name_elem.text.strip()
-                
-                if business_name and business_name not in businesses_found:
-                    businesses_found.append(business_name)
-                    
-            except Exception as e:
-                continue
-        
-        print(f"\nToplam {len(businesses_found)} benzersiz işletme bulundu.")
+        # İşletme bilgilerini çıkar
+        print("\nİşletme bilgileri çıkarılıyor...")
+        cards = _extract_cards(driver)
+        print(f"\nToplam {len(cards)} benzersiz işletme bulundu.")
         
         # Veritabanına kaydet
-        if businesses_found:
-            cursor = db_connection.cursor()
-            saved_count = 0
-            
-            for biz_name in businesses_found:
-                try:
-                    cursor.execute("""
-                        INSERT IGNORE INTO pending_businesses 
-                        (business_type, city, district, business_name, status)
-                        VALUES (%s, %s, %s, %s, 'pending')
-                    """, (business_type, city, district, biz_name))
-                    
-                    if cursor.rowcount > 0:
-                        saved_count += 1
-                        print(f"  ✓ Kaydedildi: {biz_name}")
-                    else:
-                        print(f"  ○ Zaten mevcut: {biz_name}")
-                        
-                except Exception as e:
-                    print(f"  ✗ Kayıt hatası ({biz_name}): {e}")
-            
-            db_connection.commit()
-            cursor.close()
-            
+        saved_count = _save_discovered(db_connection, business_type, city, district, cards)
+        if cards:
             print(f"\n{saved_count} yeni işletme veritabanına kaydedildi.")
         
-        return len(businesses_found)
+        return len(cards)
         
     except Exception as e:
         print(f"Keşif hatası: {e}")
@@ -223,110 +378,779 @@ def discover_businesses(driver, search_query, db_connection):
         return 0
 
 
-def collect_pending_reviews(driver, db_connection, limit=None):
+_COORD_RE = re.compile(r'@(-?\d+\.\d+),(-?\d+\.\d+),')
+
+
+def locate_area(driver, area_query):
+    """
+    Bölge adını (ör. "bartın merkez") Maps'te arar ve harita merkezini döndürür.
+    
+    Returns:
+        (enlem, boylam) veya bulunamazsa None
+    """
+    driver.get(f"https://www.google.com/maps/search/{urllib.parse.quote(area_query)}")
+    try:
+        WebDriverWait(driver, 15).until(lambda d: _COORD_RE.search(d.current_url))
+    except TimeoutException:
+        return None
+    match = _COORD_RE.search(driver.current_url)
+    return float(match.group(1)), float(match.group(2))
+
+
+def bbox_around(lat, lng, radius_km):
+    """Merkez etrafındaki kare bölgeyi (güney, batı, kuzey, doğu) döndürür."""
+    lat_delta = radius_km / 111.32
+    lng_delta = radius_km / (111.32 * math.cos(math.radians(lat)))
+    return lat - lat_delta, lng - lng_delta, lat + lat_delta, lng + lng_delta
+
+
+def parse_bbox(value):
+    """
+    "güney,batı,kuzey,doğu" metnini bbox demetine çevirir.
+    
+    Raises:
+        ValueError: Dört sayı değilse ya da güney >= kuzey veya batı >= doğu ise
+    """
+    try:
+        south, west, north, east = (float(v) for v in value.split(','))
+    except ValueError:
+        raise ValueError(f"--bbox 'güney,batı,kuzey,doğu' biçiminde dört sayı olmalı: {value!r}")
+    if not (-90 <= south < north <= 90):
+        raise ValueError(f"--bbox enlemleri hatalı: güney ({south}) kuzeyden ({north}) küçük olmalı")
+    if not (-180 <= west < east <= 180):
+        raise ValueError(f"--bbox boylamları hatalı: batı ({west}) doğudan ({east}) küçük olmalı")
+    return south, west, north, east
+
+
+def area_tiles(bbox, tile_km=TILE_SIZE_KM):
+    """Bölgeyi yaklaşık tile_km kenarlı karelere böler, kare merkezlerini döndürür."""
+    south, west, north, east = bbox
+    mid_lat = (south + north) / 2
+    rows = max(1, math.ceil((north - south) * 111.32 / tile_km))
+    cols = max(1, math.ceil((east - west) * 111.32 * math.cos(math.radians(mid_lat)) / tile_km))
+    return [
+        (south + (r + 0.5) * (north - south) / rows, west + (c + 0.5) * (east - west) / cols)
+        for r in range(rows)
+        for c in range(cols)
+    ]
+
+
+def _discover_tile(driver, business_type, lat, lng):
+    """Tek bir harita karesinde işletme türünü arar ve kartları döndürür."""
+    url = (f"https://www.google.com/maps/search/{urllib.parse.quote(business_type)}"
+           f"/@{lat:.6f},{lng:.6f},{TILE_ZOOM}z")
+    driver.get(url)
+    try:
+        WebDriverWait(driver, 15).until(
+            lambda d: d.find_elements(By.CSS_SELECTOR, _FEED_SELECTOR) or '/maps/place/' in d.current_url
+        )
+    except TimeoutException:
+        return []
+    
+    feeds = driver.find_elements(By.CSS_SELECTOR, _FEED_SELECTOR)
+    if feeds:
+        _scroll_feed(driver, feeds[0])
+        return _extract_cards(driver)
+    
+    # Karede tek sonuç varsa Maps doğrudan yer sayfasını açar
+    names = driver.find_elements(By.CSS_SELECTOR, "h1.DUwDvf")
+    if not names or not names[0].text.strip():
+        return []
+    return [{
+        'name': names[0].text.strip(),
+        'url': driver.current_url,
+        'place_id': place_id_from_url(driver.current_url),
+        'rating': None,
+        'review_count': None
+    }]
+
+
+def discover_businesses_tiled(search_query, db_connection, workers=1, headless=False, lean=False,
+                              bbox=None, radius_km=TILE_DEFAULT_RADIUS_KM):
+    """
+    Bölgeyi harita karelerine bölüp her kareyi ayrı arayarak işletmeleri keşfeder.
+    
+    Tek sorguda sonuç listesi belli bir sayıda kesildiği için yoğun ilçelerde
+    işletmeler eksik kalır. Kareler N tarayıcı arasında paylaştırılır, sonuçlar
+    yer kimliğine göre birleştirilir ve tek seferde kaydedilir.
+    
+    Args:
+        search_query: "işletme_türü şehir ilçe" formatında sorgu
+        workers: Paralel tarayıcı sayısı
+        bbox: (güney, batı, kuzey, doğu); None ise şehir/ilçe merkezi etrafında radius_km
+    
+    Returns:
+        int: Bulunan benzersiz işletme sayısı
+    """
+    parsed = _parse_discovery_query(search_query)
+    if not parsed:
+        return 0
+    business_type, city, district = parsed
+    
+    # undetected-chromedriver aynı anda patch'lenince çakışıyor, başlatmayı sırala
+    driver_start_lock = threading.Lock()
+    ready_drivers = []
+    
+    if bbox is None:
+        driver = chrome_driver_baslat(headless=headless, lean=lean)
+        center = None
+        try:
+            center = locate_area(driver, f"{city} {district}")
+        finally:
+            # Bulunamadıysa ya da hata olduysa tarayıcı kapatılır, yoksa ilk worker'a devredilir
+            if center:
+                ready_drivers.append(driver)
+            else:
+                driver.quit()
+        if not center:
+            print("HATA: Bölge haritada bulunamadı, --bbox ile sınır verin.")
+            return 0
+        bbox = bbox_around(center[0], center[1], radius_km)
+    
+    tiles = area_tiles(bbox)
+    print(f"Bölge {len(tiles)} kareye bölündü ({TILE_SIZE_KM} km), {workers} tarayıcı ile aranıyor...")
+    
+    tile_queue = queue.Queue()
+    for idx, tile in enumerate(tiles, 1):
+        tile_queue.put((idx, tile))
+    
+    found = {}
+    lock = threading.Lock()
+    
+    def worker(worker_id):
+        driver = None
+        try:
+            with driver_start_lock:
+                driver = ready_drivers.pop() if ready_drivers else chrome_driver_baslat(headless=headless, lean=lean)
+            
+            while True:
+                try:
+                    idx, (lat, lng) = tile_queue.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    cards = _discover_tile(driver, business_type, lat, lng)
+                except Exception as e:
+                    print(f"[worker-{worker_id}] Kare {idx} hatası: {e}")
+                    continue
+                
+                with lock:
+                    new_count = 0
+                    for card in cards:
+                        key = card['place_id'] or card['name']
+                        if key not in found:
+                            found[key] = card
+                            new_count += 1
+                    total = len(found)
+                print(f"[worker-{worker_id}] Kare {idx}/{len(tiles)}: {len(cards)} işletme, "
+                      f"{new_count} yeni (toplam {total})")
+        
+        except Exception as e:
+            print(f"[worker-{worker_id}] Hata: {e}")
+        
+        finally:
+            if driver:
+                driver.quit()
+    
+    try:
+        threads = [
+            threading.Thread(target=worker, args=(i,), name=f"worker-{i}")
+            for i in range(1, workers + 1)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        # Hiçbir worker'ın devralmadığı tarayıcı açık kalmasın
+        while ready_drivers:
+            ready_drivers.pop().quit()
+    
+    # pending_businesses isme göre tekil; aynı isimli farklı şubelerden ilki tutulur
+    cards = []
+    names = set()
+    for card in found.values():
+        if card['name'] not in names:
+            names.add(card['name'])
+            cards.append(card)
+    if len(cards) < len(found):
+        print(f"Aynı isimli {len(found) - len(cards)} şube tek kayıt olarak tutuldu.")
+    
+    print(f"\nToplam {len(found)} benzersiz yer bulundu.")
+    saved_count = _save_discovered(db_connection, business_type, city, district, cards)
+    if cards:
+        print(f"\n{saved_count} yeni işletme veritabanına kaydedildi.")
+    return len(cards)
+
+
+def collect_pending_reviews(supervisor, db_connection, limit=None, mode='dom', pipeline=False):
     """
     Bekleyen işletmelerin yorumlarını toplar.
     
     Args:
-        driver: Selenium WebDriver
+        supervisor: Tarayıcıyı yöneten DriverSupervisor
         db_connection: MySQL bağlantısı
         limit: Maksimum işlenecek işletme sayısı (None = hepsi)
-    
+        mode: Yorum toplama modu ('dom', 'stream', 'network', 'incremental', 'snapshot')
+        pipeline: True ise ayrıştırma ve kayıt arka plan yazıcısında yapılır,
+            tarayıcı yakalamadan sonra sıradaki işletmeye geçer
     Returns:
         dict: İstatistikler
     """
-    cursor = db_connection.cursor(dictionary=True)
-    
-    # Bekleyen işletmeleri al
-    query = """
-        SELECT id, business_type, city, district, business_name 
-        FROM pending_businesses 
-        WHERE status = 'pending'
-        ORDER BY created_at ASC
-    """
+    reclaim_expired_leases(db_connection)
+    cursor = db_connection.cursor()
+    cursor.execute(f"SELECT COUNT(*) FROM pending_businesses WHERE {_CLAIMABLE}")
+    total = cursor.fetchone()[0]
+    cursor.close()
     if limit:
-        query += f" LIMIT {limit}"
-    
-    cursor.execute(query)
-    pending = cursor.fetchall()
+        total = min(total, limit)
     
-    if not pending:
+    if not total:
         print("Bekleyen işletme bulunamadı.")
-        return {'processed': 0, 'success': 0, 'failed': 0}
+        return {'processed': 0, 'success': 0, 'failed': 0, 'total_comments': 0}
     
-    print(f"{len(pending)} bekleyen işletme bulundu.")
+    print(f"{total} bekleyen işletme bulundu.")
     print("=" * 60)
     
     stats = {'processed': 0, 'success': 0, 'failed': 0, 'total_comments': 0}
+    worker_id = make_worker_id()
+    writer = make_review_writer(mode) if pipeline else None
+    pending_writes = []
+    
+    try:
+        for idx in range(1, total + 1):
+            # Liste baştan alınmaz; başka host'lar aynı kuyruğu eşzamanlı işleyebilir
+            biz = claim_pending_business(db_connection, worker_id)
+            if not biz:
+                break
+            print(f"\n[{idx}/{total}] İşleniyor: {biz['business_name']}")
+            
+            result = process_supervised(supervisor, db_connection, biz, mode, writer)
+            _track_result(stats, result, pending_writes)
+            
+            # Rate limiting - işletmeler arası bekleme
+            if idx < total:
+                print("  Bir sonraki işletme için bekleniyor...")
+                time.sleep(3)
+    finally:
+        _drain_results(stats, pending_writes)
+        close_review_writer(writer)
+    
+    return stats
+
+
+def process_supervised(supervisor, db_connection, biz, mode='dom', writer=None):
+    """
+    İşletmeyi supervisor'ın tarayıcısıyla işler.
+    
+    Oturum koparsa işletme başarısız sayılmaz, yeni tarayıcıyla
+    DRIVER_CRASH_RETRIES kez daha denenir (kira hâlâ bu worker'da). Sonra
+    supervisor'a işletmenin bittiği bildirilir; sınır aşıldıysa tarayıcı yenilenir.
+    
+    Returns:
+        int: Eklenen yorum sayısı, başarısızsa None; writer ile kaydı
+        arka plana bırakılan işletmeler için Future
+    """
+    for retry in range(DRIVER_CRASH_RETRIES + 1):
+        biz['driver_restarts'] = supervisor.restarts
+        try:
+            comments_added = process_pending_business(
+                supervisor.driver, db_connection, biz, mode,
+                raise_on_dead_session=retry < DRIVER_CRASH_RETRIES, writer=writer
+            )
+            break
+        except DriverSessionLost as e:
+            print(f"  ! Tarayıcı oturumu koptu ({e}), işletme yeni tarayıcıyla tekrar deneniyor...")
+            supervisor.restart("oturum koptu")
+    
+    supervisor.business_done()
+    return comments_added
+
+
+def process_pending_business(driver, db_connection, biz, mode='dom', raise_on_dead_session=False, writer=None):
+    """
+    Kiralanmış ('processing') tek bir işletmenin yorumlarını toplar ve
+    sonucu pending_businesses tablosuna yazar. İşlem sürerken kira heartbeat
+    ile uzatılır; sonuç sadece kira hâlâ bu worker'daysa yazılır.
+    
+    Args:
+        driver: Selenium WebDriver
+        db_connection: MySQL bağlantısı
+        biz: claim_pending_business satırı (worker_id ve attempts dahil)
+        mode: Yorum toplama modu ('dom', 'stream', 'network', 'incremental', 'snapshot')
+        raise_on_dead_session: True ise tarayıcı oturumu koptuğunda sonuç
+            yazılmaz, DriverSessionLost fırlatılır (kira bu worker'da kalır)
+        writer: make_review_writer çıktısı; verilirse yorumlar sadece yakalanır,
+            ayrıştırma, kayıt ve sonucun yazılması yazıcı thread'ine bırakılır
+    
+    Returns:
+        int: Eklenen yorum sayısı, başarısızsa None; writer ile sonucu
+        yazıcıdan gelecek Future
+    """
+    pending_id = biz['id']
+    worker_id = biz['worker_id']
+    business_name = biz['business_name']
+    city = biz['city']
+    district = biz['district']
+    
+    full_query = f"{business_name} {city} {district}"
+    print(f"  Sorgu: {full_query} (deneme {biz['attempts']}/{MAX_ATTEMPTS})")
+    
+    # Aşama süreleri bu thread'de bu kayda yazılır, sonuçla birlikte scrape_runs'a geçer
+    biz['metrics'] = start_metrics()
+    biz['mode'] = mode
     
-    for idx, biz in enumerate(pending, 1):
-        pending_id = biz['id']
-        business_name = biz['business_name']
-        city = biz['city']
-        district = biz['district']
+    capture = writer is not None and mode in PIPELINE_MODES
+    try:
+        with ExitStack() as heartbeat:
+            heartbeat.enter_context(lease_heartbeat(pending_id, worker_id))
+            result = _collect_business(driver, db_connection, biz, full_query, mode, capture)
+            
+            # Scraper fonksiyonları çoğu hatayı yutar; oturum öldüyse sonuç güvenilmez
+            if raise_on_dead_session and not driver_alive(driver):
+                raise DriverSessionLost("tarayıcı yanıt vermiyor")
+            
+            if capture:
+                # Yazıcı sırası beklenirken de kira uzatılır; heartbeat'i kayıt bitince yazıcı durdurur
+                print("  Yorumlar yakalandı, kayıt arka planda yapılacak.")
+                biz['queued_at'] = time.time()
+                pending_heartbeat = heartbeat.pop_all()
+                try:
+                    return writer.submit(_write_captured, biz, *result, heartbeat=pending_heartbeat)
+                except BaseException:
+                    pending_heartbeat.close()
+                    raise
         
-        full_query = f"{business_name} {city} {district}"
+        _finish_business(db_connection, biz, result)
+        return result
         
-        print(f"\n[{idx}/{len(pending)}] İşleniyor: {business_name}")
-        print(f"  Sorgu: {full_query}")
+    except DriverSessionLost:
+        raise
+    
+    except Exception as e:
+        if raise_on_dead_session and not driver_alive(driver):
+            raise DriverSessionLost(str(e)) from e
+        _finish_business(db_connection, biz, error=str(e))
+        return None
+    
+    finally:
+        if driver_alive(driver):
+            report_network_stats(driver)
+
+
+def _finish_business(db_connection, biz, comments_added=None, error=None):
+    """
+    İşletmenin sonucunu pending_businesses'a yazar (sadece kira hâlâ bu worker'daysa).
+    
+    Hata varsa deneme hakkı kaldığında üstel beklemeyle kuyruğa geri konur.
+    Aşama süreleri scrape_runs tablosuna ayrı bir satır olarak yazılır.
+    """
+    save_scrape_run(
+        db_connection, biz['metrics'], 'completed' if error is None else 'failed',
+        business_name=biz['business_name'], business_id=biz.get('business_id'),
+        pending_id=biz['id'], mode=biz.get('mode'), worker_id=biz['worker_id'],
+        run_id=current_run_id(), driver_restarts=biz.get('driver_restarts', 0), error=error
+    )
+    
+    cursor = db_connection.cursor()
+    try:
+        if error is None:
+            # Başarılı; kira başka worker'a geçtiyse sonucu o yazacak
+            cursor.execute("""
+                UPDATE pending_businesses 
+                SET status = 'completed', processed_at = NOW(), error_message = NULL,
+                    worker_id = NULL, lease_expires_at = NULL
+                WHERE id = %s AND worker_id = %s
+            """, (biz['id'], biz['worker_id']))
+            db_connection.commit()
+            if cursor.rowcount == 0:
+                print("  ! Kira süresi dolmuş, işletme başka bir worker'a geçmiş.")
+            print(f"  ✓ Tamamlandı! {comments_added} yorum eklendi.")
+            return
         
-        # Durumu 'processing' yap
-        cursor.execute(
-            "UPDATE pending_businesses SET status = 'processing' WHERE id = %s",
-            (pending_id,)
-        )
+        cursor.execute("""
+            UPDATE pending_businesses 
+            SET status = IF(attempts >= %s, 'failed', 'pending'),
+                next_attempt_at = IF(attempts >= %s, NULL,
+                                     NOW() + INTERVAL (%s * POW(2, attempts - 1)) SECOND),
+                processed_at = NOW(), error_message = %s,
+                worker_id = NULL, lease_expires_at = NULL
+            WHERE id = %s AND worker_id = %s
+        """, (MAX_ATTEMPTS, MAX_ATTEMPTS, RETRY_BACKOFF_SECONDS, error, biz['id'], biz['worker_id']))
         db_connection.commit()
-        
+        print(f"  ✗ Hata: {error}")
+    finally:
+        cursor.close()
+
+
+# Yakalama/kayıt ayrımı olan modlar; diğerleri kaydı scroll sırasında yapar
+PIPELINE_MODES = ('dom', 'snapshot')
+
+# Yazıcı thread'inin kendi MySQL bağlantısı
+_writer_context = threading.local()
+
+
+def _open_writer_connection():
+    _writer_context.db = get_db_connection(silent=True)
+
+
+def _close_writer_connection():
+    db_connection = getattr(_writer_context, 'db', None)
+    if db_connection and db_connection.is_connected():
+        db_connection.close()
+
+
+def make_review_writer(mode):
+    """
+    Yakalanan yorumları sırayla ayrıştırıp kaydeden tek thread'li yazıcı.
+    
+    Kaydı scroll sırasında yapan modlarda (stream, network, incremental)
+    boru hattının kazancı yoktur; None döner ve toplama senkron yapılır.
+    """
+    if mode not in PIPELINE_MODES:
+        print(f"'{mode}' modu boru hattını desteklemiyor, senkron toplanacak.")
+        return None
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="writer", initializer=_open_writer_connection)
+
+
+def close_review_writer(writer):
+    """Bekleyen kayıtları bitirip yazıcıyı kapatır."""
+    if writer is None:
+        return
+    writer.submit(_close_writer_connection)
+    writer.shutdown(wait=True)
+
+
+def _write_captured(biz, business_id, capture, heartbeat=None):
+    """
+    Yazıcı thread'inde: yakalanan yorumları kaydeder ve işletmeyi sonuçlandırır.
+    
+    heartbeat kayıt bitene kadar kirayı uzatan ExitStack'tir, burada kapatılır.
+    Sırada geçen süre işletmenin toplam süresinden düşülür.
+    """
+    if 'queued_at' in biz:
+        biz['metrics']['started'] += time.time() - biz.pop('queued_at')
+    db_connection = _writer_context.db
+    print(f"\n[kayıt] {biz['business_name']}")
+    comments_added, error = None, None
+    with heartbeat or nullcontext():
+        if not db_connection:
+            # Sonuç yazılamaz; kira dolunca işletme kuyruğa geri döner
+            print("  ✗ Yazıcının veritabanı bağlantısı yok.")
+            return None
         try:
-            # İşletmeyi veritabanına ekle/bul
-            business_id = get_or_create_business(db_connection, business_name, city, district)
-            
-            if not business_id:
-                raise Exception("İşletme ID alınamadı")
-            
-            # İşletmeyi ara ve yorumları topla
-            if isletme_ara(driver, full_query, business_name):
-                yorumlari_yukle(driver)
-                devamini_oku_tikla(driver)
-                time.sleep(2)
-                
-                comments_added = yorumlari_cek_ve_kaydet(driver, db_connection, business_id)
-                stats['total_comments'] += comments_added
-                
-                # Başarılı
-                cursor.execute("""
-                    UPDATE pending_businesses 
-                    SET status = 'completed', processed_at = NOW()
-                    WHERE id = %s
-                """, (pending_id,))
-                db_connection.commit()
-                
-                stats['success'] += 1
-                print(f"  ✓ Tamamlandı! {comments_added} yorum eklendi.")
-                
-            else:
-                raise Exception("İşletme araması başarısız")
-                
+            with use_metrics(biz['metrics']):
+                comments_added = yakalanan_yorumlari_kaydet(db_connection, business_id, capture)
         except Exception as e:
-            error_msg = str(e)
+            error = str(e)
+    try:
+        _finish_business(db_connection, biz, comments_added, error)
+    except Exception as e:
+        print(f"  ! Sonuç yazılamadı ({e}), kira dolunca işletme kuyruğa dönecek.")
+    return comments_added
+
+
+def _track_result(stats, result, pending_writes, lock=None):
+    """
+    Senkron sonucu hemen, yazıcıdaki sonuçları bittikçe istatistiğe ekler.
+    
+    Yazıcıda PIPELINE_MAX_PENDING'den fazla işletme birikirse en eskisi
+    beklenir; tarayıcı yazıcının çok önüne geçip bellekte HTML biriktirmez.
+    """
+    if not isinstance(result, Future):
+        with lock or nullcontext():
+            _update_stats(stats, result)
+        return
+    pending_writes.append(result)
+    while pending_writes and (pending_writes[0].done() or len(pending_writes) > PIPELINE_MAX_PENDING):
+        comments_added = pending_writes.pop(0).result()
+        with lock or nullcontext():
+            _update_stats(stats, comments_added)
+
+
+def _drain_results(stats, pending_writes, lock=None):
+    """Yazıcıdaki tüm sonuçları bekleyip istatistiğe ekler."""
+    while pending_writes:
+        comments_added = pending_writes.pop(0).result()
+        with lock or nullcontext():
+            _update_stats(stats, comments_added)
+
+
+def _collect_business(driver, db_connection, biz, full_query, mode, capture=False):
+    """
+    İşletmeyi açar ve yorumlarını toplar; başarısızlıkta exception fırlatır.
+    
+    capture=True ise yorumlar kaydedilmez, (business_id, yakalama) döner.
+    """
+    business_name = biz['business_name']
+    
+    # İşletmeyi veritabanına ekle/bul
+    business_id = get_or_create_business(db_connection, business_name, biz['city'], biz['district'])
+    if not business_id:
+        raise Exception("İşletme ID alınamadı")
+    biz['business_id'] = business_id
+    
+    # Keşifte yer bağlantısı kaydedildiyse aramayı atla, yoksa ya da açılmazsa ara
+    place_url = biz.get('place_url')
+    if not (place_url and isletme_sayfasina_git(driver, place_url, business_name)):
+        if place_url:
+            print("  Yer bağlantısı açılamadı, arama ile deneniyor...")
+        if not isletme_ara(driver, full_query, business_name):
+            raise Exception("İşletme araması başarısız")
+    
+    if capture:
+        return business_id, yorumlari_yakala(driver, mode)
+    return yorumlari_topla(driver, db_connection, business_id, mode)
+
+
+def _update_stats(stats, comments_added):
+    """Tek işletmenin sonucunu istatistiklere ekler."""
+    stats['processed'] += 1
+    if comments_added is None:
+        stats['failed'] += 1
+    else:
+        stats['success'] += 1
+        stats['total_comments'] += comments_added
+
+
+# Sahiplenilebilir satırlar: bekleyen ve geri deneme zamanı gelmiş
+_CLAIMABLE = "status = 'pending' AND (next_attempt_at IS NULL OR next_attempt_at <= NOW())"
+
+
+def make_worker_id():
+    """Kirayı tutan worker'ın host/süreç/thread bazında tekil kimliği."""
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"
+
+
+def reclaim_expired_leases(db_connection):
+    """
+    Kira süresi dolmuş 'processing' satırlarını (çökmüş worker/host) geri alır.
+    
+    Deneme hakkı kalanlar üstel beklemeyle 'pending'e, kalmayanlar 'failed'e
+    çekilir. Kirası olmayan eski 'processing' satırları da süresi dolmuş sayılır.
+    
+    Returns:
+        int: Geri alınan satır sayısı
+    """
+    cursor = db_connection.cursor()
+    try:
+        cursor.execute("""
+            UPDATE pending_businesses
+            SET status = IF(attempts >= %s, 'failed', 'pending'),
+                next_attempt_at = IF(attempts >= %s, NULL,
+                                     NOW() + INTERVAL (%s * POW(2, GREATEST(attempts, 1) - 1)) SECOND),
+                error_message = CONCAT('Kira süresi doldu (', COALESCE(worker_id, '?'), ')'),
+                worker_id = NULL, lease_expires_at = NULL
+            WHERE status = 'processing' AND (lease_expires_at IS NULL OR lease_expires_at < NOW())
+        """, (MAX_ATTEMPTS, MAX_ATTEMPTS, RETRY_BACKOFF_SECONDS))
+        db_connection.commit()
+        if cursor.rowcount:
+            print(f"{cursor.rowcount} süresi dolmuş kira geri alındı.")
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
+
+def claim_pending_business(db_connection, worker_id=None):
+    """
+    Bekleyen bir işletmeyi atomik olarak kiralar.
+    
+    SELECT ... FOR UPDATE SKIP LOCKED ile başka bir worker'ın kilitlediği
+    satırlar atlanır, seçilen satır aynı transaction içinde 'processing'
+    durumuna çekilir ve LEASE_SECONDS süreliğine worker_id'ye kiralanır.
+    Böylece iki worker/host aynı işletmeyi alamaz (MySQL 8+); çöken worker'ın
+    kirası dolunca reclaim_expired_leases satırı kuyruğa geri koyar.
+    
+    Returns:
+        dict: pending_businesses satırı (worker_id dahil), bekleyen yoksa None
+    """
+    worker_id = worker_id or make_worker_id()
+    reclaim_expired_leases(db_connection)
+    cursor = db_connection.cursor(dictionary=True)
+    try:
+        cursor.execute(f"""
+            SELECT id, business_type, city, district, business_name, place_url, attempts
+            FROM pending_businesses
+            WHERE {_CLAIMABLE}
+            ORDER BY created_at ASC
+            LIMIT 1
+            FOR UPDATE SKIP LOCKED
+        """)
+        biz = cursor.fetchone()
+        if biz:
             cursor.execute("""
-                UPDATE pending_businesses 
-                SET status = 'failed', processed_at = NOW(), error_message = %s
+                UPDATE pending_businesses
+                SET status = 'processing', worker_id = %s, attempts = attempts + 1,
+                    lease_expires_at = NOW() + INTERVAL %s SECOND
                 WHERE id = %s
-            """, (error_msg, pending_id))
-            db_connection.commit()
-            
-            stats['failed'] += 1
-            print(f"  ✗ Hata: {error_msg}")
+            """, (worker_id, LEASE_SECONDS, biz['id']))
+            biz['worker_id'] = worker_id
+            biz['attempts'] += 1
+        db_connection.commit()
+        return biz
+    except Exception:
+        db_connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+@contextmanager
+def lease_heartbeat(pending_id, worker_id):
+    """
+    İşletme işlenirken kirayı HEARTBEAT_INTERVAL aralıklarla uzatan arka plan thread'i.
+    
+    Heartbeat kendi bağlantısını kullanır (MySQL bağlantısı thread'ler arası
+    paylaşılamaz). Kira başka worker'a geçmişse uyarı basar ve durur.
+    """
+    stop = threading.Event()
+    
+    def beat():
+        with pooled_connection(silent=True) as db_connection:
+            if not db_connection:
+                return
+            try:
+                while not stop.wait(HEARTBEAT_INTERVAL):
+                    cursor = db_connection.cursor()
+                    cursor.execute("""
+                        UPDATE pending_businesses
+                        SET lease_expires_at = NOW() + INTERVAL %s SECOND
+                        WHERE id = %s AND worker_id = %s AND status = 'processing'
+                    """, (LEASE_SECONDS, pending_id, worker_id))
+                    db_connection.commit()
+                    lost = cursor.rowcount == 0
+                    cursor.close()
+                    if lost:
+                        print("  ! Kira kaybedildi, heartbeat durduruluyor.")
+                        return
+            except Exception as e:
+                print(f"  ! Heartbeat hatası: {e}")
+    
+    thread = threading.Thread(target=beat, name=f"heartbeat-{pending_id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def collect_claimed_businesses(supervisor, db_connection, limit=None, mode='dom'):
+    """
+    İşletmeleri claim_pending_business ile tek tek sahiplenerek yorumlarını toplar.
+    
+    collect_pending_reviews'tan farkı listeyi baştan almamasıdır; aynı tabloyu
+    eşzamanlı işleyen başka çağrılarla (scraper_service işleri) çakışmaz.
+    
+    Returns:
+        dict: İstatistikler
+    """
+    stats = {'processed': 0, 'success': 0, 'failed': 0, 'total_comments': 0}
+    worker_id = make_worker_id()
+    
+    while limit is None or stats['processed'] < limit:
+        biz = claim_pending_business(db_connection, worker_id)
+        if not biz:
+            break
         
-        stats['processed'] += 1
+        print(f"\n[{stats['processed'] + 1}] İşleniyor: {biz['business_name']}")
+        comments_added = process_supervised(supervisor, db_connection, biz, mode)
+        _update_stats(stats, comments_added)
         
         # Rate limiting - işletmeler arası bekleme
-        if idx < len(pending):
-            print("  Bir sonraki işletme için bekleniyor...")
-            time.sleep(3)
+        time.sleep(3)
+    
+    if stats['processed'] == 0:
+        print("Bekleyen işletme bulunamadı.")
+    return stats
+
+
+def collect_pending_reviews_parallel(workers, headless=False, limit=None, mode='dom', lean=False, pipeline=False):
+    """
+    Bekleyen işletmeleri N paralel tarayıcı ile toplar.
+    
+    Her worker kendi Chrome örneğini ve MySQL bağlantısını açar, sıradaki
+    işletmeyi claim_pending_business ile sahiplenir.
+    
+    Args:
+        workers: Paralel tarayıcı sayısı
+        headless: Headless modda çalıştır
+        limit: Maksimum işlenecek işletme sayısı (None = hepsi)
+        mode: Yorum toplama modu ('dom', 'stream', 'network', 'incremental', 'snapshot')
+        lean: Resim, font, harita karosu ve medyayı engelleyen lean tarayıcı kullan
+        pipeline: Her worker kaydı kendi yazıcı thread'ine bırakır ve yedek
+            tarayıcı tutar
+    
+    Returns:
+        dict: Tüm worker'ların toplam istatistikleri
+    """
+    stats = {'processed': 0, 'success': 0, 'failed': 0, 'total_comments': 0}
+    lock = threading.Lock()
+    # undetected-chromedriver aynı anda patch'lenince çakışıyor, başlatmayı sırala
+    driver_start_lock = threading.Lock()
+    remaining = [limit]
+    
+    def take_slot():
+        with lock:
+            if remaining[0] is None:
+                return True
+            if remaining[0] <= 0:
+                return False
+            remaining[0] -= 1
+            return True
+    
+    def worker(worker_id):
+        supervisor = DriverSupervisor(
+            headless=headless, network_capture=(mode == 'network'), lean=lean,
+            start_lock=driver_start_lock, spare=pipeline
+        )
+        db_connection = None
+        writer = None
+        pending_writes = []
+        try:
+            db_connection = get_db_connection()
+            if not db_connection:
+                print(f"[worker-{worker_id}] Veritabanı bağlantısı kurulamadı!")
+                return
+            supervisor.driver  # Tarayıcıyı ilk claim'den önce aç
+            lease_owner = make_worker_id()
+            if pipeline:
+                writer = make_review_writer(mode)
+            
+            while take_slot():
+                biz = claim_pending_business(db_connection, lease_owner)
+                if not biz:
+                    break
+                
+                print(f"\n[worker-{worker_id}] İşleniyor: {biz['business_name']}")
+                result = process_supervised(supervisor, db_connection, biz, mode, writer)
+                _track_result(stats, result, pending_writes, lock)
+                
+                # Rate limiting - işletmeler arası bekleme
+                time.sleep(3)
+        
+        except Exception as e:
+            print(f"[worker-{worker_id}] Hata: {e}")
+        
+        finally:
+            _drain_results(stats, pending_writes, lock)
+            close_review_writer(writer)
+            supervisor.quit()
+            if db_connection and db_connection.is_connected():
+                db_connection.close()
+    
+    print(f"{workers} worker ile toplama başlatılıyor...")
+    print("=" * 60)
+    
+    threads = [
+        threading.Thread(target=worker, args=(i,), name=f"worker-{i}")
+        for i in range(1, workers + 1)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
     
-    cursor.close()
     return stats
 
 
@@ -361,6 +1185,28 @@ def show_pending_status(db_connection):
         for btype, city, district, count in pending_groups:
             print(f"  {btype} - {city}/{district}: {count} işletme")
     
+    # Aktif kiralar ve geri deneme bekleyenler
+    cursor.execute("""
+        SELECT business_name, worker_id, lease_expires_at < NOW()
+        FROM pending_businesses
+        WHERE status = 'processing'
+    """)
+    leases = cursor.fetchall()
+    
+    if leases:
+        print("\nİşlenen İşletmeler:")
+        print("-" * 40)
+        for biz_name, worker_id, expired in leases:
+            print(f"  {biz_name}: {worker_id or '-'}{' (kira süresi dolmuş)' if expired else ''}")
+    
+    cursor.execute("""
+        SELECT COUNT(*) FROM pending_businesses
+        WHERE status = 'pending' AND next_attempt_at > NOW()
+    """)
+    backoff_count = cursor.fetchone()[0]
+    if backoff_count:
+        print(f"\nGeri deneme için bekleyen: {backoff_count}")
+    
     # Başarısız olanları listele
     cursor.execute("""
         SELECT business_name, error_message
@@ -402,10 +1248,11 @@ def retry_failed_businesses(db_connection):
     
     print(f"{failed_count} başarısız işletme bulundu.")
     
-    # Failed olanları pending yap
+    # Failed olanları pending yap, deneme hakkını sıfırla
     cursor.execute("""
         UPDATE pending_businesses 
-        SET status = 'pending', error_message = NULL, processed_at = NULL
+        SET status = 'pending', error_message = NULL, processed_at = NULL,
+            attempts = 0, next_attempt_at = NULL
         WHERE status = 'failed'
     """)
     
@@ -418,6 +1265,19 @@ def retry_failed_businesses(db_connection):
     return updated
 
 
+def _collect_mode(args):
+    """Komut satırı bayraklarından yorum toplama modunu seçer."""
+    if args.incremental:
+        return 'incremental'
+    if args.network:
+        return 'network'
+    if args.stream:
+        return 'stream'
+    if args.snapshot:
+        return 'snapshot'
+    return 'dom'
+
+
 def main():
     """Ana fonksiyon."""
     parser = argparse.ArgumentParser(description='Toplu işletme tarama ve yorum toplama')
@@ -425,21 +1285,46 @@ def main():
     parser.add_argument('--collect', action='store_true', help='Toplama modu: bekleyen yorumları topla')
     parser.add_argument('--status', action='store_true', help='Bekleyen işletmelerin durumunu göster')
     parser.add_argument('--retry-failed', action='store_true', help='Başarısız işletmeleri tekrar dene')
+    parser.add_argument('--report', action='store_true', help='Aşama sürelerinin p50/p95 raporunu göster')
+    parser.add_argument('--days', type=int, help='--report için sadece son N gün')
     parser.add_argument('--limit', type=int, help='Maksimum işlenecek işletme sayısı')
+    parser.add_argument('--workers', type=int, default=1, help='Toplama ve karo keşfi modunda paralel tarayıcı sayısı')
+    parser.add_argument('--tiled', action='store_true', help='Keşfi bölgeyi harita karelerine bölerek yap')
+    parser.add_argument('--bbox', type=str, help='Karo keşfi bölgesi: "güney,batı,kuzey,doğu"')
+    parser.add_argument('--radius-km', type=float, default=TILE_DEFAULT_RADIUS_KM, help='--bbox yoksa ilçe merkezi etrafındaki yarıçap')
+    parser.add_argument('--stream', action='store_true', help='Yorumları scroll sırasında parça parça kaydet (düşük bellek)')
+    parser.add_argument('--network', action='store_true', help='Yorumları DOM yerine ağ yanıtlarından çöz')
+    parser.add_argument('--incremental', action='store_true', help='Sadece yeni yorumları topla (en yeniden başla, bilinenlere gelince dur)')
+    parser.add_argument('--snapshot', action='store_true', help='Yorum panelini tek HTML olarak al ve lxml ile ayrıştır')
+    parser.add_argument('--pipeline', action='store_true', help='Ayrıştırma ve kaydı arka planda yap, tarayıcı hemen sonraki işletmeye geçsin (yedek tarayıcı hazır tutulur)')
     parser.add_argument('--headless', action='store_true', help='Headless modda çalıştır')
+    parser.add_argument('--lean', action='store_true', help='Resim, font, harita karosu ve medyayı engelle (düşük bant genişliği/bellek)')
     
     args = parser.parse_args()
     
-    if not any([args.discover, args.collect, args.status, args.retry_failed]):
+    bbox = None
+    if args.bbox:
+        try:
+            bbox = parse_bbox(args.bbox)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.workers < 1:
+        parser.error("--workers en az 1 olmalı")
+    
+    if not any([args.discover, args.collect, args.status, args.retry_failed, args.report]):
         parser.print_help()
         print("\nÖrnek kullanımlar:")
         print("  python batch_scraper.py --discover 'eczane bartın merkez'")
+        print("  python batch_scraper.py --discover 'eczane bartın merkez' --tiled --workers 4")
         print("  python batch_scraper.py --collect --limit 5")
+        print("  python batch_scraper.py --collect --workers 4 --headless")
         print("  python batch_scraper.py --retry-failed --collect")
         print("  python batch_scraper.py --status")
+        print("  python batch_scraper.py --report --days 7")
         return
     
     driver = None
+    supervisor = None
     db_connection = None
     
     try:
@@ -448,14 +1333,19 @@ def main():
             print("Veritabanı bağlantısı kurulamadı!")
             return
         
-        # Tabloları oluştur
-        ensure_batch_tables(db_connection)
+        # Bekleyen şema geçişlerini uygula
+        run_migrations(db_connection)
         
         # Sadece durum gösterme
         if args.status:
             show_pending_status(db_connection)
             return
         
+        # Aşama süreleri raporu
+        if args.report:
+            print_scrape_report(db_connection, args.days)
+            return
+        
         # Başarısızları tekrar dene
         if args.retry_failed:
             retry_failed_businesses(db_connection)
@@ -465,8 +1355,16 @@ def main():
             os.environ['HEADLESS_MODE'] = 'true'
         
         # Keşif modu
-        if args.discover:
-            driver = chrome_driver_baslat(headless=args.headless)
+        if args.discover and args.tiled:
+            found = discover_businesses_tiled(
+                args.discover, db_connection, args.workers, args.headless, args.lean, bbox, args.radius_km
+            )
+            print(f"\n{'='*60}")
+            print(f"KEŞİF TAMAMLANDI!")
+            print(f"Bulunan işletme: {found}")
+            print(f"{'='*60}")
+        elif args.discover:
+            driver = chrome_driver_baslat(headless=args.headless, lean=args.lean)
             found = discover_businesses(driver, args.discover, db_connection)
             print(f"\n{'='*60}")
             print(f"KEŞİF TAMAMLANDI!")
@@ -475,8 +1373,18 @@ def main():
         
         # Toplama modu
         if args.collect:
-            driver = chrome_driver_baslat(headless=args.headless)
-            stats = collect_pending_reviews(driver, db_connection, args.limit)
+            mode = _collect_mode(args)
+            if args.workers > 1:
+                stats = collect_pending_reviews_parallel(
+                    args.workers, args.headless, args.limit, mode, args.lean, args.pipeline
+                )
+            else:
+                supervisor = DriverSupervisor(
+                    headless=args.headless, network_capture=(mode == 'network'), lean=args.lean, spare=args.pipeline
+                )
+                stats = collect_pending_reviews(supervisor, db_connection, args.limit, mode, args.pipeline)
+                if supervisor.restarts:
+                    print(f"Tarayıcı {supervisor.restarts} kez yeniden başlatıldı.")
             print(f"\n{'='*60}")
             print(f"TOPLAMA TAMAMLANDI!")
             print(f"İşlenen: {stats['processed']}")
@@ -495,6 +1403,8 @@ def main():
             print("\nTarayıcı kapanıyor...")
             time.sleep(2)
             driver.quit()
+        if supervisor:
+            supervisor.quit()
         if db_connection and db_connection.is_connected():
             db_connection.close()
             print("MySQL bağlantısı kapatıldı.")
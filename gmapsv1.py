@@ -5,6 +5,11 @@ Google Maps Yorum Toplama Scripti
 Kullanım:
     python gmapsv1.py
     python gmapsv1.py --headless
+    python gmapsv1.py --stream
+    python gmapsv1.py --network
+    python gmapsv1.py --incremental
+    python gmapsv1.py --snapshot
+    python gmapsv1.py --headless --lean
 """
 import sys
 import os
@@ -16,8 +21,9 @@ import argparse
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
-from utils import ISLETME_ADI_TAM_SORGUSU, connect_to_mysql, get_or_create_business, chrome_driver_baslat
-from scraper import isletme_ara, yorumlari_yukle, devamini_oku_tikla, yorumlari_cek_ve_kaydet
+from utils import ISLETME_ADI_TAM_SORGUSU, connect_to_mysql, get_or_create_business, chrome_driver_baslat, report_network_stats
+from utils.migrate import run_migrations
+from scraper import isletme_ara, yorumlari_topla
 
 
 def parse_business_query(query):
@@ -32,7 +38,7 @@ def parse_business_query(query):
     return business_name, city, district
 
 
-def main():
+def main(mode='dom', lean=False):
     """Ana fonksiyon."""
     driver = None
     db_connection = None
@@ -46,12 +52,17 @@ def main():
         
         print(f"İşletme: '{business_name}', Şehir: '{city}', İlçe: '{district}'")
         
-        driver = chrome_driver_baslat(headless=os.environ.get('HEADLESS_MODE') == 'true')
+        driver = chrome_driver_baslat(
+            headless=os.environ.get('HEADLESS_MODE') == 'true',
+            network_capture=(mode == 'network'),
+            lean=lean
+        )
         db_connection = connect_to_mysql()
         
         if not db_connection:
             print("Veritabanı bağlantısı kurulamadı!")
             sys.exit(1)
+        run_migrations(db_connection)
         
         business_id = get_or_create_business(db_connection, business_name, city, district)
         if not business_id:
@@ -62,11 +73,8 @@ def main():
             print("İşletme araması başarısız!")
             return
         
-        yorumlari_yukle(driver)
-        devamini_oku_tikla(driver)
-        time.sleep(2)
-        
-        total_added = yorumlari_cek_ve_kaydet(driver, db_connection, business_id)
+        total_added = yorumlari_topla(driver, db_connection, business_id, mode)
+        report_network_stats(driver)
         
         elapsed = time.time() - start_time
         print(f"\n{'='*50}")
@@ -94,9 +102,25 @@ def main():
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Google Maps yorum toplama')
     parser.add_argument('--headless', action='store_true', help='Headless modda çalıştır')
+    parser.add_argument('--lean', action='store_true', help='Resim, font, harita karosu ve medyayı engelle (düşük bant genişliği/bellek)')
+    parser.add_argument('--stream', action='store_true', help='Yorumları scroll sırasında parça parça kaydet (düşük bellek)')
+    parser.add_argument('--network', action='store_true', help='Yorumları DOM yerine ağ yanıtlarından çöz')
+    parser.add_argument('--incremental', action='store_true', help='Sadece yeni yorumları topla (en yeniden başla, bilinenlere gelince dur)')
+    parser.add_argument('--snapshot', action='store_true', help='Yorum panelini tek HTML olarak al ve lxml ile ayrıştır')
     args = parser.parse_args()
     
     if args.headless:
         os.environ['HEADLESS_MODE'] = 'true'
     
-    main()
\ No newline at end of file
+    if args.incremental:
+        mode = 'incremental'
+    elif args.network:
+        mode = 'network'
+    elif args.stream:
+        mode = 'stream'
+    elif args.snapshot:
+        mode = 'snapshot'
+    else:
+        mode = 'dom'
+    
+    main(mode=mode, lean=args.lean)
\ No newline at end of file
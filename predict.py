@@ -16,7 +16,7 @@ warnings.filterwarnings('ignore')
 
 import numpy as np
 from scipy.sparse import hstack
-from utils import get_db_connection
+from utils import get_db_connection, bulk_update
 
 
 def load_model():
@@ -99,8 +99,10 @@ def predict_unlabeled_comments(model, vectorizer, label_encoder):
         print("Etiketsiz yorum bulunamadı.")
         return
     
+    cursor.close()
+    
     # Tahmin yap
-    updated = 0
+    predictions = []
     for comment in unlabeled:
         try:
             pred_label, _ = predict_single(
@@ -108,21 +110,13 @@ def predict_unlabeled_comments(model, vectorizer, label_encoder):
                 comment['rating'],
                 model, vectorizer, label_encoder
             )
-            
-            # Veritabanını güncelle
-            cursor.execute("""
-                UPDATE comments
-                SET sentiment = %s
-                WHERE id = %s
-            """, (pred_label, comment['id']))
-            
-            updated += 1
+            predictions.append((comment['id'], pred_label))
             
         except Exception as e:
             print(f"Hata (ID: {comment['id']}): {e}")
     
-    conn.commit()
-    cursor.close()
+    # Veritabanını toplu güncelle
+    updated = bulk_update(conn, 'comments', ('sentiment',), predictions)
     conn.close()
     
     print(f"✓ {updated} yorum etiketlendi.")
@@ -23,7 +23,8 @@ import io
 # Windows console encoding fix
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
 
-from utils import get_db_connection
+from utils import get_db_connection, bulk_update, bulk_delete, BULK_WRITE_CHUNK_SIZE
+from utils.migrate import run_migrations
 
 # Google Maps ölçüt kalıpları - Türkçe
 # Format: (başlık, değer) çiftleri veya tek satır değerler
@@ -340,6 +341,58 @@ def clean_text(text):
     return text.strip()
 
 
+def remove_duplicate_comments(conn):
+    """
+    Aynı işletmede aynı kullanıcı ve metne sahip kopyalardan en eskisini tutar.
+    
+    review_key ekleme sırasında ham metinden üretilir, önişleme onu değiştirmez.
+    Ancak anahtarı önişlenmiş metinden geriye dönük üretilmiş eski satırlar ham
+    metinle eşleşmez; yeniden toplanan yorum yeni satır olarak girer ve ancak
+    önişlemeden sonra metni aynılaşınca burada yakalanır. Silinen en yeni
+    kopyanın review_key'i tutulan satıra aktarılır, böylece sonraki taramalar
+    tutulan satırla eşleşir ve kopya tekrar oluşmaz.
+    
+    Silme ve anahtar aktarımı tek işlemde yapılır; yarıda kalırsa geri alınır.
+    """
+    cursor = conn.cursor()
+    try:
+        # Gruplama Python'da yapılır (GROUP_CONCAT 1024 baytta kesilir)
+        cursor.execute("""
+            SELECT id, business_id, username, MD5(comment_text), review_key
+            FROM comments
+            ORDER BY id
+        """)
+        groups = {}
+        for comment_id, business_id, username, text_hash, key in cursor.fetchall():
+            groups.setdefault((business_id, username, text_hash), []).append((comment_id, key))
+        
+        delete_ids = []
+        key_moves = []
+        for rows in groups.values():
+            if len(rows) < 2:
+                continue
+            delete_ids.extend(comment_id for comment_id, _ in rows[1:])  # En eski ID'yi tut
+            if rows[-1][1] is not None:
+                key_moves.append((bytes(rows[-1][1]), rows[0][0]))
+        
+        # Tekil indeks çakışmasın diye önce kopyalar silinir, sonra anahtar aktarılır
+        for start in range(0, len(delete_ids), BULK_WRITE_CHUNK_SIZE):
+            chunk = delete_ids[start:start + BULK_WRITE_CHUNK_SIZE]
+            cursor.execute(
+                f"DELETE FROM comments WHERE id IN ({', '.join(['%s'] * len(chunk))})",
+                chunk
+            )
+        if key_moves:
+            cursor.executemany("UPDATE IGNORE comments SET review_key = %s WHERE id = %s", key_moves)
+        conn.commit()
+        return len(delete_ids)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
 def preprocess_comments():
     """Yorumları gelişmiş yöntemlerle ön işler."""
     print("=" * 60)
@@ -360,30 +413,9 @@ def preprocess_comments():
     try:
         cursor = conn.cursor()
 
-        # 0. Duplicate yorumları sil (aynı business_id, username, comment_text)
-        print("Duplicate yorumlar kontrol ediliyor...")
-        cursor.execute("""
-            SELECT business_id, username, comment_text, GROUP_CONCAT(id) as ids
-            FROM comments
-            GROUP BY business_id, username, comment_text
-            HAVING COUNT(*) > 1
-        """)
-        duplicates = cursor.fetchall()
-        
-        duplicate_deleted = 0
-        for business_id, username, comment_text, ids in duplicates:
-            id_list = [int(x) for x in ids.split(',')]
-            keep_id = min(id_list)  # En eski ID'yi tut
-            delete_ids = [x for x in id_list if x != keep_id]
-            for del_id in delete_ids:
-                cursor.execute("DELETE FROM comments WHERE id = %s", (del_id,))
-                duplicate_deleted += 1
-        
-        if duplicate_deleted > 0:
-            conn.commit()
-            print(f"  ✓ {duplicate_deleted} duplicate yorum silindi.")
-        else:
-            print("  ○ Duplicate yorum bulunamadı.")
+        # Kopyalar kayıt sırasında (business_id, review_key) tekil indeksiyle engellenir;
+        # geriye dönük anahtarlanmış eski satırların kopyaları aşağıda 8. adımda silinir
+        run_migrations(conn)
 
         # Tüm yorumları çek (rating dahil)
         cursor.execute("SELECT id, comment_text, rating FROM comments")
@@ -393,6 +425,7 @@ def preprocess_comments():
             'total': len(comments),
             'updated': 0,
             'deleted': 0,
+            'duplicates': 0,
             'metric_processed': 0,
             'rating_added': 0,
             'already_has_rating': 0,
@@ -403,6 +436,10 @@ def preprocess_comments():
             'metric': [],
             'updated': []
         }
+        
+        # Değişiklikler döngüden sonra toplu yazılır
+        updates = []
+        deletions = []
 
         for comment_id, original_text, rating in comments:
             text = original_text or ""
@@ -454,16 +491,21 @@ def preprocess_comments():
             # 6. Tamamen boş mu? (rating da yoksa sil)
             final_check = re.sub(r'\[\d yıldız - .*?\]', '', text).strip()
             if not final_check and not rating:
-                cursor.execute("DELETE FROM comments WHERE id = %s", (comment_id,))
+                deletions.append(comment_id)
                 stats['deleted'] += 1
                 continue
             
             # 7. Değişiklik olduysa güncelle
             if text != original_text:
-                cursor.execute("UPDATE comments SET comment_text = %s WHERE id = %s", (text, comment_id))
+                updates.append((comment_id, text))
                 stats['updated'] += 1
 
-        conn.commit()
+        bulk_update(conn, 'comments', ('comment_text',), updates)
+        bulk_delete(conn, 'comments', deletions)
+        
+        # 8. Önişlemeyle aynılaşan kopyaları sil
+        print("Duplicate yorumlar kontrol ediliyor...")
+        stats['duplicates'] = remove_duplicate_comments(conn)
         
         # Sonuç raporu
         print("=" * 60)
@@ -479,6 +521,7 @@ def preprocess_comments():
         print(f"  ✓ Anlamsız yorum düzeltilen: {stats['meaningless_fixed']}")
         print(f"  ○ Zaten yıldız bilgisi olan: {stats['already_has_rating']}")
         print(f"  ✗ Silinen boş yorum: {stats['deleted']}")
+        print(f"  ✗ Silinen duplicate yorum: {stats['duplicates']}")
         
         if examples['metric']:
             print()
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Kayıtlı HTML Anlık Görüntülerini Yeniden Ayrıştırma
+
+SNAPSHOT_STORE=true ile toplanan yorum paneli HTML'lerini güncel parser ile
+yeniden işler ve sonuçları veritabanına birleştirir (yeni yorumlar eklenir,
+kesik kalmış metinler güncellenir). Tarayıcı açılmaz; ayrıştırma paralel
+süreçlerde yapılır, yazma tek bağlantı üzerinden sırayla yapılır.
+
+Kullanım:
+    # Her işletmenin son anlık görüntüsü
+    python reparse_snapshots.py
+    
+    # Belirli işletmeler, tüm çalışmalar, 8 süreç
+    python reparse_snapshots.py --business-id 12 15 --all-runs --workers 8
+    
+    # Veritabanına yazmadan sadece ayrıştırma sonuçlarını göster
+    python reparse_snapshots.py --dry-run
+"""
+import os
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from utils import get_db_connection, upsert_comments, list_snapshots, load_snapshot, parse_reviews_html, SNAPSHOT_DIR
+from utils.migrate import run_migrations
+
+
+def _parse_snapshot(business_id, run_id, digest):
+    """Alt süreçte anlık görüntüyü okuyup ayrıştırır."""
+    return business_id, run_id, parse_reviews_html(load_snapshot(digest))
+
+
+def reparse_snapshots(db_connection, business_ids=None, latest_only=True, workers=None, dry_run=False):
+    """
+    Depodaki anlık görüntüleri paralel ayrıştırıp veritabanına birleştirir.
+    
+    Returns:
+        dict: snapshots, parsed, inserted, updated, failed sayıları
+    """
+    snapshots = list_snapshots(business_ids, latest_only)
+    stats = {'snapshots': len(snapshots), 'parsed': 0, 'inserted': 0, 'updated': 0, 'failed': 0}
+    if not snapshots:
+        print(f"Anlık görüntü bulunamadı: {SNAPSHOT_DIR}")
+        return stats
+    
+    print(f"{len(snapshots)} anlık görüntü ayrıştırılacak...")
+    start = time.time()
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_parse_snapshot, *snapshot): snapshot for snapshot in snapshots}
+        for future in as_completed(futures):
+            business_id, run_id, digest = futures[future]
+            try:
+                _, _, reviews = future.result()
+            except Exception as e:
+                print(f"  [{business_id}/{run_id}] Ayrıştırılamadı: {e}")
+                stats['failed'] += 1
+                continue
+            
+            stats['parsed'] += len(reviews)
+            if dry_run:
+                print(f"  [{business_id}/{run_id}] {len(reviews)} yorum")
+                continue
+            
+            inserted, updated = upsert_comments(db_connection, business_id, reviews)
+            stats['inserted'] += inserted
+            stats['updated'] += updated
+            print(f"  [{business_id}/{run_id}] {len(reviews)} yorum: {inserted} eklendi, {updated} güncellendi")
+    
+    print(f"\nSüre: {time.time() - start:.1f}s")
+    return stats
+
+
+def main():
+    """Ana fonksiyon."""
+    parser = argparse.ArgumentParser(description='Kayıtlı yorum paneli HTML anlık görüntülerini yeniden ayrıştır')
+    parser.add_argument('--business-id', type=int, nargs='+', help='Sadece bu işletmeler')
+    parser.add_argument('--all-runs', action='store_true', help='Son çalışma yerine tüm çalışmaları işle')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Paralel ayrıştırma süreci sayısı')
+    parser.add_argument('--dry-run', action='store_true', help='Veritabanına yazma')
+    args = parser.parse_args()
+    
+    try:
+        import lxml  # noqa: F401
+    except ImportError:
+        print("HATA: lxml kurulu değil (pip install lxml)")
+        return
+    
+    db_connection = None
+    if not args.dry_run:
+        db_connection = get_db_connection()
+        if not db_connection:
+            print("HATA: Veritabanı bağlantısı kurulamadı!")
+            return
+        run_migrations(db_connection)
+    
+    try:
+        stats = reparse_snapshots(
+            db_connection, args.business_id, not args.all_runs, args.workers, args.dry_run
+        )
+        print("=" * 60)
+        print(f"Anlık görüntü: {stats['snapshots']} (hatalı: {stats['failed']})")
+        print(f"Ayrıştırılan yorum: {stats['parsed']}")
+        print(f"Eklenen: {stats['inserted']}, güncellenen: {stats['updated']}")
+        print("=" * 60)
+    finally:
+        if db_connection and db_connection.is_connected():
+            db_connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,87 +3,146 @@
 Web scraping modülü.
 Google Maps'te arama, scroll ve yorum toplama fonksiyonları.
 """
+import re
 import time
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException, WebDriverException
 
 from utils import (
     SCROLL_PAUSE_TIME, 
+    SCROLL_MIN_WAIT_TIME,
     MAX_NO_NEW_REVIEWS_SCROLLS, 
-    CLICK_MORE_BUTTONS_LIMIT,
+    EXPAND_MAX_PASSES,
     REVIEW_SELECTORS,
     SEARCH_RESULT_SELECTORS,
+    BULK_EXTRACTION,
+    NAV_STATE_BUDGETS,
+    INCREMENTAL_KNOWN_STREAK,
+    SNAPSHOT_STORE,
     parse_review,
-    get_existing_comment_signatures,
+    parse_reviews_bulk,
+    parse_reviews_html,
+    network_harvester,
+    ordered_selectors,
+    record_selector_hit,
+    save_snapshot,
+    current_run_id,
+    timed,
+    add_phase_time,
+    count_metric,
+    get_existing_review_keys,
+    review_key,
+    signature_key,
     save_comments_batch
 )
 
 
 def isletme_ara(driver, isletme_adi_tam_sorgusu, business_name):
-    """Google Maps'te işletmeyi arar ve yorumlar sekmesini açar."""
+    """
+    Google Maps'te işletmeyi arar ve yorumlar sekmesini açar.
+    
+    Navigasyon bir durum makinesi olarak ilerler: sayfa yüklenince tek bir
+    birleşik bekleme consent / işletme sayfası / sonuç listesi / yorumlar
+    durumlarından hangisinin geldiğini tespit eder. Her geçişin NAV_STATE_BUDGETS
+    içinde bir süre bütçesi vardır ve her durumda geçen süre loglanır.
+    """
     import urllib.parse
     
     # Direkt arama URL'si ile git (daha güvenilir)
     encoded_query = urllib.parse.quote(isletme_adi_tam_sorgusu)
     search_url = f"https://www.google.com/maps/search/{encoded_query}"
     print(f"Google Maps arama URL'sine gidiliyor: {search_url}")
-    driver.get(search_url)
-    time.sleep(8)  # VPS'te daha uzun bekleme
+    return _navigate(driver, search_url, business_name)
+
+
+def isletme_sayfasina_git(driver, place_url, business_name):
+    """
+    Keşifte kaydedilen yer bağlantısına doğrudan gidip yorumlar sekmesini açar.
     
-    # Consent/cookie popup varsa kabul et
-    try:
-        consent_btns = driver.find_elements(By.XPATH, 
-            "//button[contains(., 'Kabul') or contains(., 'Accept') or contains(., 'Tümünü kabul') or contains(., 'Agree')]")
-        if consent_btns:
-            consent_btns[0].click()
-            print("Çerez popup'ı kabul edildi.")
-            time.sleep(3)
-            driver.get(search_url)
-            time.sleep(8)
-    except:
-        pass
+    Arama, sonuç listesi ve isim eşleştirme adımları atlanır; sayfa yine
+    isletme_ara ile aynı durum makinesinden geçer (consent -> place -> reviews).
+    """
+    print(f"Yer bağlantısına gidiliyor: {place_url}")
+    return _navigate(driver, place_url, business_name)
+
+
+def place_id_from_url(url):
+    """Google Maps yer bağlantısındaki yer kimliğini (0x...:0x...) döndürür."""
+    match = re.search(r'!1s(0x[0-9a-f]+:0x[0-9a-f]+)', url or '')
+    return match.group(1) if match else None
+
+
+# Navigasyon durumlarının tarama metriklerindeki aşamaları
+_NAV_PHASES = {
+    'load': 'search',
+    'results': 'search',
+    'consent': 'consent',
+    'place': 'reviews_tab',
+    'reviews': 'reviews_tab',
+}
+
+
+def _navigate(driver, url, business_name):
+    """URL'yi açar ve isletme_ara durum makinesini yorumlar sekmesine kadar yürütür."""
+    state = 'load'
+    consent_accepted = False
+    timings = []
     
     try:
-        print(f"Arama sonuçları bekleniyor...")
+        with timed('search'):
+            driver.get(url)
         
-        # Eğer URL zaten /maps/place/ içeriyorsa direkt işletme sayfasındayız
-        current_url = driver.current_url
-        if "/maps/place/" in current_url:
-            print("Direkt işletme sayfasına yönlendirildi.")
-            time.sleep(3)
-            # Önce Yorumlar sekmesine tıklamayı dene
-            if _try_click_reviews_button(driver, timeout=5):
-                return True
-            # Buton bulunamazsa zaten genel bakış sayfasındayız, yorumlar burada
-            print("Yorumlar sekmesi bulunamadı, genel bakış sayfasından yorumlar çekilecek.")
-            return True  # Yine de devam et, yorumlar genel bakışta görünüyor
-
+        while state not in ('done', 'failed'):
+            started = time.time()
+            
+            if state == 'load':
+                next_state = _wait_for_page_state(
+                    driver, ('consent', 'reviews', 'place', 'results'), NAV_STATE_BUDGETS['load']
+                )
+                if not next_state:
+                    print("HATA: Sayfa beklenen durumlardan birine gelmedi.")
+                    next_state = 'failed'
+            
+            elif state == 'consent':
+                if consent_accepted or not _accept_consent(driver):
+                    next_state = 'failed'
+                else:
+                    consent_accepted = True
+                    print("Çerez popup'ı kabul edildi.")
+                    driver.get(url)
+                    next_state = 'load'
+            
+            elif state == 'results':
+                next_state = _open_business_from_results(driver, business_name)
+            
+            elif state == 'place':
+                if _try_click_reviews_button(driver, timeout=NAV_STATE_BUDGETS['place']):
+                    next_state = 'reviews'
+                else:
+                    # Buton bulunamazsa genel bakış sayfasındayız, yorumlar burada
+                    print("Yorumlar sekmesi bulunamadı, genel bakış sayfasından yorumlar çekilecek.")
+                    next_state = 'done'
+            
+            elif state == 'reviews':
+                next_state = 'done'
+            
+            elapsed = time.time() - started
+            timings.append((state, elapsed))
+            add_phase_time(_NAV_PHASES[state], elapsed)
+            print(f"  [nav] {state} -> {next_state} ({elapsed:.2f}s)")
+            state = next_state
         
-        # Önce yorumlar butonunu dene (tek sonuç varsa direkt açılır)
-        if _try_click_reviews_button(driver):
-            return True
+        total = sum(elapsed for _, elapsed in timings)
+        print(f"Arama süresi: {total:.2f}s (" + ", ".join(f"{s}={e:.2f}s" for s, e in timings) + ")")
         
-        # Birden fazla sonuç varsa listeden seç
-        target_business = _find_business_in_results(driver, business_name)
-        if not target_business:
-            print("İlk denemede bulunamadı, bekleniyor...")
-            time.sleep(6)
-            target_business = _find_business_in_results(driver, business_name)
-            
-        if not target_business:
-            print(f"HATA: '{business_name}' işletmesi bulunamadı!")
+        if state == 'failed':
             print(f"Mevcut URL: {driver.current_url}")
             print(f"Sayfa başlığı: {driver.title}")
             return False
-        
-        print(f"Seçilen işletme: '{target_business['name']}'")
-        driver.execute_script("arguments[0].click();", target_business['element'])
-        time.sleep(5)
-        
-        return _try_click_reviews_button(driver, timeout=15)
+        return True
         
     except Exception as e:
         print(f"Arama sırasında hata: {e}")
@@ -92,35 +151,110 @@ def isletme_ara(driver, isletme_adi_tam_sorgusu, business_name):
         return False
 
 
-def _try_click_reviews_button(driver, timeout=5):
-    """Yorumlar butonuna tıklamayı dener."""
-    xpaths = [
-        "//button[contains(@aria-label, 'Yorumlar')]",
-        "//button[contains(@aria-label, 'Reviews')]",
-        "//button[.//span[contains(text(), 'Yorumlar')]]",
-        "//button[.//span[contains(text(), 'Reviews')]]",
-        "//div[@role='tab'][contains(., 'Yorumlar')]",
-        "//div[@role='tab'][contains(., 'Reviews')]",
-    ]
-    for xpath in xpaths:
-        try:
-            btn = WebDriverWait(driver, timeout).until(
-                EC.element_to_be_clickable((By.XPATH, xpath))
-            )
-            btn.click()
-            time.sleep(3)
-            print(f"Yorumlar butonuna tıklandı: {xpath}")
+# Sayfanın navigasyon durumunu tek çağrıda tespit eder
+_PAGE_STATE_JS = """
+const reviewXPath = arguments[0];
+const reviewsTabXPath = arguments[1];
+const consentXPath = arguments[2];
+
+function exists(xp) {
+    return document.evaluate(xp, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue !== null;
+}
+
+if (location.hostname.startsWith('consent.') || exists(consentXPath)) return 'consent';
+if (exists("(" + reviewsTabXPath + ")[@aria-selected='true']") && exists(reviewXPath)) return 'reviews';
+if (location.pathname.includes('/maps/place/') || exists(reviewsTabXPath) || document.querySelector('h1.DUwDvf')) return 'place';
+if (document.querySelector("div[role='feed'], div.Nv2PK")) return 'results';
+return null;
+"""
+
+_CONSENT_XPATH = "//button[contains(., 'Kabul') or contains(., 'Accept') or contains(., 'Tümünü kabul') or contains(., 'Agree')]"
+
+# Yorumlar sekmesinin tüm varyantları tek XPath union'ında
+_REVIEWS_TAB_XPATH = (
+    "//button[contains(@aria-label, 'Yorumlar') or contains(@aria-label, 'Reviews')"
+    " or .//span[contains(text(), 'Yorumlar') or contains(text(), 'Reviews')]]"
+    " | //div[@role='tab'][contains(., 'Yorumlar') or contains(., 'Reviews')]"
+)
+
+
+def _review_selector():
+    """Yorum elementleri için şu an en çok isabet alan selector."""
+    return ordered_selectors('review', REVIEW_SELECTORS, probe=False)[0]
+
+
+def _wait_for_page_state(driver, states, timeout):
+    """Sayfa verilen durumlardan birine gelene kadar bekler, durumu döndürür (yoksa None)."""
+    review_selector = _review_selector()
+    
+    def probe(d):
+        state = d.execute_script(_PAGE_STATE_JS, review_selector, _REVIEWS_TAB_XPATH, _CONSENT_XPATH)
+        return state if state in states else False
+    
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=0.25).until(probe)
+    except TimeoutException:
+        return None
+
+
+def _accept_consent(driver):
+    """Consent/cookie popup'ını kabul eder."""
+    try:
+        consent_btns = driver.find_elements(By.XPATH, _CONSENT_XPATH)
+        if consent_btns:
+            consent_btns[0].click()
             return True
-        except TimeoutException:
-            continue
+    except Exception:
+        pass
     return False
 
 
+def _open_business_from_results(driver, business_name):
+    """Sonuç listesinden işletmeyi seçer ve işletme sayfasının açılmasını bekler."""
+    # Liste geç dolabilir: sabit uyku yerine eşleşme bulunana kadar yokla
+    try:
+        target_business = WebDriverWait(driver, NAV_STATE_BUDGETS['results'], poll_frequency=0.5).until(
+            lambda d: _find_business_in_results(d, business_name) or False
+        )
+    except TimeoutException:
+        print(f"HATA: '{business_name}' işletmesi bulunamadı!")
+        return 'failed'
+    
+    print(f"Seçilen işletme: '{target_business['name']}'")
+    driver.execute_script("arguments[0].click();", target_business['element'])
+    
+    if _wait_for_page_state(driver, ('reviews', 'place'), NAV_STATE_BUDGETS['place']):
+        return 'place'
+    print("HATA: İşletme sayfası açılmadı.")
+    return 'failed'
+
+
+def _try_click_reviews_button(driver, timeout=5):
+    """Yorumlar butonuna tıklamayı dener, yorumlar yüklenene kadar bekler."""
+    try:
+        btn = WebDriverWait(driver, timeout).until(
+            EC.element_to_be_clickable((By.XPATH, _REVIEWS_TAB_XPATH))
+        )
+    except TimeoutException:
+        return False
+    
+    btn.click()
+    print("Yorumlar butonuna tıklandı.")
+    try:
+        WebDriverWait(driver, NAV_STATE_BUDGETS['reviews']).until(
+            EC.presence_of_element_located((By.XPATH, _review_selector()))
+        )
+    except TimeoutException:
+        pass
+    return True
+
+
 def _find_business_in_results(driver, business_name):
     """Arama sonuçlarından doğru işletmeyi bulur."""
     search_results = []
+    missed = []
     
-    for selector in SEARCH_RESULT_SELECTORS:
+    for selector in ordered_selectors('search_result', SEARCH_RESULT_SELECTORS):
         try:
             elements = driver.find_elements(By.XPATH, selector)
             for elem in elements:
@@ -140,7 +274,9 @@ def _find_business_in_results(driver, business_name):
                 except:
                     continue
             if search_results:
+                record_selector_hit('search_result', selector, missed)
                 break
+            missed.append(selector)
         except:
             continue
     
@@ -153,54 +289,155 @@ def _find_business_in_results(driver, business_name):
     return None
 
 
-def yorumlari_yukle(driver):
-    """Yorumları scroll yaparak yükler."""
+def yorumlari_yukle(driver, on_batch=None, harvester=None):
+    """
+    Yorumları scroll yaparak yükler.
+    
+    Args:
+        driver: Selenium WebDriver
+        on_batch: Verilirse streaming mod; her scroll'da yeni gelen yorumlar
+            ayrıştırılıp bu fonksiyona liste olarak verilir ve DOM'dan boşaltılır.
+            on_batch True döndürürse scroll erken durdurulur
+        harvester: Yeni yorumları DOM yerine başka kaynaktan okuyan fonksiyon
+            (ör. network_harvester()); verilirse "Diğer" butonlarına tıklanmaz
+    """
     print("Yorumlar yükleniyor...")
     
-    try:
-        if not _wait_for_reviews(driver):
-            print("HATA: Yorumlar bulunamadı.")
-            return
-        
-        scrollable_container = _find_scrollable_container(driver)
-        
-        previous_count = 0
-        no_new_reviews_count = 0
-        scroll_count = 0
-        
-        print(f"Scroll başlıyor... Max {MAX_NO_NEW_REVIEWS_SCROLLS} boş scroll sonrası duracak.")
-        
-        while no_new_reviews_count < MAX_NO_NEW_REVIEWS_SCROLLS:
-            _click_more_buttons(driver)
-            current_count = len(driver.find_elements(By.XPATH, REVIEW_SELECTORS[0]))
-            _scroll_down(driver, scrollable_container)
+    with timed('scroll'):
+        try:
+            if not _wait_for_reviews(driver):
+                print("HATA: Yorumlar bulunamadı.")
+                return
+            
+            scrollable_container = _find_scrollable_container(driver)
+            driver.set_script_timeout(SCROLL_PAUSE_TIME + 5)
             
-            scroll_count += 1
-            if scroll_count % 5 == 0:
-                print(f"Scroll: {scroll_count} | Yorum: {current_count}")
+            previous_count = 0
+            no_new_reviews_count = 0
+            scroll_count = 0
+            wait_time = SCROLL_PAUSE_TIME
+            
+            print(f"Scroll başlıyor... Max {MAX_NO_NEW_REVIEWS_SCROLLS} boş scroll sonrası duracak.")
+            
+            while no_new_reviews_count < MAX_NO_NEW_REVIEWS_SCROLLS:
+                if harvester is None:
+                    yorumlari_genislet(driver)
+                if on_batch and _harvest_batch(driver, on_batch, harvester):
+                    print("Erken durdurma koşulu sağlandı, scroll bitiriliyor.")
+                    break
+                current_count, elapsed = _scroll_and_wait(driver, scrollable_container, previous_count, wait_time)
+                
+                scroll_count += 1
+                count_metric('scroll_iterations')
+                if scroll_count % 5 == 0:
+                    print(f"Scroll: {scroll_count} | Yorum: {current_count} | Bekleme: {wait_time:.1f}s")
+                
+                if current_count > previous_count:
+                    no_new_reviews_count = 0
+                    previous_count = current_count
+                    # Yeni yorumların gelme süresine göre bekleme süresini daralt
+                    wait_time = min(SCROLL_PAUSE_TIME, max(SCROLL_MIN_WAIT_TIME, elapsed * 3))
+                else:
+                    no_new_reviews_count += 1
+                    # Boş scroll'da sürenin üst sınıra dönmesine izin ver (yavaş ağ / liste sonu)
+                    wait_time = min(SCROLL_PAUSE_TIME, wait_time * 2)
             
-            if current_count > previous_count:
-                no_new_reviews_count = 0
-                previous_count = current_count
             else:
-                no_new_reviews_count += 1
-        
-        print(f"Toplam {scroll_count} scroll, {previous_count} yorum yüklendi.")
-        
-    except Exception as e:
-        print(f"Scroll hatası: {e}")
+                if on_batch:
+                    if harvester is None:
+                        yorumlari_genislet(driver)
+                    _harvest_batch(driver, on_batch, harvester)
+            
+            print(f"Toplam {scroll_count} scroll, {previous_count} yorum yüklendi.")
+            
+        except Exception as e:
+            print(f"Scroll hatası: {e}")
+
+
+def _harvest_batch(driver, on_batch, harvester=None):
+    """
+    Henüz işlenmemiş yorumları ayrıştırır, DOM'dan boşaltır ve on_batch'e verir.
+    
+    Returns:
+        bool: on_batch scroll'un durdurulmasını istediyse True
+    """
+    with timed('parse'):
+        if harvester:
+            reviews = harvester(driver)
+        else:
+            reviews = parse_reviews_bulk(driver, collapse=True)
+    if reviews:
+        count_metric('reviews_found', len(reviews))
+        return bool(on_batch(reviews))
+    return False
+
+
+# Container'ı kaydırır, yeni yorum node'u eklenene ya da süre dolana kadar
+# sayfa içinde bekler ve güncel yorum sayısını aynı çağrıda döndürür.
+_SCROLL_AND_WAIT_JS = """
+const container = arguments[0];
+const reviewXPath = arguments[1];
+const previousCount = arguments[2];
+const timeoutMs = arguments[3];
+const done = arguments[arguments.length - 1];
+
+function count() {
+    return document.evaluate('count(' + reviewXPath + ')', document, null,
+                             XPathResult.NUMBER_TYPE, null).numberValue;
+}
+
+const start = performance.now();
+let finished = false;
+let timer = null;
+const observer = new MutationObserver(() => {
+    if (count() > previousCount) finish();
+});
+
+function finish() {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    done([count(), (performance.now() - start) / 1000]);
+}
+
+observer.observe(container, {childList: true, subtree: true});
+timer = setTimeout(finish, timeoutMs);
+container.scrollTop = container.scrollHeight;
+if (count() > previousCount) finish();
+"""
+
+
+def _scroll_and_wait(driver, container, previous_count, wait_time):
+    """
+    Aşağı kaydırır ve yeni yorumlar gelene kadar (en fazla wait_time saniye) bekler.
+    
+    Returns:
+        (yorum sayısı, bekleme süresi saniye)
+    """
+    try:
+        count, elapsed = driver.execute_async_script(
+            _SCROLL_AND_WAIT_JS, container, _review_selector(), previous_count, int(wait_time * 1000)
+        )
+        return int(count), elapsed
+    except Exception:
+        # Async script çalışmazsa eski sabit beklemeli yönteme dön
+        _scroll_down(driver, container)
+        return len(driver.find_elements(By.XPATH, _review_selector())), SCROLL_PAUSE_TIME
 
 
 def _wait_for_reviews(driver):
     """İlk yorumların yüklenmesini bekler."""
-    for selector in REVIEW_SELECTORS:
+    missed = []
+    for selector in ordered_selectors('review', REVIEW_SELECTORS):
         try:
             WebDriverWait(driver, 5).until(
                 EC.presence_of_element_located((By.XPATH, selector))
             )
+            record_selector_hit('review', selector, missed)
             return True
         except TimeoutException:
-            continue
+            missed.append(selector)
     return False
 
 
@@ -239,88 +476,419 @@ def _scroll_down(driver, container):
     time.sleep(SCROLL_PAUSE_TIME)
 
 
-def _click_more_buttons(driver):
-    """'Diğer' butonlarına tıklar."""
-    try:
-        buttons = driver.find_elements(By.XPATH, "//button[@class='w8nwRe kyuRq']")
-        for btn in buttons[:CLICK_MORE_BUTTONS_LIMIT]:
-            try:
-                driver.execute_script("arguments[0].click();", btn)
-                time.sleep(0.1)
-            except StaleElementReferenceException:
-                pass
-    except:
-        pass
+# Kesik yorumları açan "Devamını oku" / "Daha Fazla" / "Diğer" butonları (açılmış olanlar hariç)
+_EXPAND_BUTTON_XPATH = (
+    "//button[contains(@class, 'w8nwRe')][not(@aria-expanded='true')]"
+    "[contains(@class, 'kyuRq') or contains(., 'Devamını oku') or contains(., 'Daha Fazla')"
+    " or contains(., 'Diğer') or contains(., 'More')]"
+)
 
+# Tüm genişletme butonlarına tek çağrıda tıklar; tıklamalar yeni buton
+# açtıysa kısa bir aradan sonra tekrar bakar, kalmayınca toplam sayıyı döndürür.
+_EXPAND_REVIEWS_JS = """
+const buttonXPath = arguments[0];
+const maxPasses = arguments[1];
+const done = arguments[arguments.length - 1];
 
-def devamini_oku_tikla(driver):
-    """'Devamını oku' butonlarına tıklar."""
-    print("'Devamını oku' butonlarına tıklanıyor...")
+const clicked = new WeakSet();
+let total = 0;
+let passes = 0;
+
+function pending() {
+    const r = document.evaluate(buttonXPath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    const out = [];
+    for (let i = 0; i < r.snapshotLength; i++) {
+        const b = r.snapshotItem(i);
+        if (!clicked.has(b)) out.push(b);
+    }
+    return out;
+}
+
+function pass() {
+    const buttons = pending();
+    if (!buttons.length || passes >= maxPasses) {
+        done(total);
+        return;
+    }
+    passes++;
+    for (const b of buttons) {
+        clicked.add(b);
+        try { b.click(); total++; } catch (e) {}
+    }
+    setTimeout(pass, 100);
+}
+
+pass();
+"""
+
+
+def yorumlari_genislet(driver):
+    """
+    Kesik yorumların tamamını tek bir async script çağrısıyla açar.
     
-    click_count = 0
-    for _ in range(5):
+    Returns:
+        int: Tıklanan buton sayısı
+    """
+    with timed('expand'):
         try:
-            buttons = driver.find_elements(
-                By.XPATH, 
-                "//button[contains(@class, 'w8nwRe') and (contains(., 'Daha Fazla') or contains(., 'Devamını oku'))]"
-            )
-            if not buttons:
-                break
-            
-            for btn in buttons:
+            return int(driver.execute_async_script(_EXPAND_REVIEWS_JS, _EXPAND_BUTTON_XPATH, EXPAND_MAX_PASSES))
+        except Exception:
+            # Async script çalışmazsa butonlara tek tek (beklemesiz) tıkla
+            click_count = 0
+            for btn in driver.find_elements(By.XPATH, _EXPAND_BUTTON_XPATH):
                 try:
                     driver.execute_script("arguments[0].click();", btn)
                     click_count += 1
                 except StaleElementReferenceException:
                     pass
-            time.sleep(1)
-        except:
-            break
-    
+            return click_count
+
+
+def devamini_oku_tikla(driver):
+    """'Devamını oku' butonlarına tıklar."""
+    print("'Devamını oku' butonlarına tıklanıyor...")
+    click_count = yorumlari_genislet(driver)
     print(f"{click_count} 'Devamını oku' butonuna tıklandı.")
 
 
-def yorumlari_cek_ve_kaydet(driver, db_connection, business_id):
-    """Yorumları çeker ve veritabanına kaydeder."""
+def yorumlari_cek_ve_kaydet(driver, db_connection, business_id, store_snapshot=SNAPSHOT_STORE, run_id=None):
+    """
+    Yorumları çeker ve veritabanına kaydeder.
+    
+    Args:
+        store_snapshot: True ise yorum paneli HTML'i önce anlık görüntü deposuna yazılır
+        run_id: Anlık görüntünün bağlanacağı tarama çalışması (None = bu süreç)
+    """
     print("Yorumlar çekiliyor...")
     
-    existing_signatures = get_existing_comment_signatures(db_connection, business_id)
-    print(f"Mevcut yorum sayısı: {len(existing_signatures)}")
+    if store_snapshot:
+        _store_snapshot(business_id, yorum_paneli_html(driver), run_id)
     
+    return _yorum_listesini_kaydet(db_connection, business_id, _parse_reviews_in_browser(driver))
+
+
+def _parse_reviews_in_browser(driver):
+    """Yüklü yorumları tarayıcıda ayrıştırır; yorum elementi yoksa None."""
+    with timed('parse'):
+        reviews = None
+        if BULK_EXTRACTION:
+            reviews = parse_reviews_bulk(driver)
+            if reviews:
+                print(f"{len(reviews)} yorum tek seferde ayrıştırıldı.")
+            else:
+                print("Toplu ayrıştırma sonuç vermedi, element bazlı parser kullanılıyor.")
+        
+        if not reviews:
+            reviews = _parse_review_elements(driver)
+    if reviews:
+        count_metric('reviews_found', len(reviews))
+    return reviews
+
+
+def _yorum_listesini_kaydet(db_connection, business_id, reviews):
+    """Ayrıştırılmış yorumlardan yeni olanları kaydeder; eklenen sayıyı döndürür."""
+    if reviews is None:
+        print("HATA: Yorum elementi bulunamadı!")
+        return 0
+    
+    comments_to_insert = _reviews_to_rows(reviews, business_id)
+    saved_count = save_comments_batch(db_connection, comments_to_insert)
+    print(f"Toplam {saved_count} yeni yorum eklendi.")
+    return saved_count
+
+
+def _parse_review_elements(driver):
+    """Yorumları element element ayrıştırır (toplu ayrıştırmanın yedeği)."""
     yorum_elementleri = None
-    for selector in REVIEW_SELECTORS:
+    missed = []
+    for selector in ordered_selectors('review', REVIEW_SELECTORS):
         try:
             yorum_elementleri = WebDriverWait(driver, 10).until(
                 EC.presence_of_all_elements_located((By.XPATH, selector))
             )
             if yorum_elementleri:
+                record_selector_hit('review', selector, missed)
                 print(f"{len(yorum_elementleri)} yorum bulundu.")
                 break
         except TimeoutException:
-            continue
+            missed.append(selector)
     
     if not yorum_elementleri:
-        print("HATA: Yorum elementi bulunamadı!")
-        return 0
+        return None
     
-    comments_to_insert = []
+    reviews = []
     for yorum_elem in yorum_elementleri:
         review_data = parse_review(yorum_elem)
-        if not review_data:
-            continue
-        
-        signature = (review_data['username'], review_data['rating'], review_data['text'])
-        if signature not in existing_signatures:
-            comments_to_insert.append((
-                business_id,
-                review_data['username'],
-                review_data['rating'],
-                review_data['date'],
-                review_data['text'],
-                review_data['likes']
-            ))
-            existing_signatures.add(signature)
+        if review_data:
+            reviews.append(review_data)
+    return reviews
+
+
+def _reviews_to_rows(reviews, business_id):
+    """Ayrıştırılmış yorumları insert satırlarına çevirir (kopyaları veritabanı eler)."""
+    return [
+        (
+            business_id,
+            review_data['username'],
+            review_data['rating'],
+            review_data['date'],
+            review_data['text'],
+            review_data['likes'],
+            review_data.get('review_id')
+        )
+        for review_data in reviews
+    ]
+
+
+def yorumlari_akisli_topla(driver, db_connection, business_id):
+    """
+    Yorumları scroll sırasında parça parça ayrıştırıp kaydeder (streaming mod).
+    
+    İşlenen yorum node'ları DOM'dan boşaltıldığı için tarayıcı belleği yorum
+    sayısıyla büyümez; tarama yarıda kesilirse o ana kadarki yorumlar kayıtlıdır.
+    
+    Returns:
+        int: Eklenen yorum sayısı
+    """
+    print("Yorumlar streaming modda toplanıyor...")
+    
+    saved = [0]
+    
+    def kaydet(reviews):
+        comments_to_insert = _reviews_to_rows(reviews, business_id)
+        saved[0] += save_comments_batch(db_connection, comments_to_insert)
+    
+    yorumlari_yukle(driver, on_batch=kaydet)
+    print(f"Toplam {saved[0]} yeni yorum eklendi.")
+    return saved[0]
+
+
+def yorumlari_ag_uzerinden_topla(driver, db_connection, business_id):
+    """
+    Yorumları DOM yerine review RPC yanıtlarından toplar (network mod).
+    
+    Driver chrome_driver_baslat(network_capture=True) ile açılmış olmalı.
+    Panel ilk açıldığında HTML içinde gelen ilk sayfa DOM'dan alınır, sonraki
+    sayfalar scroll sırasında ağ yanıtlarından tam metinleriyle çözülür.
+    
+    Returns:
+        int: Eklenen yorum sayısı
+    """
+    print("Yorumlar ağ yanıtlarından toplanıyor...")
     
+    saved = [0]
+    seen = set()
+    
+    def kaydet(reviews):
+        # Aynı yorum hem DOM'dan hem ağdan gelebilir, bu çalışmada bir kez al.
+        # Anahtar review_key: aynı ad ve puanlı farklı kullanıcılar birleşmez
+        fresh = []
+        for review in reviews:
+            key = review_key(review)
+            if key not in seen:
+                seen.add(key)
+                fresh.append(review)
+        comments_to_insert = _reviews_to_rows(fresh, business_id)
+        saved[0] += save_comments_batch(db_connection, comments_to_insert)
+    
+    if _wait_for_reviews(driver):
+        yorumlari_genislet(driver)
+        kaydet(parse_reviews_bulk(driver) or [])
+    
+    yorumlari_yukle(driver, on_batch=kaydet, harvester=network_harvester())
+    print(f"Toplam {saved[0]} yeni yorum eklendi.")
+    return saved[0]
+
+
+def yorum_paneli_html(driver):
+    """Yorum panelinin outerHTML anlık görüntüsünü tek çağrıda alır."""
+    container = _find_scrollable_container(driver)
+    return driver.execute_script(
+        "return (arguments[0] || document.documentElement).outerHTML;", container
+    )
+
+
+def _store_snapshot(business_id, html, run_id=None):
+    """HTML'i depoya yazar; depo hatası toplamayı durdurmaz."""
+    try:
+        save_snapshot(business_id, run_id or current_run_id(), html)
+    except (OSError, AttributeError) as e:
+        print(f"HTML anlık görüntüsü kaydedilemedi: {e}")
+
+
+def yorumlari_snapshot_ile_kaydet(db_connection, business_id, html):
+    """
+    outerHTML anlık görüntüsündeki yorumları lxml ile ayrıştırıp kaydeder.
+    
+    Tarayıcıya dokunmaz; driver bu sırada sonraki işletmeye geçebilir.
+    
+    Returns:
+        int: Eklenen yorum sayısı
+    """
+    with timed('parse'):
+        reviews = parse_reviews_html(html)
+    count_metric('reviews_found', len(reviews))
+    print(f"{len(reviews)} yorum HTML anlık görüntüsünden ayrıştırıldı.")
+    
+    comments_to_insert = _reviews_to_rows(reviews, business_id)
     saved_count = save_comments_batch(db_connection, comments_to_insert)
     print(f"Toplam {saved_count} yeni yorum eklendi.")
     return saved_count
+
+
+def _sort_reviews_newest(driver):
+    """Yorumlar panelini 'En yeni' sıralamasına alır."""
+    try:
+        first_review = driver.find_elements(By.XPATH, _review_selector())[:1]
+        sort_btn = WebDriverWait(driver, 5).until(EC.element_to_be_clickable((
+            By.XPATH,
+            "//button[contains(@aria-label, 'sırala') or contains(@aria-label, 'Sırala')"
+            " or contains(@aria-label, 'Sort') or @data-value='Sırala' or @data-value='Sort']"
+        )))
+        sort_btn.click()
+        newest = WebDriverWait(driver, 5).until(EC.element_to_be_clickable((
+            By.XPATH,
+            "//div[@role='menuitemradio'][contains(., 'En yeni') or contains(., 'Newest')]"
+        )))
+        newest.click()
+        # Liste yeniden çizilir: eski ilk yorum DOM'dan düşene kadar bekle
+        if first_review:
+            try:
+                WebDriverWait(driver, 5).until(EC.staleness_of(first_review[0]))
+            except TimeoutException:
+                pass
+        _wait_for_reviews(driver)
+        print("Yorumlar 'En yeni' olarak sıralandı.")
+        return True
+    except TimeoutException:
+        print("Sıralama menüsü bulunamadı.")
+        return False
+    except WebDriverException as e:
+        # Tıklama başka elemente denk geldi, menü yeniden çizildi vb.: sırasız topla
+        print(f"Sıralama yapılamadı: {type(e).__name__}")
+        return False
+
+
+def yorumlari_artimli_topla(driver, db_connection, business_id, known_streak=INCREMENTAL_KNOWN_STREAK):
+    """
+    Daha önce toplanmış işletmenin sadece yeni yorumlarını toplar (incremental mod).
+    
+    Yorumlar en yeniden eskiye sıralanır ve streaming modda işlenir; art arda
+    known_streak adet yorum veritabanında zaten varsa scroll durdurulur.
+    Sıralama yapılamazsa erken durdurma güvenli olmadığından tam tarama yapılır.
+    
+    Returns:
+        int: Eklenen yorum sayısı
+    """
+    print(f"Yorumlar incremental modda toplanıyor (durma eşiği: {known_streak} bilinen yorum)...")
+    
+    if not _wait_for_reviews(driver):
+        print("HATA: Yorumlar bulunamadı.")
+        return 0
+    sorted_newest = _sort_reviews_newest(driver)
+    
+    # Sadece 16 baytlık anahtarlar yüklenir; imza anahtarı kimliği henüz taşınmamış eski satırlar için
+    known_keys = get_existing_review_keys(db_connection, business_id)
+    print(f"Mevcut yorum sayısı: {len(known_keys)}")
+    
+    saved = [0]
+    streak = [0]
+    
+    def kaydet(reviews):
+        for review_data in reviews:
+            known = (
+                review_key(review_data) in known_keys
+                or signature_key(review_data['username'], review_data['rating'], review_data['text']) in known_keys
+            )
+            streak[0] = streak[0] + 1 if known else 0
+        comments_to_insert = _reviews_to_rows(reviews, business_id)
+        saved[0] += save_comments_batch(db_connection, comments_to_insert)
+        known_keys.update(review_key(review_data) for review_data in reviews)
+        return sorted_newest and streak[0] >= known_streak
+    
+    yorumlari_yukle(driver, on_batch=kaydet)
+    print(f"Toplam {saved[0]} yeni yorum eklendi.")
+    return saved[0]
+
+
+def yorumlari_topla(driver, db_connection, business_id, mode='dom'):
+    """
+    Açık yorum panelindeki yorumları seçilen modda toplar ve kaydeder.
+    
+    Args:
+        mode: 'dom' (önce scroll, sonra ayrıştır), 'stream' (scroll sırasında
+            ayrıştır), 'network' (review RPC yanıtlarından çöz) veya
+            'incremental' (en yeniden başla, bilinen yorumlara gelince dur) veya
+            'snapshot' (paneli tek outerHTML olarak al, lxml ile ayrıştır)
+    
+    Returns:
+        int: Eklenen yorum sayısı
+    """
+    if mode == 'incremental':
+        return yorumlari_artimli_topla(driver, db_connection, business_id)
+    if mode == 'stream':
+        return yorumlari_akisli_topla(driver, db_connection, business_id)
+    if mode == 'network':
+        return yorumlari_ag_uzerinden_topla(driver, db_connection, business_id)
+    
+    yorumlari_yukle(driver)
+    devamini_oku_tikla(driver)
+    
+    if mode == 'snapshot':
+        if not _lxml_available():
+            print("lxml kurulu değil, tarayıcı içi ayrıştırma kullanılıyor.")
+        else:
+            html = yorum_paneli_html(driver)
+            if SNAPSHOT_STORE:
+                _store_snapshot(business_id, html)
+            return yorumlari_snapshot_ile_kaydet(db_connection, business_id, html)
+    return yorumlari_cek_ve_kaydet(driver, db_connection, business_id)
+
+
+def _lxml_available():
+    """Snapshot ayrıştırması için lxml kurulu mu."""
+    try:
+        import lxml  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def yorumlari_yakala(driver, mode='dom'):
+    """
+    Yorumları yükler, genişletir ve kaydetmeden yakalar (boru hattı toplama).
+    
+    Tarayıcıyla işi biten yakalama hemen döner; ayrıştırma ve kayıt
+    yakalanan_yorumlari_kaydet ile başka bir thread'de yapılabilir.
+    
+    Args:
+        mode: 'snapshot' ise panel HTML'i alınır (lxml ile sonra ayrıştırılır),
+            'dom' ise yorumlar tarayıcıda ayrıştırılır
+    
+    Returns:
+        dict: 'html' (snapshot modu ya da SNAPSHOT_STORE) ve/veya 'reviews'
+    """
+    yorumlari_yukle(driver)
+    devamini_oku_tikla(driver)
+    
+    use_html = mode == 'snapshot' and _lxml_available()
+    capture = {}
+    if use_html or SNAPSHOT_STORE:
+        capture['html'] = yorum_paneli_html(driver)
+    if not use_html:
+        capture['reviews'] = _parse_reviews_in_browser(driver)
+    return capture
+
+
+def yakalanan_yorumlari_kaydet(db_connection, business_id, capture):
+    """
+    yorumlari_yakala çıktısını ayrıştırıp kaydeder; tarayıcıya dokunmaz.
+    
+    Returns:
+        int: Eklenen yorum sayısı
+    """
+    if SNAPSHOT_STORE and capture.get('html'):
+        _store_snapshot(business_id, capture['html'])
+    if 'reviews' in capture:
+        return _yorum_listesini_kaydet(db_connection, business_id, capture['reviews'])
+    return yorumlari_snapshot_ile_kaydet(db_connection, business_id, capture['html'])
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+Kalıcı Scraper Servisi
+
+Sıcak Chrome örneklerini açık tutan ve keşif/toplama işlerini yerel HTTP
+üzerinden kabul eden uzun ömürlü servis. app.py işleri buraya gönderir ve
+ilerlemesini sorgular; her işlem için yeni Python/Selenium/Chrome başlatılmaz.
+
+Kullanım:
+    python scraper_service.py
+    python scraper_service.py --drivers 3 --headless --lean
+
+API:
+    POST /jobs          {"type": "discover", "query": "eczane bartın merkez"}
+                        {"type": "collect", "limit": 5, "mode": "dom"}
+                        {"type": "retry_failed"}
+    GET  /jobs          Tüm işlerin özeti
+    GET  /jobs/<id>     İşin durumu, sonucu ve log çıktısı
+    GET  /health        Servis ve tarayıcı havuzu durumu
+"""
+import sys
+import json
+import time
+import queue
+import argparse
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse
+
+from utils import get_db_connection, chrome_driver_baslat, DriverSupervisor, SCRAPER_SERVICE_HOST, SCRAPER_SERVICE_PORT
+from utils.migrate import run_migrations
+from batch_scraper import (
+    discover_businesses,
+    collect_claimed_businesses,
+    retry_failed_businesses
+)
+
+JOB_TYPES = ('discover', 'collect', 'retry_failed')
+MAX_LOG_CHARS = 200000
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+_job_context = threading.local()
+
+
+class _JobOutput:
+    """print çıktısını, yazan thread'in işine yönlendiren stdout sarmalayıcısı."""
+    
+    def __init__(self, stream):
+        self.stream = stream
+    
+    def write(self, text):
+        job = getattr(_job_context, 'job', None)
+        if job is not None:
+            with _jobs_lock:
+                job['log'] = (job['log'] + text)[-MAX_LOG_CHARS:]
+        return self.stream.write(text)
+    
+    def flush(self):
+        self.stream.flush()
+    
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+class DriverPool:
+    """Sıcak tutulan Chrome örnekleri; işler arasında yeniden kullanılır."""
+    
+    def __init__(self, size, headless=True, network_capture=False, lean=False):
+        self.size = size
+        self.headless = headless
+        self.network_capture = network_capture
+        self.lean = lean
+        self.idle = queue.Queue()
+        self.created = 0
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Boştaki driver'ı verir, yoksa havuz dolana kadar yenisini açar."""
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            if self.created < self.size:
+                self.created += 1
+                try:
+                    return chrome_driver_baslat(
+                        headless=self.headless, network_capture=self.network_capture, lean=self.lean
+                    )
+                except Exception:
+                    self.created -= 1
+                    raise
+        return self.idle.get()
+    
+    def release(self, driver):
+        """Driver'ı havuza geri koyar; oturum ölmüşse (ya da yoksa) kapatıp yerini boşaltır."""
+        try:
+            driver.current_url
+        except Exception:
+            print("Tarayıcı oturumu kapanmış, havuzdan çıkarılıyor.")
+            try:
+                if driver is not None:
+                    driver.quit()
+            except Exception:
+                pass
+            with self.lock:
+                self.created -= 1
+            return
+        self.idle.put(driver)
+    
+    def close(self):
+        """Boştaki tüm tarayıcıları kapatır."""
+        while True:
+            try:
+                self.idle.get_nowait().quit()
+            except queue.Empty:
+                break
+            except Exception:
+                continue
+
+
+def _run_job(job, pool):
+    """İşi çalıştırır; çıktı ve sonuç job sözlüğüne yazılır."""
+    _job_context.job = job
+    job['status'] = 'running'
+    job['started_at'] = time.time()
+    params = job['params']
+    db_connection = None
+    
+    try:
+        db_connection = get_db_connection()
+        if not db_connection:
+            raise Exception("Veritabanı bağlantısı kurulamadı")
+        run_migrations(db_connection)
+        
+        if job['type'] == 'retry_failed':
+            job['result'] = {'updated': retry_failed_businesses(db_connection)}
+        else:
+            if params.get('mode') == 'network' and not pool.network_capture:
+                raise Exception("Network modu için servis --network ile başlatılmalı")
+            # Supervisor işi sırasında tarayıcıyı yenileyebilir; havuza güncel olanı ver
+            supervisor = DriverSupervisor(pool.acquire(), start_lock=pool.lock)
+            try:
+                if job['type'] == 'discover':
+                    job['result'] = {'found': discover_businesses(supervisor.driver, params['query'], db_connection)}
+                else:
+                    job['result'] = collect_claimed_businesses(
+                        supervisor, db_connection, params.get('limit') or None, params.get('mode', 'dom')
+                    )
+            finally:
+                pool.release(supervisor.detach())
+        
+        job['status'] = 'done'
+    
+    except Exception as e:
+        print(f"Hata: {e}")
+        traceback.print_exc(file=sys.stdout)
+        job['status'] = 'failed'
+        job['error'] = str(e)
+    
+    finally:
+        job['finished_at'] = time.time()
+        if db_connection and db_connection.is_connected():
+            db_connection.close()
+        _job_context.job = None
+
+
+def submit_job(job_type, params, executor, pool):
+    """Yeni işi kuyruğa ekler ve job sözlüğünü döndürür."""
+    with _jobs_lock:
+        job_id = str(len(_jobs) + 1)
+        job = {
+            'id': job_id,
+            'type': job_type,
+            'params': params,
+            'status': 'queued',
+            'created_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'result': None,
+            'error': None,
+            'log': ''
+        }
+        _jobs[job_id] = job
+    executor.submit(_run_job, job, pool)
+    return job
+
+
+def _job_summary(job):
+    """Log hariç iş bilgisi (liste yanıtları için)."""
+    return {k: v for k, v in job.items() if k != 'log'}
+
+
+def make_handler(executor, pool):
+    """Servis durumuna bağlı HTTP handler sınıfını oluşturur."""
+    
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def do_GET(self):
+            path = urlparse(self.path).path.rstrip('/')
+            if path == '/health':
+                self._send(200, {'status': 'ok', 'drivers': pool.created, 'idle': pool.idle.qsize()})
+            elif path == '/jobs':
+                with _jobs_lock:
+                    payload = [_job_summary(j) for j in _jobs.values()]
+                self._send(200, payload)
+            elif path.startswith('/jobs/'):
+                with _jobs_lock:
+                    job = _jobs.get(path.split('/')[-1])
+                    payload = dict(job) if job else None
+                if payload:
+                    self._send(200, payload)
+                else:
+                    self._send(404, {'error': 'İş bulunamadı'})
+            else:
+                self._send(404, {'error': 'Bilinmeyen adres'})
+        
+        def do_POST(self):
+            if urlparse(self.path).path.rstrip('/') != '/jobs':
+                self._send(404, {'error': 'Bilinmeyen adres'})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                params = json.loads(self.rfile.read(length) or b'{}')
+            except ValueError:
+                self._send(400, {'error': 'Geçersiz JSON'})
+                return
+            
+            job_type = params.pop('type', None)
+            if job_type not in JOB_TYPES:
+                self._send(400, {'error': f"type şunlardan biri olmalı: {', '.join(JOB_TYPES)}"})
+                return
+            if job_type == 'discover' and len(str(params.get('query', '')).split()) < 3:
+                self._send(400, {'error': "query 'işletme_türü şehir ilçe' formatında olmalı"})
+                return
+            
+            job = submit_job(job_type, params, executor, pool)
+            self._send(202, _job_summary(job))
+        
+        def log_message(self, format, *args):
+            # Poll istekleri konsolu doldurmasın
+            pass
+    
+    return Handler
+
+
+def main():
+    """Ana fonksiyon."""
+    parser = argparse.ArgumentParser(description='Kalıcı scraper servisi')
+    parser.add_argument('--host', default=SCRAPER_SERVICE_HOST, help='Dinlenecek adres')
+    parser.add_argument('--port', type=int, default=SCRAPER_SERVICE_PORT, help='Dinlenecek port')
+    parser.add_argument('--drivers', type=int, default=2, help='Sıcak tutulacak tarayıcı (eşzamanlı iş) sayısı')
+    parser.add_argument('--headless', action='store_true', help='Headless modda çalıştır')
+    parser.add_argument('--lean', action='store_true', help='Resim, font, harita karosu ve medyayı engelle')
+    parser.add_argument('--network', action='store_true', help='Network modundaki toplama işlerine izin ver')
+    args = parser.parse_args()
+    
+    sys.stdout = _JobOutput(sys.stdout)
+    
+    pool = DriverPool(args.drivers, headless=args.headless, network_capture=args.network, lean=args.lean)
+    executor = ThreadPoolExecutor(max_workers=args.drivers + 1, thread_name_prefix='job')
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(executor, pool))
+    
+    print(f"Scraper servisi http://{args.host}:{args.port} adresinde çalışıyor ({args.drivers} tarayıcı).")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nServis kapatılıyor...")
+    finally:
+        server.server_close()
+        executor.shutdown(wait=False, cancel_futures=True)
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
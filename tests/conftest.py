@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""Testler proje kökünden (utils, scraper) import eder."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
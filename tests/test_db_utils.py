@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""utils.db_utils.upsert_comments: sahte bağlantı üzerinde birleştirme kararları."""
+from utils.db_utils import review_key, upsert_comments
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        self.calls.append((sql, params))
+
+    def executemany(self, sql, params):
+        self.calls.append((sql, list(params)))
+        self.rowcount = len(params)
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.cursor_obj = FakeCursor(rows)
+        self.committed = False
+
+    def cursor(self):
+        return self.cursor_obj
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        pass
+
+
+def make_review(text, review_id="ChdDSUhNMG9nS0VJQ0FnSURaMXA3Rk1REAE"):
+    return {
+        'username': "Ayşe Yılmaz", 'rating': 5, 'date': "2 hafta önce",
+        'text': text, 'likes': 3, 'review_id': review_id,
+    }
+
+
+def test_updates_truncated_row_with_same_review_key():
+    full = make_review("Çalışanlar çok ilgili, ilaçlar hemen hazırlandı.")
+    key = review_key(full)
+    conn = FakeConnection([(7, "Ayşe Yılmaz", 5, "Çalışanlar çok ilgili…", key)])
+
+    assert upsert_comments(conn, 1, [full]) == (0, 1)
+    sql, params = conn.cursor_obj.calls[-1]
+    assert sql.startswith("UPDATE IGNORE comments")
+    assert params == [("2 hafta önce", full['text'], 3, key, 7)]
+    assert conn.committed
+
+
+def test_updates_empty_row_with_same_review_key():
+    full = make_review("Tavsiye ederim.")
+    conn = FakeConnection([(7, "Ayşe Yılmaz", 5, "", review_key(full))])
+
+    assert upsert_comments(conn, 1, [full]) == (0, 1)
+
+
+def test_skips_row_with_same_review_key_and_text():
+    review = make_review("Tavsiye ederim.")
+    conn = FakeConnection([(7, "Ayşe Yılmaz", 5, "Tavsiye ederim.", review_key(review))])
+
+    assert upsert_comments(conn, 1, [review]) == (0, 0)
+    assert len(conn.cursor_obj.calls) == 1
+
+
+def test_empty_row_without_matching_key_is_not_overwritten():
+    review = make_review("Tavsiye ederim.")
+    other = make_review("", review_id="ChZDSUhNMG9nS0VJQ0FnSURaeHZUTUtREAE")
+    conn = FakeConnection([(7, "Ayşe Yılmaz", 5, "", review_key(other))])
+
+    assert upsert_comments(conn, 1, [review]) == (1, 0)
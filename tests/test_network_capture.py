@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""utils.network_capture: kayıtlı listugcposts yanıtının offline çözümü."""
+from utils.network_capture import FIXTURE_PATH, XSSI_PREFIX, decode_review_payload
+
+
+def load_fixture():
+    with open(FIXTURE_PATH, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_decodes_fixture_reviews():
+    reviews = decode_review_payload(load_fixture(), "listugcposts")
+    
+    assert reviews == [
+        {
+            'username': "Ayşe Yılmaz",
+            'rating': 5,
+            'date': "2 hafta önce",
+            'text': "Çalışanlar çok ilgili, ilaçlar hemen hazırlandı. Tavsiye ederim.",
+            'likes': 0,
+            'review_id': "ChdDSUhNMG9nS0VJQ0FnSURaMXA3Rk1REAE",
+        },
+        {
+            'username': "Mehmet K.",
+            'rating': 2,
+            'date': "3 ay önce",
+            'text': "Kuyruk çok uzundu, yarım saat bekledim.\nFiyatlar da pahalı.",
+            'likes': 0,
+            'review_id': "ChZDSUhNMG9nS0VJQ0FnSURaeHZUTUtREAE",
+        },
+        {
+            'username': "Zeynep",
+            'rating': 4,
+            'date': "bir yıl önce",
+            'text': "",
+            'likes': 0,
+            'review_id': "ChZDSUhNMG9nS0VJQ0FnSUN4cThiR2tBEAE",
+        },
+    ]
+
+
+def test_entry_without_username_is_skipped():
+    reviews = decode_review_payload(load_fixture(), "listugcposts")
+    
+    assert "Kullanıcı bilgisi olmayan kayıt atlanmalı." not in [r['text'] for r in reviews]
+    assert "ChdDSUhNMG9nS0VJQ0FnSUR4cDVqX2x3RRAB" not in [r['review_id'] for r in reviews]
+
+
+def test_prefix_is_optional_and_invalid_body_is_empty():
+    body = load_fixture().strip()[len(XSSI_PREFIX):]
+    
+    assert len(decode_review_payload(body, "listugcposts")) == 3
+    assert decode_review_payload(XSSI_PREFIX + "<html>", "listugcposts") == []
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""utils.selector_stats: config sırası, ıskalamayla geriye alma ve yeniden deneme."""
+import json
+
+import pytest
+
+from utils import selector_stats
+from utils.config import REVIEW_SELECTORS, SELECTOR_DEMOTE_MISSES, SELECTOR_REPROBE_INTERVAL
+
+PRIMARY, BROAD = REVIEW_SELECTORS[0], REVIEW_SELECTORS[1]
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats(tmp_path, monkeypatch):
+    path = tmp_path / "selector_stats.json"
+    monkeypatch.setattr(selector_stats, 'SELECTOR_STATS_PATH', str(path))
+    monkeypatch.setattr(selector_stats, '_scores', None)
+    monkeypatch.setattr(selector_stats, '_calls', {})
+    monkeypatch.setattr(selector_stats, '_dirty', False)
+    return path
+
+
+def order(probe=False):
+    return selector_stats.ordered_selectors('review', REVIEW_SELECTORS, probe=probe)
+
+
+def test_hits_alone_do_not_reorder():
+    for _ in range(500):
+        selector_stats.record_selector_hit('review', BROAD)
+    assert order() == REVIEW_SELECTORS
+
+
+def test_single_timeout_does_not_promote_broad_fallback():
+    # Bir kez zaman aşımına uğrayan birincil selector yerinde kalır
+    selector_stats.record_selector_hit('review', BROAD, [PRIMARY])
+    for _ in range(500):
+        selector_stats.record_selector_hit('review', PRIMARY)
+    assert order()[0] == PRIMARY
+
+
+def test_consecutive_misses_demote_and_hit_restores():
+    for _ in range(SELECTOR_DEMOTE_MISSES):
+        selector_stats.record_selector_hit('review', BROAD, [PRIMARY])
+    assert order() == REVIEW_SELECTORS[1:] + [PRIMARY]
+    
+    selector_stats.record_selector_hit('review', PRIMARY)
+    assert order() == REVIEW_SELECTORS
+
+
+def test_misses_without_any_hit_are_ignored():
+    for _ in range(SELECTOR_DEMOTE_MISSES * 2):
+        selector_stats.record_selector_hits('review', {}, {PRIMARY: 1})
+    assert order() == REVIEW_SELECTORS
+
+
+def test_demoted_selector_is_reprobed_periodically():
+    for _ in range(SELECTOR_DEMOTE_MISSES):
+        selector_stats.record_selector_hit('review', BROAD, [PRIMARY])
+    orders = [order(probe=True) for _ in range(SELECTOR_REPROBE_INTERVAL)]
+    assert orders[-1] == REVIEW_SELECTORS
+    assert all(o[0] == BROAD for o in orders[:-1])
+    # Sayım için yapılan çağrılar yeniden denemeye girmez
+    assert all(order()[0] == BROAD for _ in range(SELECTOR_REPROBE_INTERVAL))
+
+
+def test_stats_persist_and_legacy_scores_are_ignored(fresh_stats):
+    for _ in range(SELECTOR_DEMOTE_MISSES):
+        selector_stats.record_selector_hit('review', BROAD, [PRIMARY])
+    selector_stats.save_selector_stats()
+    selector_stats._scores = None
+    assert order()[-1] == PRIMARY
+    
+    fresh_stats.write_text(json.dumps({'review': {BROAD: 50.0}}), encoding='utf-8')
+    selector_stats._scores = None
+    assert order() == REVIEW_SELECTORS
@@ -10,19 +10,71 @@ from .config import (
     SEARCH_RESULT_SELECTORS,
     ISLETME_ADI_TAM_SORGUSU,
     SCROLL_PAUSE_TIME,
+    SCROLL_MIN_WAIT_TIME,
     MAX_NO_NEW_REVIEWS_SCROLLS,
-    CLICK_MORE_BUTTONS_LIMIT
+    EXPAND_MAX_PASSES,
+    INCREMENTAL_KNOWN_STREAK,
+    BULK_EXTRACTION,
+    NAV_STATE_BUDGETS,
+    TILE_SIZE_KM,
+    TILE_ZOOM,
+    TILE_DEFAULT_RADIUS_KM,
+    LEASE_SECONDS,
+    HEARTBEAT_INTERVAL,
+    MAX_ATTEMPTS,
+    RETRY_BACKOFF_SECONDS,
+    DRIVER_MAX_BUSINESSES,
+    DRIVER_MAX_RSS_MB,
+    DRIVER_CRASH_RETRIES,
+    PIPELINE_MAX_PENDING,
+    SCRAPER_SERVICE_HOST,
+    SCRAPER_SERVICE_PORT,
+    SNAPSHOT_STORE,
+    SNAPSHOT_DIR,
+    DB_POOL_SIZE,
+    BUSINESS_CACHE_SIZE,
+    BULK_WRITE_CHUNK_SIZE
 )
 from .db_utils import (
     connect_to_mysql, 
     get_db_connection, 
+    pooled_connection,
     get_or_create_business, 
+    clear_business_cache,
+    bulk_update,
+    bulk_delete,
     save_comments_batch, 
-    get_existing_comment_signatures,
+    upsert_comments,
+    review_key,
+    signature_key,
+    get_existing_review_keys,
     get_business_list
 )
-from .browser_utils import chrome_driver_baslat
-from .parser import parse_review, get_username, get_rating, get_date, get_comment_text, get_likes
+from .browser_utils import (
+    chrome_driver_baslat,
+    read_performance_log,
+    pop_network_stats,
+    report_network_stats,
+    driver_alive,
+    driver_rss_mb,
+    DriverSupervisor,
+    DriverSessionLost
+)
+from .network_capture import decode_review_payload, read_review_responses, network_harvester
+from .selector_stats import ordered_selectors, record_selector_hit, record_selector_hits, save_selector_stats
+from .snapshot_store import new_run_id, current_run_id, save_snapshot, load_snapshot, list_snapshots
+from .scrape_metrics import (
+    start_metrics,
+    current_metrics,
+    use_metrics,
+    timed,
+    add_phase_time,
+    count_metric,
+    save_scrape_run,
+    print_scrape_report
+)
+from .service_client import is_service_running, submit_job, get_job
+from .parser import parse_review, parse_reviews_bulk, parse_reviews_html, get_username, get_rating, get_date, get_comment_text, get_likes, get_review_id
 
 __all__ = [
     'DB_CONFIG',
@@ -32,19 +84,81 @@ __all__ = [
     'SEARCH_RESULT_SELECTORS',
     'ISLETME_ADI_TAM_SORGUSU',
     'SCROLL_PAUSE_TIME',
+    'SCROLL_MIN_WAIT_TIME',
     'MAX_NO_NEW_REVIEWS_SCROLLS',
-    'CLICK_MORE_BUTTONS_LIMIT',
+    'EXPAND_MAX_PASSES',
+    'INCREMENTAL_KNOWN_STREAK',
+    'BULK_EXTRACTION',
+    'NAV_STATE_BUDGETS',
+    'TILE_SIZE_KM',
+    'TILE_ZOOM',
+    'TILE_DEFAULT_RADIUS_KM',
+    'LEASE_SECONDS',
+    'HEARTBEAT_INTERVAL',
+    'MAX_ATTEMPTS',
+    'RETRY_BACKOFF_SECONDS',
+    'DRIVER_MAX_BUSINESSES',
+    'DRIVER_MAX_RSS_MB',
+    'DRIVER_CRASH_RETRIES',
+    'PIPELINE_MAX_PENDING',
+    'SCRAPER_SERVICE_HOST',
+    'SCRAPER_SERVICE_PORT',
+    'SNAPSHOT_STORE',
+    'SNAPSHOT_DIR',
+    'DB_POOL_SIZE',
+    'BUSINESS_CACHE_SIZE',
+    'BULK_WRITE_CHUNK_SIZE',
     'connect_to_mysql',
     'get_db_connection',
+    'pooled_connection',
     'get_or_create_business',
+    'clear_business_cache',
+    'bulk_update',
+    'bulk_delete',
     'save_comments_batch',
-    'get_existing_comment_signatures',
+    'upsert_comments',
+    'review_key',
+    'signature_key',
+    'get_existing_review_keys',
     'get_business_list',
     'chrome_driver_baslat',
+    'read_performance_log',
+    'pop_network_stats',
+    'report_network_stats',
+    'driver_alive',
+    'driver_rss_mb',
+    'DriverSupervisor',
+    'DriverSessionLost',
+    'ordered_selectors',
+    'record_selector_hit',
+    'record_selector_hits',
+    'save_selector_stats',
+    'new_run_id',
+    'current_run_id',
+    'save_snapshot',
+    'load_snapshot',
+    'list_snapshots',
+    'start_metrics',
+    'current_metrics',
+    'use_metrics',
+    'timed',
+    'add_phase_time',
+    'count_metric',
+    'save_scrape_run',
+    'print_scrape_report',
+    'is_service_running',
+    'submit_job',
+    'get_job',
+    'decode_review_payload',
+    'read_review_responses',
+    'network_harvester',
     'parse_review',
+    'parse_reviews_bulk',
+    'parse_reviews_html',
     'get_username',
     'get_rating',
     'get_date',
     'get_comment_text',
-    'get_likes'
+    'get_likes',
+    'get_review_id'
 ]
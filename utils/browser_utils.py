@@ -4,9 +4,32 @@ Tarayıcı yardımcı fonksiyonları.
 Chrome WebDriver başlatma ve yapılandırma.
 """
 import os
+import json
+import threading
+from contextlib import nullcontext
+from fnmatch import fnmatchcase
+from .config import LEAN_BLOCKED_URLS, LEAN_AVG_BYTES, DRIVER_MAX_BUSINESSES, DRIVER_MAX_RSS_MB
 
-def chrome_driver_baslat(headless=True):
-    """Chrome WebDriver'ı başlatır."""
+# Lean modda render tarafında da kapatılan kaynaklar
+LEAN_CHROME_ARGS = [
+    '--blink-settings=imagesEnabled=false',
+    '--disable-remote-fonts',
+    '--mute-audio',
+    '--autoplay-policy=user-gesture-required',
+]
+
+
+def chrome_driver_baslat(headless=True, network_capture=False, lean=False):
+    """
+    Chrome WebDriver'ı başlatır.
+    
+    Args:
+        headless: Headless modda çalıştır
+        network_capture: True ise CDP Network olayları performance log'una yazılır
+            (utils.network_capture için gerekli)
+        lean: True ise resim, font, harita karoları ve medya CDP ile engellenir;
+            işletme başına aktarılan/tasarruf edilen bayt pop_network_stats ile okunur
+    """
     if os.environ.get('HEADLESS_MODE') == 'true':
         headless = True
     
@@ -20,8 +43,11 @@ def chrome_driver_baslat(headless=True):
         options.add_argument('--disable-dev-shm-usage')
         if headless:
             options.add_argument('--headless=new')
+        _apply_network_options(options, network_capture, lean)
         driver = uc.Chrome(options=options, use_subprocess=True)
         print("undetected-chromedriver kullanılıyor.")
+        _setup_network(driver, network_capture, lean)
+        driver.launch_options = {'headless': headless, 'network_capture': network_capture, 'lean': lean}
         return driver
     except Exception as e:
         print(f"undetected-chromedriver başlatılamadı: {e}, normal Chrome deneniyor...")
@@ -42,8 +68,11 @@ def chrome_driver_baslat(headless=True):
         options.add_argument('--disable-dev-shm-usage')
     else:
         options.add_argument('--start-maximized')
+    _apply_network_options(options, network_capture, lean)
     
     driver = webdriver.Chrome(options=options)
+    _setup_network(driver, network_capture, lean)
+    driver.launch_options = {'headless': headless, 'network_capture': network_capture, 'lean': lean}
     driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
         'source': '''
             Object.defineProperty(navigator, 'webdriver', {
@@ -52,3 +81,262 @@ def chrome_driver_baslat(headless=True):
         '''
     })
     return driver
+
+
+def _apply_network_options(options, network_capture, lean):
+    """Ağ yakalama ve lean mod için Chrome seçeneklerini ekler."""
+    if lean:
+        for arg in LEAN_CHROME_ARGS:
+            options.add_argument(arg)
+    if network_capture or lean:
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+
+def _setup_network(driver, network_capture, lean):
+    """Başlatılan driver'da CDP Network domain'ini ve URL engellemesini açar."""
+    if not (network_capture or lean):
+        return
+    driver.execute_cdp_cmd('Network.enable', {})
+    if lean:
+        patterns = [p for group in LEAN_BLOCKED_URLS.values() for p in group]
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+        driver.network_stats = _empty_network_stats()
+        print(f"Lean mod: {len(patterns)} URL kalıbı engelleniyor.")
+
+
+def _empty_network_stats():
+    """Lean istatistikleri için boş sayaç sözlüğü."""
+    return {'transferred_bytes': 0, 'blocked': {}, 'pending': {}}
+
+
+def _blocked_category(url):
+    """URL'nin hangi lean engelleme grubuna girdiğini döndürür."""
+    for category, patterns in LEAN_BLOCKED_URLS.items():
+        if any(fnmatchcase(url, p) for p in patterns):
+            return category
+    return None
+
+
+def read_performance_log(driver):
+    """
+    Performance log'unu boşaltır ve CDP mesajlarını döndürür.
+    
+    Log okununca silindiği için tüm okuyucular (network_capture, lean
+    istatistikleri) bu fonksiyondan geçer; lean driver'da sayaçlar burada güncellenir.
+    """
+    stats = getattr(driver, 'network_stats', None)
+    messages = []
+    for entry in driver.get_log('performance'):
+        try:
+            message = json.loads(entry['message'])['message']
+        except (ValueError, KeyError):
+            continue
+        messages.append(message)
+        
+        if stats is None:
+            continue
+        method = message.get('method')
+        params = message.get('params', {})
+        if method == 'Network.requestWillBeSent':
+            category = _blocked_category(params.get('request', {}).get('url', ''))
+            if category:
+                stats['pending'][params['requestId']] = category
+        elif method == 'Network.loadingFinished':
+            stats['transferred_bytes'] += int(params.get('encodedDataLength', 0))
+            stats['pending'].pop(params.get('requestId'), None)
+        elif method == 'Network.loadingFailed':
+            category = stats['pending'].pop(params.get('requestId'), None)
+            if category and params.get('blockedReason'):
+                stats['blocked'][category] = stats['blocked'].get(category, 0) + 1
+    return messages
+
+
+def pop_network_stats(driver):
+    """
+    Lean driver'ın son çağrıdan beri biriken ağ istatistiklerini döndürür ve sıfırlar.
+    
+    Returns:
+        dict: transferred_bytes (ölçülen), blocked (grup -> istek sayısı) ve
+        estimated_saved_bytes (ölçülmez, LEAN_AVG_BYTES ortalamalarıyla
+        tahmin); lean değilse None
+    """
+    if getattr(driver, 'network_stats', None) is None:
+        return None
+    read_performance_log(driver)
+    stats = driver.network_stats
+    driver.network_stats = _empty_network_stats()
+    return {
+        'transferred_bytes': stats['transferred_bytes'],
+        'blocked': stats['blocked'],
+        'estimated_saved_bytes': sum(LEAN_AVG_BYTES.get(c, 0) * n for c, n in stats['blocked'].items())
+    }
+
+
+def report_network_stats(driver):
+    """Lean driver'da son işletmenin ağ kullanımını ve tasarrufunu yazdırır."""
+    stats = pop_network_stats(driver)
+    if stats:
+        blocked = sum(stats['blocked'].values())
+        detail = ", ".join(f"{c}={n}" for c, n in stats['blocked'].items())
+        print(f"  Ağ: {stats['transferred_bytes'] / 1024:.0f} KB aktarıldı, "
+              f"{blocked} istek engellendi ({detail or '-'}), "
+              f"tahmini tasarruf ~{stats['estimated_saved_bytes'] / 1024:.0f} KB "
+              f"(ölçüm değil, LEAN_AVG_BYTES ortalamalarıyla)")
+    return stats
+
+
+class DriverSessionLost(Exception):
+    """İşlem sırasında tarayıcı oturumu koptu; iş yeni tarayıcıyla tekrarlanabilir."""
+
+
+def driver_alive(driver):
+    """Tarayıcı oturumu hâlâ komut kabul ediyor mu?"""
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        return False
+
+
+def driver_rss_mb(driver):
+    """
+    chromedriver ve tüm Chrome alt süreçlerinin toplam RSS'i (MB).
+    
+    Returns:
+        float, psutil kurulu değilse ya da süreç bulunamazsa None
+    """
+    try:
+        import psutil
+    except ImportError:
+        return None
+    
+    root_pids = {getattr(driver, 'browser_pid', None)}
+    service = getattr(driver, 'service', None)
+    if service is not None and getattr(service, 'process', None) is not None:
+        root_pids.add(service.process.pid)
+    
+    processes = {}
+    for pid in root_pids - {None}:
+        try:
+            root = psutil.Process(pid)
+            for proc in [root] + root.children(recursive=True):
+                processes[proc.pid] = proc
+        except psutil.Error:
+            continue
+    
+    total = 0
+    for proc in processes.values():
+        try:
+            total += proc.memory_info().rss
+        except psutil.Error:
+            continue
+    return total / (1024 * 1024) if processes else None
+
+
+class DriverSupervisor:
+    """
+    Uzun toplama çalışmalarında tarayıcının ömrünü yönetir.
+    
+    Tarayıcı max_businesses işletmeden sonra ya da süreç ağacının RSS'i
+    max_rss_mb'ı aşınca yeniden başlatılır; restart() kopan oturumdan sonra
+    aynı ayarlarla yenisini açar. start_lock verilirse başlatmalar bu kilitle
+    sıralanır (paralel worker'larda undetected-chromedriver çakışması).
+    
+    spare=True ise arka planda önceden başlatılmış bir yedek tarayıcı tutulur;
+    yeniden başlatma Chrome açılışını beklemeden yedeğe geçer ve yeni yedeği
+    arka planda hazırlar.
+    """
+    
+    def __init__(self, driver=None, headless=True, network_capture=False, lean=False,
+                 max_businesses=DRIVER_MAX_BUSINESSES, max_rss_mb=DRIVER_MAX_RSS_MB, start_lock=None,
+                 spare=False):
+        self.options = getattr(driver, 'launch_options', None) or {
+            'headless': headless, 'network_capture': network_capture, 'lean': lean
+        }
+        self.max_businesses = max_businesses
+        self.max_rss_mb = max_rss_mb
+        self.start_lock = start_lock
+        self._driver = driver
+        self.spare = spare
+        self._spare = None
+        self._spare_thread = None
+        self.businesses = 0
+        self.restarts = 0
+    
+    @property
+    def driver(self):
+        """Çalışan driver; yoksa başlatır."""
+        if self._driver is None:
+            self._driver = self._take_spare()
+            if self._driver is None:
+                with self.start_lock or nullcontext():
+                    self._driver = chrome_driver_baslat(**self.options)
+            self.businesses = 0
+        if self.spare and self._spare_thread is None:
+            self._warm_spare()
+        return self._driver
+    
+    def _warm_spare(self):
+        """Yedek tarayıcıyı arka plan thread'inde başlatır."""
+        def start():
+            try:
+                with self.start_lock or nullcontext():
+                    self._spare = chrome_driver_baslat(**self.options)
+            except Exception as e:
+                print(f"Yedek tarayıcı başlatılamadı: {e}")
+        
+        self._spare_thread = threading.Thread(target=start, name="spare-driver", daemon=True)
+        self._spare_thread.start()
+    
+    def _take_spare(self):
+        """Hazırlanan yedek tarayıcıyı (hâlâ açılıyorsa bekleyip) devralır; yoksa None."""
+        if self._spare_thread is None:
+            return None
+        self._spare_thread.join()
+        spare, self._spare, self._spare_thread = self._spare, None, None
+        if spare is not None and not driver_alive(spare):
+            return None
+        return spare
+    
+    def restart(self, reason):
+        """Mevcut tarayıcıyı kapatır, aynı ayarlarla yenisini açar."""
+        print(f"Tarayıcı yeniden başlatılıyor: {reason}")
+        self._quit_driver()
+        self.restarts += 1
+        return self.driver
+    
+    def business_done(self):
+        """Bir işletme bitince çağrılır; sınır aşıldıysa tarayıcıyı yeniler."""
+        self.businesses += 1
+        if self._driver is None:
+            return
+        if self.businesses >= self.max_businesses:
+            self.restart(f"{self.businesses} işletme işlendi")
+            return
+        rss = driver_rss_mb(self._driver)
+        if rss is not None and rss > self.max_rss_mb:
+            self.restart(f"bellek {rss:.0f} MB > {self.max_rss_mb} MB")
+    
+    def detach(self):
+        """Çalışan driver'ı (yoksa None) kapatmadan bırakır ve döndürür."""
+        driver, self._driver = self._driver, None
+        return driver
+    
+    def _quit_driver(self):
+        """Çalışan tarayıcıyı kapatır (kapanmış oturum hatalarını yutar)."""
+        if self._driver is not None:
+            try:
+                self._driver.quit()
+            except Exception:
+                pass
+            self._driver = None
+    
+    def quit(self):
+        """Çalışan ve yedek tarayıcıyı kapatır."""
+        self._quit_driver()
+        spare = self._take_spare()
+        if spare is not None:
+            try:
+                spare.quit()
+            except Exception:
+                pass
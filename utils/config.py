@@ -5,11 +5,36 @@ Tüm ayarlar ve selector'lar burada tanımlı.
 """
 import os
 
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 # ================== AYARLAR ==================
 ISLETME_ADI_TAM_SORGUSU = os.environ.get("ISLETME_ADI_TAM_SORGUSU", "bartın üniversitesi, bartın, kutlubey")
-SCROLL_PAUSE_TIME = 3.0
+SCROLL_PAUSE_TIME = 3.0  # Scroll sonrası yeni yorum için en uzun bekleme
+SCROLL_MIN_WAIT_TIME = 0.5  # Adaptif beklemenin alt sınırı
 MAX_NO_NEW_REVIEWS_SCROLLS = 5
-CLICK_MORE_BUTTONS_LIMIT = 20
+EXPAND_MAX_PASSES = 5  # "Devamını oku" genişletmesinde yeni buton kalmayana kadar en fazla tur
+# Incremental modda art arda bu kadar bilinen yorum görülünce scroll durur
+INCREMENTAL_KNOWN_STREAK = int(os.environ.get("INCREMENTAL_KNOWN_STREAK", "10"))
+# True ise yorumlar tek execute_script çağrısıyla ayrıştırılır (başarısızsa element bazlı parser'a düşülür)
+BULK_EXTRACTION = os.environ.get("BULK_EXTRACTION", "true") == "true"
+# Karo (tile) keşfi: bölge bu kenar uzunluğunda karelere bölünür ve her kare
+# kendi harita görünümünde aranır; bölge verilmezse şehir/ilçe merkezi etrafında bu yarıçap
+TILE_SIZE_KM = 2.0
+TILE_ZOOM = 15
+TILE_DEFAULT_RADIUS_KM = 5.0
+# isletme_ara durum makinesi: her geçiş için en uzun bekleme (saniye)
+NAV_STATE_BUDGETS = {
+    "load": 15,      # arama URL'si -> consent / işletme / sonuç listesi
+    "results": 10,   # sonuç listesinde işletmenin görünmesi
+    "place": 5,      # işletme sayfası ve Yorumlar sekmesinin tıklanabilir olması
+    "reviews": 10    # sekmeye tıkladıktan sonra ilk yorumların gelmesi
+}
+
+# ================== HTML ANLIK GÖRÜNTÜ DEPOSU ==================
+# True ise yorumlari_cek_ve_kaydet her işletmenin yorum paneli HTML'ini
+# sıkıştırıp depoya yazar; reparse_snapshots.py yeniden scraping yapmadan ayrıştırır
+SNAPSHOT_STORE = os.environ.get("SNAPSHOT_STORE", "false") == "true"
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", os.path.join(PROJECT_DIR, "snapshots"))
 
 # ================== VERITABANI ==================
 DB_CONFIG = {
@@ -18,6 +43,41 @@ DB_CONFIG = {
     "password": "",
     "database": "google_maps_data_v2"
 }
+# get_db_connection bağlantıları bu boyuttaki paylaşılan havuzdan verir (0 = havuz kapalı).
+# Havuz doluyken istenen bağlantılar havuz dışı açılır; mysql-connector üst sınırı 32
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "5"))
+DB_POOL_NAME = "gmaps_pool"
+# get_or_create_business'in süreç içi LRU önbelleğindeki en fazla işletme sayısı
+BUSINESS_CACHE_SIZE = int(os.environ.get("BUSINESS_CACHE_SIZE", "10000"))
+# bulk_update/bulk_delete: tek çok satırlı ifadedeki satır sayısı ve kaç parçada bir commit edileceği
+BULK_WRITE_CHUNK_SIZE = 1000
+BULK_WRITE_COMMIT_CHUNKS = 10
+
+# ================== İŞ KUYRUĞU ==================
+# pending_businesses kiralama (lease) protokolü: sahiplenen worker süreyi
+# heartbeat ile uzatır; süresi dolan kira başka bir worker/host tarafından geri alınır.
+LEASE_SECONDS = int(os.environ.get("LEASE_SECONDS", "300"))
+HEARTBEAT_INTERVAL = int(os.environ.get("HEARTBEAT_INTERVAL", "60"))
+MAX_ATTEMPTS = int(os.environ.get("MAX_ATTEMPTS", "3"))  # Bu kadar denemeden sonra 'failed'
+RETRY_BACKOFF_SECONDS = 300  # Tekrar denemeden önce bekleme: RETRY_BACKOFF_SECONDS * 2^(deneme-1)
+
+# ================== TARAYICI YENİLEME ==================
+# Toplama sırasında tarayıcı bu kadar işletmeden sonra ya da Chrome süreç
+# ağacının RSS'i bu sınırı aşınca yeniden başlatılır (RSS için psutil gerekir)
+DRIVER_MAX_BUSINESSES = int(os.environ.get("DRIVER_MAX_BUSINESSES", "25"))
+DRIVER_MAX_RSS_MB = int(os.environ.get("DRIVER_MAX_RSS_MB", "1500"))
+# Oturum koparsa işletme yeni tarayıcıyla bu kadar kez daha denenir
+DRIVER_CRASH_RETRIES = 1
+
+# ================== BORU HATTI (PIPELINE) TOPLAMA ==================
+# --pipeline: yakalanan yorumlar arka planda yazılırken tarayıcı sonraki işletmeye geçer.
+# Tarayıcı, yazıcının en fazla bu kadar işletme önüne geçebilir (bekleyen HTML bellekte tutulur)
+PIPELINE_MAX_PENDING = int(os.environ.get("PIPELINE_MAX_PENDING", "2"))
+
+# ================== SCRAPER SERVİSİ ==================
+# scraper_service.py'nin dinlediği ve app.py'nin iş gönderdiği adres
+SCRAPER_SERVICE_HOST = os.environ.get("SCRAPER_SERVICE_HOST", "127.0.0.1")
+SCRAPER_SERVICE_PORT = int(os.environ.get("SCRAPER_SERVICE_PORT", "8765"))
 
 # ================== SELECTOR'LAR ==================
 REVIEW_SELECTORS = [
@@ -52,3 +112,60 @@ SEARCH_RESULT_SELECTORS = [
     "//div[@role='article']",
     "//a[contains(@href, '/maps/place/')]"
 ]
+
+# Yukarıdaki listeler öncelik sırasıdır; çalışırken sürekli ıskalayan selector
+# yedeklerin arkasına alınır (utils.selector_stats). İstatistikler bu dosyada tutulur.
+SELECTOR_STATS_PATH = os.environ.get("SELECTOR_STATS_PATH", os.path.join(PROJECT_DIR, "selector_stats.json"))
+SELECTOR_DEMOTE_MISSES = 5  # Art arda bu kadar ıskalayan selector, eşleşen yedeğin arkasına alınır
+SELECTOR_REPROBE_INTERVAL = 20  # Arkaya alınan selector'lar bu kadar sıralamada bir yeniden denenir
+SELECTOR_STATS_SAVE_INTERVAL = 30  # Diske yazma aralığı (saniye)
+
+# ================== LEAN MOD ==================
+# chrome_driver_baslat(lean=True) iken CDP Network.setBlockedURLs ile engellenen
+# kaynaklar. Yorum metni için hiçbiri gerekli değil.
+LEAN_BLOCKED_URLS = {
+    "image": [
+        "*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.ico*",
+        "*googleusercontent.com/*", "*gstatic.com/images/*"
+    ],
+    "font": ["*.woff*", "*.ttf*", "*.otf*", "*fonts.gstatic.com/*", "*fonts.googleapis.com/*"],
+    "tile": ["*/maps/vt?*", "*/maps/vt/*", "*khms*.google.com/*", "*/kh/v=*", "*streetviewpixels*"],
+    "media": ["*.mp4*", "*.webm*", "*.m3u8*"]
+}
+# Engellenen isteklerin yaklaşık boyutu (bayt); tasarruf raporu bu değerlerle tahmin edilir.
+# Engellenen istek hiç gönderilmediği için gerçek boyutu ölçülemez, kendi ölçümünüzle güncelleyin.
+LEAN_AVG_BYTES = {
+    "image": 20000,
+    "font": 40000,
+    "tile": 15000,
+    "media": 500000
+}
+
+# ================== AĞ YAKALAMA ==================
+# Yorumlar panelinin arka planda çağırdığı review RPC'leri ve yanıt içindeki
+# alan yolları (index listesi). Google yapıyı değiştirirse burası güncellenir.
+# Yolu bilinmeyen alanlar None: likes için 0 döner, review_id yoksa yorum anahtarı imzadan üretilir.
+REVIEW_RPC_FORMATS = {
+    "listugcposts": {
+        "url": "/maps/rpc/listugcposts",
+        "list": [2],
+        "item": [0],
+        "username": [1, 4, 5, 0],
+        "date": [1, 6],
+        "rating": [2, 0, 0],
+        "text": [2, 15, 0, 0],
+        "likes": None,
+        "review_id": [0]
+    },
+    "listentitiesreviews": {
+        "url": "/maps/preview/review/listentitiesreviews",
+        "list": [2],
+        "item": [],
+        "username": [0, 1],
+        "date": [1],
+        "rating": [4],
+        "text": [3],
+        "likes": None,
+        "review_id": [10]
+    }
+}
@@ -3,14 +3,65 @@
 Veritabanı işlemleri modülü.
 MySQL bağlantısı ve CRUD operasyonları.
 """
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 import mysql.connector
-from mysql.connector import Error
-from .config import DB_CONFIG
+from mysql.connector import Error, pooling
+from mysql.connector.errors import PoolError
+from .config import (
+    DB_CONFIG, DB_POOL_SIZE, DB_POOL_NAME, BUSINESS_CACHE_SIZE,
+    BULK_WRITE_CHUNK_SIZE, BULK_WRITE_COMMIT_CHUNKS
+)
+from .scrape_metrics import timed, count_metric
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# get_or_create_business önbelleği: (name, city, district) -> id, en eski kullanılan atılır
+_business_cache = OrderedDict()
+_business_cache_lock = threading.Lock()
+
+
+def _get_pool():
+    """Süreç genelindeki bağlantı havuzu (ilk çağrıda açılır)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = pooling.MySQLConnectionPool(
+                pool_name=DB_POOL_NAME,
+                pool_size=min(DB_POOL_SIZE, pooling.CNX_POOL_MAXSIZE),
+                pool_reset_session=True,
+                **DB_CONFIG
+            )
+        return _pool
+
+
+def _checkout():
+    """Havuzdan ping ile sağlığı doğrulanmış bir bağlantı alır."""
+    if DB_POOL_SIZE <= 0:
+        return mysql.connector.connect(**DB_CONFIG)
+    try:
+        conn = _get_pool().get_connection()
+    except PoolError:
+        # Havuz dolu (paralel worker, heartbeat, yazıcı thread'leri): beklemek yerine havuz dışı aç
+        return mysql.connector.connect(**DB_CONFIG)
+    try:
+        # Sunucu tarafında kapanmış (wait_timeout) bağlantıyı yeniden kurar
+        conn.ping(reconnect=True, attempts=2, delay=0)
+    except Error:
+        conn.close()
+        raise
+    return conn
 
 
 def get_db_connection(silent=False):
     """
-    Veritabanı bağlantısı kurar.
+    Veritabanı bağlantısı verir.
+    
+    Bağlantı paylaşılan havuzdan alınır; close() bağlantıyı kapatmak yerine
+    havuza geri bırakır, böylece bağlantı kurulumu her çağrıda tekrarlanmaz.
     
     Args:
         silent: True ise hata mesajı yazdırmaz (Streamlit için)
@@ -19,9 +70,10 @@ def get_db_connection(silent=False):
         MySQL connection veya None
     """
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
+        conn = _checkout()
         if conn.is_connected():
             return conn
+        conn.close()
         return None
     except Error as e:
         if not silent:
@@ -29,6 +81,23 @@ def get_db_connection(silent=False):
         return None
 
 
+@contextmanager
+def pooled_connection(silent=False):
+    """
+    get_db_connection'ın context manager hali; bağlantı blok sonunda havuza döner.
+    
+    Bağlantı kurulamazsa None verir:
+        with pooled_connection() as conn:
+            if conn: ...
+    """
+    conn = get_db_connection(silent)
+    try:
+        yield conn
+    finally:
+        if conn is not None:
+            conn.close()
+
+
 def connect_to_mysql():
     """MySQL veritabanına bağlanır (geriye uyumluluk için)."""
     conn = get_db_connection()
@@ -37,60 +106,325 @@ def connect_to_mysql():
     return conn
 
 
+def _cache_business(key, business_id):
+    with _business_cache_lock:
+        _business_cache[key] = business_id
+        _business_cache.move_to_end(key)
+        while len(_business_cache) > BUSINESS_CACHE_SIZE:
+            _business_cache.popitem(last=False)
+
+
+def _cached_business(key):
+    with _business_cache_lock:
+        business_id = _business_cache.get(key)
+        if business_id is not None:
+            _business_cache.move_to_end(key)
+        return business_id
+
+
+def clear_business_cache():
+    """İşletme ID önbelleğini boşaltır (işletmeler birleştirilir/silinirse)."""
+    with _business_cache_lock:
+        _business_cache.clear()
+
+
 def get_or_create_business(db_connection, business_name, city, district):
-    """İşletmeyi veritabanına ekler veya mevcutsa ID'sini döndürür."""
+    """
+    İşletmeyi veritabanına ekler veya mevcutsa ID'sini döndürür.
+    (name, city, district) tekil indeksi üzerinde tek bir upsert yapılır;
+    LAST_INSERT_ID(id) sayesinde mevcut satırın ID'si de lastrowid'den okunur,
+    eşzamanlı çağrılar kopya işletme oluşturamaz. Sonuç süreç içi LRU
+    önbellekte tutulur. Tekil indeks NULL içeren satırları kopya saymadığından
+    boş il/ilçe '' olarak yazılır.
+    """
+    key = (business_name, city or '', district or '')
+    business_id = _cached_business(key)
+    if business_id is not None:
+        return business_id
+    
     cursor = db_connection.cursor()
+    try:
+        cursor.execute(
+            "INSERT INTO businesses (name, city, district) VALUES (%s, %s, %s) "
+            "ON DUPLICATE KEY UPDATE id = LAST_INSERT_ID(id)",
+            key
+        )
+        db_connection.commit()
+        business_id = cursor.lastrowid
+        if cursor.rowcount == 1:
+            print(f"İşletme '{business_name}' veritabanına eklendi. Yeni ID: {business_id}")
+    except mysql.connector.Error as err:
+        print(f"İşletme veritabanına eklenirken hata: {err}")
+        db_connection.rollback()
+        return None
+    finally:
+        cursor.close()
     
-    sql = "SELECT id FROM businesses WHERE name = %s AND city = %s AND district = %s"
-    cursor.execute(sql, (business_name, city, district))
-    result = cursor.fetchone()
+    _cache_business(key, business_id)
+    return business_id
+
+
+# comments.review_key: yorumun 128 bit (MD5) anahtarı. Google yorum kimliği
+# (data-review-id) varsa ondan, yoksa (kullanıcı, puan, metin) imzasından üretilir;
+# (business_id, review_key) tekil indeksi kopyaları veritabanında engeller.
+# İmza anahtarının SQL karşılığı; signature_key ile birebir aynı baytları üretir.
+_SIGNATURE_KEY_SQL = (
+    "UNHEX(MD5(CONCAT_WS(CHAR(31 USING utf8mb4), 'sig', TRIM(COALESCE(username, '')),"
+    " COALESCE(CAST(rating AS SIGNED), ''), TRIM(COALESCE(comment_text, '')))))"
+)
+
+
+def signature_key(username, rating, text):
+    """(kullanıcı, puan, metin) imzasının review_key'i."""
+    parts = ['sig', (username or '').strip(' '), '' if rating is None else str(int(rating)), (text or '').strip(' ')]
+    return hashlib.md5('\x1f'.join(parts).encode('utf-8')).digest()
+
+
+def review_key(review):
+    """Ayrıştırılmış yorumun review_key'i (kimlik varsa kimlikten, yoksa imzadan)."""
+    if review.get('review_id'):
+        return hashlib.md5(f"id\x1f{review['review_id']}".encode('utf-8')).digest()
+    return signature_key(review['username'], review['rating'], review['text'])
+
+
+def _upgrade_signature_keys(cursor, upgrades):
+    """
+    Kimliği artık bilinen yorumların imza anahtarlı eski satırlarını kimlik
+    anahtarına taşır; aksi halde kimlikli ilk toplamada eski yorumlar kopyalanırdı.
+    """
+    by_business = {}
+    for business_id, old_key, new_key in upgrades:
+        by_business.setdefault(business_id, {}).setdefault(old_key, new_key)
     
-    if result:
-        print(f"İşletme '{business_name}' veritabanında bulundu. ID: {result[0]}")
-        return result[0]
-    else:
-        sql = "INSERT INTO businesses (name, city, district) VALUES (%s, %s, %s)"
-        try:
-            cursor.execute(sql, (business_name, city, district))
-            db_connection.commit()
-            business_id = cursor.lastrowid
-            print(f"İşletme '{business_name}' veritabanına eklendi. Yeni ID: {business_id}")
-            return business_id
-        except mysql.connector.Error as err:
-            print(f"İşletme veritabanına eklenirken hata: {err}")
-            db_connection.rollback()
-            return None
+    for business_id, mapping in by_business.items():
+        items = list(mapping.items())
+        for start in range(0, len(items), 1000):
+            chunk = items[start:start + 1000]
+            cursor.execute(
+                "UPDATE IGNORE comments SET review_key = CASE review_key "
+                + "WHEN %s THEN %s " * len(chunk)
+                + "END WHERE business_id = %s AND review_key IN (" + ", ".join(["%s"] * len(chunk)) + ")",
+                [v for pair in chunk for v in pair] + [business_id] + [old for old, _ in chunk]
+            )
 
 
 def save_comments_batch(db_connection, comments_to_insert):
-    """Yorumları toplu olarak veritabanına kaydeder."""
+    """
+    Yorumları toplu olarak veritabanına kaydeder.
+    
+    Kopyalar (business_id, review_key) tekil indeksiyle veritabanında atlanır;
+    önceden mevcut imzaları yüklemeye gerek yoktur.
+    
+    Args:
+        comments_to_insert: (business_id, username, rating, date, text, likes, review_id)
+            satırları; review_id None olabilir ya da hiç verilmeyebilir
+    
+    Returns:
+        int: Gerçekten eklenen (yeni) yorum sayısı
+    """
     if not comments_to_insert:
         return 0
     
+    rows, upgrades = [], []
+    for row in comments_to_insert:
+        business_id, username, rating, date, text, likes = row[:6]
+        review_id = row[6] if len(row) > 6 else None
+        key = review_key({'review_id': review_id, 'username': username, 'rating': rating, 'text': text})
+        if review_id:
+            upgrades.append((business_id, signature_key(username, rating, text), key))
+        rows.append((business_id, username, rating, date, text, likes, key))
+    
     cursor = db_connection.cursor()
     try:
-        sql = "INSERT INTO comments (business_id, username, rating, date, comment_text, likes) VALUES (%s, %s, %s, %s, %s, %s)"
-        cursor.executemany(sql, comments_to_insert)
-        db_connection.commit()
-        print(f"Batch insert tamamlandı: {len(comments_to_insert)} yorum veritabanına eklendi.")
-        return len(comments_to_insert)
+        # id = id değişiklik yapmaz; etkilenen satır sayısı sadece yeni eklenenleri sayar
+        sql = (
+            "INSERT INTO comments (business_id, username, rating, date, comment_text, likes, review_key) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s) ON DUPLICATE KEY UPDATE id = id"
+        )
+        with timed('db_save'):
+            if upgrades:
+                _upgrade_signature_keys(cursor, upgrades)
+            cursor.executemany(sql, rows)
+            inserted = cursor.rowcount
+            db_connection.commit()
+        count_metric('reviews_saved', inserted)
+        print(f"Batch insert tamamlandı: {inserted} yeni yorum eklendi, {len(rows) - inserted} zaten kayıtlı.")
+        return inserted
     except mysql.connector.Error as err:
         print(f"Batch insert hatası: {err}")
         db_connection.rollback()
         return 0
+    finally:
+        cursor.close()
 
 
-def get_existing_comment_signatures(db_connection, business_id):
-    """Mevcut yorumların imzalarını (username, rating, text) döndürür."""
-    cursor = db_connection.cursor()
-    sql = "SELECT username, rating, comment_text FROM comments WHERE business_id = %s"
-    cursor.execute(sql, (business_id,))
+def upsert_comments(db_connection, business_id, reviews):
+    """
+    Yeniden ayrıştırılan yorumları işletmenin mevcut yorumlarıyla birleştirir.
     
-    signatures = set()
-    for row in cursor.fetchall():
-        signatures.add((row[0], row[1], row[2]))
+    Aynı review_key'e sahip satır varsa yorum odur: metni boş ya da yeni
+    metnin kesik hali ise (eski parser "Devamını oku" öncesini yazmış) tarih,
+    metin ve beğeni güncellenir, metin zaten aynıysa atlanır. Anahtar
+    eşleşmezse aynı imza (username, rating, text) atlanır; aynı kullanıcı ve
+    puana sahip satırın metni yeni metnin kesik hali ise o satır güncellenir,
+    aksi halde eklenir. Bu yolda metni boş satırlar önek sayılmaz; aynı ad ve
+    puanlı başka bir yorumun üzerine yazılmasın diye yeni yorum eklenir.
     
-    return signatures
+    Returns:
+        tuple: (eklenen, güncellenen) yorum sayısı
+    """
+    cursor = db_connection.cursor()
+    try:
+        cursor.execute(
+            "SELECT id, username, rating, comment_text, review_key FROM comments WHERE business_id = %s",
+            (business_id,)
+        )
+        existing = {}
+        signatures = set()
+        by_key = {}
+        for comment_id, username, rating, text, key in cursor.fetchall():
+            rating = int(rating) if rating is not None else None
+            row = [comment_id, text or ""]
+            existing.setdefault((username, rating), []).append(row)
+            signatures.add((username, rating, text or ""))
+            if key is not None:
+                by_key[bytes(key)] = row
+        
+        to_insert, to_update = [], []
+        for review in reviews:
+            key = (review['username'], review['rating'])
+            new_key = review_key(review)
+            row = by_key.get(new_key)
+            if row is not None:
+                prefix = row[1].rstrip('… .')
+                if row[1] == review['text'] or (prefix and not review['text'].startswith(prefix)):
+                    continue
+            else:
+                if key + (review['text'],) in signatures:
+                    continue
+                row = next(
+                    (r for r in existing.get(key, [])
+                     if r[1].rstrip('… .') and review['text'].startswith(r[1].rstrip('… .'))),
+                    None
+                )
+            signatures.add(key + (review['text'],))
+            
+            if row is not None:
+                to_update.append((review['date'], review['text'], review['likes'], new_key, row[0]))
+                row[1] = review['text']
+                by_key[new_key] = row
+            else:
+                to_insert.append((
+                    business_id, review['username'], review['rating'],
+                    review['date'], review['text'], review['likes'], review_key(review)
+                ))
+        
+        inserted = 0
+        if to_insert:
+            cursor.executemany(
+                "INSERT INTO comments (business_id, username, rating, date, comment_text, likes, review_key) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s) ON DUPLICATE KEY UPDATE id = id",
+                to_insert
+            )
+            inserted = cursor.rowcount
+        if to_update:
+            # Anahtar da tam metne taşınır; anahtar başka satırda varsa IGNORE satırı atlar
+            cursor.executemany(
+                "UPDATE IGNORE comments SET date = %s, comment_text = %s, likes = %s, review_key = %s WHERE id = %s",
+                to_update
+            )
+        db_connection.commit()
+        return inserted, len(to_update)
+    except mysql.connector.Error as err:
+        print(f"Upsert hatası: {err}")
+        db_connection.rollback()
+        return 0, 0
+    finally:
+        cursor.close()
+
+
+def _chunks(rows, chunk_size):
+    """Yinelenebilir kaynağı chunk_size'lık listelere böler."""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def bulk_update(db_connection, table, columns, rows,
+                chunk_size=BULK_WRITE_CHUNK_SIZE, commit_every=BULK_WRITE_COMMIT_CHUNKS):
+    """
+    Satır başına UPDATE yerine set tabanlı toplu güncelleme.
+    rows: (id, değer1, değer2, ...) demetleri; değerler columns sırasındadır.
+    Üreteç de olabilir, parça parça tüketilir. Her parça geçici tabloya tek
+    çok satırlı INSERT ile yazılır ve tek UPDATE ... JOIN ile uygulanır;
+    commit_every parçada bir commit edilir. Yazılan satır sayısını döndürür.
+    """
+    staging = f"tmp_bulk_{table}"
+    column_list = ", ".join(columns)
+    placeholders = "(" + ", ".join(["%s"] * (len(columns) + 1)) + ")"
+    assignments = ", ".join(f"t.{column} = s.{column}" for column in columns)
+    
+    cursor = db_connection.cursor()
+    written = 0
+    try:
+        # Kolon tipleri hedef tablodan kopyalanır
+        cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {staging}")
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE {staging} (PRIMARY KEY (id)) "
+            f"SELECT id, {column_list} FROM {table} LIMIT 0"
+        )
+        for n, chunk in enumerate(_chunks(rows, chunk_size), start=1):
+            cursor.execute(f"DELETE FROM {staging}")
+            cursor.execute(
+                f"INSERT INTO {staging} (id, {column_list}) VALUES "
+                + ", ".join([placeholders] * len(chunk)),
+                [value for row in chunk for value in row]
+            )
+            cursor.execute(f"UPDATE {table} t JOIN {staging} s ON t.id = s.id SET {assignments}")
+            written += len(chunk)
+            if n % commit_every == 0:
+                db_connection.commit()
+        db_connection.commit()
+        return written
+    finally:
+        try:
+            cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {staging}")
+        except Error:
+            pass
+        cursor.close()
+
+
+def bulk_delete(db_connection, table, ids, chunk_size=BULK_WRITE_CHUNK_SIZE):
+    """ID listesindeki satırları parça başına tek DELETE ... IN ile siler."""
+    cursor = db_connection.cursor()
+    deleted = 0
+    try:
+        for chunk in _chunks(ids, chunk_size):
+            cursor.execute(
+                f"DELETE FROM {table} WHERE id IN ({', '.join(['%s'] * len(chunk))})",
+                chunk
+            )
+            deleted += cursor.rowcount
+        db_connection.commit()
+        return deleted
+    finally:
+        cursor.close()
+
+
+def get_existing_review_keys(db_connection, business_id):
+    """İşletmenin mevcut yorumlarının review_key kümesini (16 baytlık anahtarlar) döndürür."""
+    cursor = db_connection.cursor()
+    sql = "SELECT review_key FROM comments WHERE business_id = %s AND review_key IS NOT NULL"
+    with timed('db_save'):
+        cursor.execute(sql, (business_id,))
+        rows = cursor.fetchall()
+    cursor.close()
+    return {bytes(row[0]) for row in rows}
 
 
 def get_business_list(db_connection):
@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+"""
+Sürümlü şema geçişleri (migration).
+Her geçiş sırayla ve bir kez uygulanır; uygulanan sürümler schema_migrations
+tablosunda tutulur. MySQL'de DDL anında commit edildiği için her geçiş
+yarıda kesilip yeniden çalıştırılabilecek şekilde (kolon/indeks varsa
+atlayarak) yazılmıştır. Aynı anda başlayan süreçler GET_LOCK ile sıralanır.
+
+Kullanım:
+    python -m utils.migrate            # bekleyen geçişleri uygula
+    python -m utils.migrate --status   # uygulanan/bekleyen sürümleri göster
+"""
+import argparse
+from .db_utils import get_db_connection, _SIGNATURE_KEY_SQL
+from .scrape_metrics import PHASES, COUNTERS
+
+MIGRATION_LOCK = "gmaps_migrate"
+MIGRATION_LOCK_TIMEOUT = 60  # saniye
+
+# Keşifte kart üzerinden okunan, sonradan eklenmiş kolonlar
+DISCOVERY_COLUMNS = (
+    ('place_url', 'TEXT NULL'),
+    ('place_id', 'VARCHAR(64) NULL'),
+    ('rating', 'FLOAT NULL'),
+    ('review_count', 'INT NULL'),
+)
+
+# Kiralama (lease) protokolü kolonları
+LEASE_COLUMNS = (
+    ('worker_id', 'VARCHAR(255) NULL'),
+    ('lease_expires_at', 'DATETIME NULL'),
+    ('attempts', 'INT NOT NULL DEFAULT 0'),
+    ('next_attempt_at', 'DATETIME NULL'),
+)
+
+
+def _column_exists(cursor, table, column):
+    cursor.execute(f"SHOW COLUMNS FROM {table} LIKE %s", (column,))
+    return bool(cursor.fetchall())
+
+
+def _index_exists(cursor, table, index):
+    cursor.execute(f"SHOW INDEX FROM {table} WHERE Key_name = %s", (index,))
+    return bool(cursor.fetchall())
+
+
+def _add_index(cursor, table, index, definition):
+    """İndeks yoksa ekler."""
+    if not _index_exists(cursor, table, index):
+        print(f"  {table}.{index} oluşturuluyor...")
+        cursor.execute(f"ALTER TABLE {table} ADD {definition}")
+
+
+def _base_tables(cursor):
+    """businesses ve comments tabloları (README'deki kurulum şeması)."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS businesses (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            city VARCHAR(100),
+            district VARCHAR(100),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS comments (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            business_id INT NOT NULL,
+            username VARCHAR(255),
+            rating FLOAT,
+            date VARCHAR(100),
+            comment_text TEXT,
+            likes INT DEFAULT 0,
+            sentiment VARCHAR(50),
+            sentiment_score FLOAT NULL,
+            processed TINYINT(1) DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (business_id) REFERENCES businesses(id)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+    # auto_label.py'nin yazdığı skor kolonu eski kurulumlarda yok
+    if not _column_exists(cursor, 'comments', 'sentiment_score'):
+        cursor.execute("ALTER TABLE comments ADD COLUMN sentiment_score FLOAT NULL")
+
+
+def _pending_businesses(cursor):
+    """Toplu tarama iş kuyruğu (keşif ve kiralama kolonlarıyla)."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS pending_businesses (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            business_type VARCHAR(255) NOT NULL,
+            city VARCHAR(100) NOT NULL,
+            district VARCHAR(100) NOT NULL,
+            business_name VARCHAR(500) NOT NULL,
+            place_url TEXT NULL,
+            place_id VARCHAR(64) NULL,
+            rating FLOAT NULL,
+            review_count INT NULL,
+            worker_id VARCHAR(255) NULL,
+            lease_expires_at DATETIME NULL,
+            attempts INT NOT NULL DEFAULT 0,
+            next_attempt_at DATETIME NULL,
+            status ENUM('pending', 'processing', 'completed', 'failed') DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            processed_at TIMESTAMP NULL,
+            error_message TEXT NULL,
+            UNIQUE KEY unique_business (business_type, city, district, business_name),
+            KEY idx_claim (status, next_attempt_at)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+    
+    # Keşif ve kiralama kolonlarından önce oluşturulmuş tablolar için
+    for column, definition in DISCOVERY_COLUMNS + LEASE_COLUMNS:
+        if not _column_exists(cursor, 'pending_businesses', column):
+            cursor.execute(f"ALTER TABLE pending_businesses ADD COLUMN {column} {definition}")
+    _add_index(cursor, 'pending_businesses', 'idx_claim', "KEY idx_claim (status, next_attempt_at)")
+
+
+def _scrape_runs(cursor):
+    """
+    İşletme başına aşama süreleri tablosu. Kolonlar PHASES/COUNTERS'tan
+    üretilir; bunlara eklenen aşama için yeni bir geçiş ADD COLUMN yapmalıdır.
+    """
+    phase_columns = "".join(f"{phase}_s FLOAT NOT NULL DEFAULT 0,\n" for phase in PHASES)
+    counter_columns = "".join(f"{name} INT NOT NULL DEFAULT 0,\n" for name in COUNTERS)
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS scrape_runs (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            run_id VARCHAR(64) NULL,
+            worker_id VARCHAR(255) NULL,
+            pending_id INT NULL,
+            business_id INT NULL,
+            business_name VARCHAR(500) NULL,
+            mode VARCHAR(20) NULL,
+            status VARCHAR(20) NOT NULL,
+            {phase_columns}total_s FLOAT NOT NULL DEFAULT 0,
+            {counter_columns}driver_restarts INT NOT NULL DEFAULT 0,
+            error_message TEXT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            KEY idx_created (created_at)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+
+
+def _review_keys(cursor):
+    """
+    comments.review_key kolonu ve (business_id, review_key) tekil indeksi.
+    Mevcut satırların anahtarı imzadan üretilir; indeksten önce aynı
+    anahtarlı kopyalar silinir (en eski kayıt kalır). Metni önişlenmiş
+    satırların anahtarı ham metinle eşleşmez; yeniden toplanınca oluşan
+    kopyaları preprocess_comments.remove_duplicate_comments temizler.
+    """
+    if not _column_exists(cursor, 'comments', 'review_key'):
+        cursor.execute("ALTER TABLE comments ADD COLUMN review_key BINARY(16) NULL")
+    if _index_exists(cursor, 'comments', 'uniq_review_key'):
+        return
+    
+    print("  Yorum anahtarları oluşturuluyor...")
+    cursor.execute(f"UPDATE comments SET review_key = {_SIGNATURE_KEY_SQL} WHERE review_key IS NULL")
+    cursor.execute("""
+        DELETE c FROM comments c
+        JOIN comments k ON k.business_id = c.business_id AND k.review_key = c.review_key AND k.id < c.id
+    """)
+    if cursor.rowcount:
+        print(f"  {cursor.rowcount} kopya yorum silindi.")
+    cursor.execute("ALTER TABLE comments ADD UNIQUE KEY uniq_review_key (business_id, review_key)")
+
+
+def _merge_duplicate_businesses(cursor):
+    """
+    Aynı (name, city, district) ile birden fazla kez eklenmiş işletmeleri en
+    küçük ID'de birleştirir: yorumlar ve tarama kayıtları o ID'ye taşınır,
+    taşınırken kopya çıkan yorumlar silinir.
+    """
+    cursor.execute("""
+        CREATE TEMPORARY TABLE business_merge AS
+        SELECT b.id AS old_id, k.keep_id
+        FROM businesses b
+        JOIN (
+            SELECT MIN(id) AS keep_id, name, city, district
+            FROM businesses
+            GROUP BY name, city, district
+            HAVING COUNT(*) > 1
+        ) k ON b.name = k.name AND b.city <=> k.city AND b.district <=> k.district AND b.id <> k.keep_id
+    """)
+    try:
+        cursor.execute("SELECT COUNT(*) FROM business_merge")
+        duplicates = cursor.fetchone()[0]
+        if not duplicates:
+            return
+        print(f"  {duplicates} kopya işletme birleştiriliyor...")
+        cursor.execute("""
+            UPDATE IGNORE comments c JOIN business_merge m ON c.business_id = m.old_id
+            SET c.business_id = m.keep_id
+        """)
+        cursor.execute("DELETE c FROM comments c JOIN business_merge m ON c.business_id = m.old_id")
+        cursor.execute("""
+            UPDATE scrape_runs r JOIN business_merge m ON r.business_id = m.old_id
+            SET r.business_id = m.keep_id
+        """)
+        cursor.execute("DELETE b FROM businesses b JOIN business_merge m ON b.id = m.old_id")
+    finally:
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS business_merge")
+
+
+def _hot_path_indexes(cursor):
+    """
+    Sık çalışan sorguların indeksleri:
+    - businesses (name, city, district): get_or_create_business araması ve
+      app.py'deki b.name filtresi (soldaki önek); kopya işletmeyi de engeller.
+    - comments (business_id, rating, id): işletmenin yorumları, app.py'deki
+      ORDER BY c.rating DESC, c.id DESC sıralaması dosya sıralamasız okunur.
+    - comments (sentiment): auto_label.py/predict.py'nin
+      sentiment IS NULL OR sentiment = '' taraması tabloyu dolaşmaz.
+    """
+    if not _index_exists(cursor, 'businesses', 'uniq_business'):
+        # Tekil indeks NULL'ları eşit saymaz; boş il/ilçe '' yapılır ki kopyalar birleşsin
+        cursor.execute(
+            "UPDATE businesses SET city = COALESCE(city, ''), district = COALESCE(district, '') "
+            "WHERE city IS NULL OR district IS NULL"
+        )
+        _merge_duplicate_businesses(cursor)
+    _add_index(cursor, 'businesses', 'uniq_business', "UNIQUE KEY uniq_business (name, city, district)")
+    _add_index(cursor, 'comments', 'idx_comments_business_rating',
+               "KEY idx_comments_business_rating (business_id, rating, id)")
+    _add_index(cursor, 'comments', 'idx_comments_sentiment', "KEY idx_comments_sentiment (sentiment)")
+
+
+# (sürüm, ad, fonksiyon) — yalnızca sona eklenir, uygulanmış geçiş değiştirilmez
+MIGRATIONS = [
+    (1, 'base_tables', _base_tables),
+    (2, 'pending_businesses', _pending_businesses),
+    (3, 'scrape_runs', _scrape_runs),
+    (4, 'comment_review_keys', _review_keys),
+    (5, 'hot_path_indexes', _hot_path_indexes),
+]
+
+
+def _ensure_migrations_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+
+
+def applied_versions(db_connection):
+    """Uygulanmış sürümler: {sürüm: uygulanma zamanı}."""
+    cursor = db_connection.cursor()
+    try:
+        _ensure_migrations_table(cursor)
+        cursor.execute("SELECT version, applied_at FROM schema_migrations")
+        return dict(cursor.fetchall())
+    finally:
+        cursor.close()
+
+
+def run_migrations(db_connection):
+    """
+    Bekleyen geçişleri sırayla uygular ve uygulanan sürümleri döndürür.
+    Geçiş hata verirse sürümü kaydedilmez; sonraki çalıştırmada yeniden denenir.
+    """
+    cursor = db_connection.cursor()
+    try:
+        cursor.execute("SELECT GET_LOCK(%s, %s)", (MIGRATION_LOCK, MIGRATION_LOCK_TIMEOUT))
+        if cursor.fetchone()[0] != 1:
+            raise Exception("Şema geçiş kilidi alınamadı (başka bir süreç geçiş uyguluyor)")
+        try:
+            _ensure_migrations_table(cursor)
+            cursor.execute("SELECT version FROM schema_migrations")
+            done = {row[0] for row in cursor.fetchall()}
+            
+            applied = []
+            for version, name, migration in MIGRATIONS:
+                if version in done:
+                    continue
+                print(f"Şema geçişi {version:03d}_{name} uygulanıyor...")
+                migration(cursor)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                    (version, name)
+                )
+                db_connection.commit()
+                applied.append(version)
+            return applied
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (MIGRATION_LOCK,))
+            cursor.fetchall()
+    except Exception:
+        db_connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def print_migration_status(db_connection):
+    """Geçişlerin uygulanma durumunu basar."""
+    applied = applied_versions(db_connection)
+    for version, name, _ in MIGRATIONS:
+        state = applied[version].strftime('%Y-%m-%d %H:%M') if version in applied else 'bekliyor'
+        print(f"  {version:03d}_{name:<25} {state}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Veritabanı şema geçişleri')
+    parser.add_argument('--status', action='store_true', help='Uygulanan ve bekleyen geçişleri göster')
+    args = parser.parse_args()
+    
+    db_connection = get_db_connection()
+    if not db_connection:
+        print("Veritabanı bağlantısı kurulamadı!")
+        return
+    
+    try:
+        if args.status:
+            print_migration_status(db_connection)
+            return
+        applied = run_migrations(db_connection)
+        if applied:
+            print(f"{len(applied)} geçiş uygulandı.")
+        else:
+            print("Şema güncel.")
+    finally:
+        db_connection.close()
+
+
+if __name__ == "__main__":
+    main()
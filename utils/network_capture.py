@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Ağ trafiğinden yorum toplama modülü.
+Yorumlar panelinin arka planda çağırdığı review RPC yanıtlarını CDP
+performance log'larından okuyup parse_review ile aynı yapıya çevirir.
+
+Offline kontrol (örnek yanıt dosyası ile):
+    python -m utils.network_capture
+    python -m utils.network_capture kayitli_yanit.txt listugcposts
+Örnek yanıtın çözümü tests/test_network_capture.py ile doğrulanır.
+"""
+import os
+import sys
+import json
+import base64
+from .config import REVIEW_RPC_FORMATS
+from .browser_utils import read_performance_log
+
+XSSI_PREFIX = ")]}'"
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "listugcposts_sample.txt")
+
+
+def _dig(obj, path):
+    """İç içe listede verilen index yolunu izler, yol yoksa None döndürür."""
+    if path is None:
+        return None
+    for idx in path:
+        try:
+            obj = obj[idx]
+        except (IndexError, KeyError, TypeError):
+            return None
+    return obj
+
+
+def _format_for_url(url):
+    """URL'ye uyan RPC formatının adını döndürür."""
+    for name, fmt in REVIEW_RPC_FORMATS.items():
+        if fmt["url"] in url:
+            return name
+    return None
+
+
+def decode_review_payload(body, format_name):
+    """
+    Review RPC yanıt gövdesini yorum listesine çevirir.
+    
+    Args:
+        body: Ham yanıt metni (")]}'" öneki olabilir)
+        format_name: REVIEW_RPC_FORMATS anahtarı
+    
+    Returns:
+        parse_review ile aynı yapıda dict listesi
+    """
+    fmt = REVIEW_RPC_FORMATS[format_name]
+    text = body.strip()
+    if text.startswith(XSSI_PREFIX):
+        text = text[len(XSSI_PREFIX):]
+    
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return []
+    
+    reviews = []
+    for entry in _dig(data, fmt["list"]) or []:
+        review = _dig(entry, fmt["item"])
+        username = _dig(review, fmt["username"])
+        if not username:
+            continue
+        
+        rating = _dig(review, fmt["rating"])
+        likes = _dig(review, fmt["likes"])
+        review_id = _dig(review, fmt.get("review_id"))
+        reviews.append({
+            'username': str(username).strip(),
+            'rating': int(rating) if isinstance(rating, (int, float)) else None,
+            'date': _dig(review, fmt["date"]),
+            'text': (_dig(review, fmt["text"]) or "").strip(),
+            'likes': int(likes) if isinstance(likes, (int, float)) else 0,
+            'review_id': review_id if isinstance(review_id, str) else None
+        })
+    return reviews
+
+
+def read_review_responses(driver, pending):
+    """
+    Performance log'larını boşaltır ve tamamlanan review RPC yanıtlarını çözer.
+    
+    Args:
+        driver: chrome_driver_baslat(network_capture=True) ile açılmış driver
+        pending: Yanıtı gelmiş ama yüklemesi bitmemiş istekler (requestId -> format),
+            çağrılar arasında korunur
+    
+    Returns:
+        Yeni yakalanan yorumların listesi
+    """
+    reviews = []
+    for message in read_performance_log(driver):
+        method = message.get('method')
+        params = message.get('params', {})
+        
+        if method == 'Network.responseReceived':
+            format_name = _format_for_url(params.get('response', {}).get('url', ''))
+            if format_name:
+                pending[params['requestId']] = format_name
+        
+        elif method == 'Network.loadingFinished' and params.get('requestId') in pending:
+            format_name = pending.pop(params['requestId'])
+            try:
+                result = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': params['requestId']})
+            except Exception:
+                continue
+            body = result.get('body', '')
+            if result.get('base64Encoded'):
+                body = base64.b64decode(body).decode('utf-8', errors='replace')
+            reviews.extend(decode_review_payload(body, format_name))
+    
+    return reviews
+
+
+def network_harvester():
+    """yorumlari_yukle için ağ yanıtlarından yorum toplayan harvester döndürür."""
+    pending = {}
+    
+    def harvest(driver):
+        return read_review_responses(driver, pending)
+    
+    return harvest
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else FIXTURE_PATH
+    format_name = sys.argv[2] if len(sys.argv) > 2 else "listugcposts"
+    with open(path, encoding="utf-8") as f:
+        decoded = decode_review_payload(f.read(), format_name)
+    
+    print(f"{len(decoded)} yorum çözüldü ({format_name}):")
+    for review in decoded:
+        print(f"  {review}")
@@ -5,20 +5,23 @@ Yorum elementlerinden veri çıkarma fonksiyonları.
 """
 import re
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import NoSuchElementException
-from .config import USERNAME_SELECTORS, COMMENT_TEXT_SELECTORS
+from selenium.common.exceptions import NoSuchElementException, WebDriverException
+from .config import REVIEW_SELECTORS, USERNAME_SELECTORS, COMMENT_TEXT_SELECTORS
+from .selector_stats import ordered_selectors, record_selector_hit, record_selector_hits
 
 
 def get_username(yorum_elem):
     """Yorum elementinden kullanıcı adını çeker."""
-    for selector in USERNAME_SELECTORS:
+    missed = []
+    for selector in ordered_selectors('username', USERNAME_SELECTORS):
         try:
             elem = yorum_elem.find_element(By.XPATH, selector)
             text = elem.text.strip()
             if text and len(text) > 0:
+                record_selector_hit('username', selector, missed)
                 return text
         except NoSuchElementException:
-            continue
+            missed.append(selector)
     return None
 
 
@@ -70,14 +73,16 @@ def get_date(yorum_elem):
 
 def get_comment_text(yorum_elem):
     """Yorum elementinden yorum metnini çeker."""
-    for selector in COMMENT_TEXT_SELECTORS:
+    missed = []
+    for selector in ordered_selectors('comment_text', COMMENT_TEXT_SELECTORS):
         try:
             elem = yorum_elem.find_element(By.XPATH, selector)
             text = elem.text.strip()
             if text and len(text) > 10:
+                record_selector_hit('comment_text', selector, missed)
                 return text
         except NoSuchElementException:
-            continue
+            missed.append(selector)
     
     try:
         full_text = yorum_elem.text.strip()
@@ -108,6 +113,20 @@ def get_likes(yorum_elem):
     return 0
 
 
+def get_review_id(yorum_elem):
+    """Yorumun Google tarafındaki kimliğini (data-review-id) döndürür, yoksa None."""
+    try:
+        review_id = yorum_elem.get_attribute("data-review-id")
+        if review_id:
+            return review_id
+        nodes = yorum_elem.find_elements(By.XPATH, ".//*[@data-review-id]")
+        if nodes:
+            return nodes[0].get_attribute("data-review-id") or None
+    except Exception:
+        pass
+    return None
+
+
 def parse_review(yorum_elem):
     """Yorum elementini ayrıştırır ve tüm verileri döndürür."""
     username = get_username(yorum_elem)
@@ -119,5 +138,281 @@ def parse_review(yorum_elem):
         'rating': get_rating(yorum_elem),
         'date': get_date(yorum_elem),
         'text': get_comment_text(yorum_elem),
-        'likes': get_likes(yorum_elem)
+        'likes': get_likes(yorum_elem),
+        'review_id': get_review_id(yorum_elem)
+    }
+
+
+# Tek execute_script ile tüm yorumları ayrıştıran sayfa içi rutin.
+# Alan kuralları yukarıdaki get_* fonksiyonlarıyla birebir aynıdır;
+# hangi selector'ın kazandığı selector istatistikleri için ayrıca döner.
+_BULK_EXTRACT_JS = """
+const reviewSelectors = arguments[0];
+const usernameSelectors = arguments[1];
+const textSelectors = arguments[2];
+const collapse = arguments[3];
+const hits = {review: null, username: {}, text: {}};
+const misses = {review: [], username: {}, text: {}};
+
+function first(ctx, xp) {
+    try {
+        return document.evaluate(xp, ctx, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    } catch (e) { return null; }
+}
+function all(ctx, xp) {
+    const out = [];
+    try {
+        const r = document.evaluate(xp, ctx, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (let i = 0; i < r.snapshotLength; i++) out.push(r.snapshotItem(i));
+    } catch (e) {}
+    return out;
+}
+function txt(el) { return el ? (el.innerText || el.textContent || '').trim() : ''; }
+function num(s) { const m = /(\\d+)/.exec(s || ''); return m ? parseInt(m[1], 10) : null; }
+function hit(counts, xp) { counts[xp] = (counts[xp] || 0) + 1; }
+
+function username(el) {
+    for (const xp of usernameSelectors) {
+        const node = first(el, xp);
+        if (!node) { hit(misses.username, xp); continue; }
+        const t = txt(node);
+        if (t) { hit(hits.username, xp); return t; }
+    }
+    return null;
+}
+function rating(el) {
+    const stars = all(el, ".//*[contains(@aria-label, 'yıldız') or contains(@aria-label, 'star') or contains(@aria-label, '★')]");
+    for (const s of stars) {
+        const n = num(s.getAttribute('aria-label'));
+        if (n !== null) return n;
+    }
+    const icons = all(el, ".//span[contains(@class, 'hCCjke')]//span");
+    return icons.length ? icons.length : null;
+}
+function date(el) {
+    const words = ['gün', 'hafta', 'ay', 'yıl', 'önce'];
+    const byText = all(el, ".//*[contains(text(), 'önce') or contains(text(), 'gün') or contains(text(), 'hafta') or contains(text(), 'ay') or contains(text(), 'yıl')]");
+    for (const d of byText) {
+        const t = txt(d);
+        if (t && words.some(w => t.toLocaleLowerCase('tr').includes(w))) return t;
+    }
+    const byAria = all(el, ".//*[contains(@aria-label, 'önce') or contains(@aria-label, 'gün')]");
+    for (const d of byAria) {
+        const a = d.getAttribute('aria-label');
+        if (a) return a;
     }
+    return null;
+}
+function commentText(el) {
+    for (const xp of textSelectors) {
+        const node = first(el, xp);
+        if (!node) { hit(misses.text, xp); continue; }
+        const t = txt(node);
+        if (t && t.length > 10) { hit(hits.text, xp); return t; }
+    }
+    const lines = txt(el).split('\\n');
+    if (lines.length > 2) {
+        const rest = lines.slice(2).join('\\n');
+        if (rest.length > 10) return rest;
+    }
+    return '';
+}
+function likes(el) {
+    const nodes = all(el, ".//*[contains(@aria-label, 'Beğenildi') or contains(@aria-label, 'liked')]");
+    for (const n of nodes) {
+        const v = num(n.getAttribute('aria-label'));
+        if (v !== null) return v;
+    }
+    return 0;
+}
+function reviewId(el) {
+    const n = el.hasAttribute('data-review-id') ? el : el.querySelector('[data-review-id]');
+    return n ? n.getAttribute('data-review-id') : null;
+}
+
+let nodes = [];
+for (const xp of reviewSelectors) {
+    nodes = all(document, xp);
+    if (nodes.length) { hits.review = xp; break; }
+    misses.review.push(xp);
+}
+
+const reviews = [];
+for (const el of nodes) {
+    if (el.hasAttribute('data-gca-done')) continue;
+    const user = username(el);
+    if (!user) continue;
+    reviews.push({
+        username: user,
+        rating: rating(el),
+        date: date(el),
+        text: commentText(el),
+        likes: likes(el),
+        review_id: reviewId(el)
+    });
+    if (collapse) {
+        // Node'u silmek yerine boşalt: liste sayacı ve Maps'in sayfalaması bozulmasın
+        el.setAttribute('data-gca-done', '1');
+        el.replaceChildren();
+    }
+}
+return {reviews: reviews, hits: hits, misses: misses};
+"""
+
+
+def parse_reviews_bulk(driver, collapse=False):
+    """
+    Sayfadaki tüm yorumları tek bir execute_script çağrısıyla ayrıştırır.
+    
+    Args:
+        driver: Selenium WebDriver
+        collapse: True ise ayrıştırılan yorum node'ları DOM'da boşaltılır ve
+            sonraki çağrılarda atlanır (streaming mod için)
+    
+    Returns:
+        parse_review ile aynı yapıda dict listesi, script hatasında None
+    """
+    try:
+        result = driver.execute_script(
+            _BULK_EXTRACT_JS,
+            ordered_selectors('review', REVIEW_SELECTORS),
+            ordered_selectors('username', USERNAME_SELECTORS),
+            ordered_selectors('comment_text', COMMENT_TEXT_SELECTORS),
+            collapse
+        )
+    except WebDriverException as e:
+        print(f"Toplu ayrıştırma hatası: {e}")
+        return None
+    
+    hits, misses = result['hits'], result['misses']
+    if hits['review']:
+        record_selector_hit('review', hits['review'], misses['review'])
+    record_selector_hits('username', hits['username'], misses['username'])
+    record_selector_hits('comment_text', hits['text'], misses['text'])
+    return result['reviews']
+
+
+# ================== OFFLINE (lxml) AYRIŞTIRMA ==================
+_BLOCK_TAGS = {'div', 'p', 'li', 'ul', 'ol', 'tr', 'table', 'section', 'article', 'h1', 'h2', 'h3', 'h4'}
+_DATE_WORDS = ['gün', 'hafta', 'ay', 'yıl', 'önce']
+
+
+def _html_text(elem):
+    """lxml elementinin metnini tarayıcıdaki .text'e yakın şekilde (satır sonlarıyla) döndürür."""
+    parts = []
+    
+    def walk(node):
+        if not isinstance(node.tag, str) or node.tag in ('script', 'style'):
+            return
+        if node.tag == 'br':
+            parts.append('\n')
+        if node.text:
+            parts.append(node.text)
+        for child in node:
+            walk(child)
+            if child.tail:
+                parts.append(child.tail)
+        if node.tag in _BLOCK_TAGS:
+            parts.append('\n')
+    
+    walk(elem)
+    lines = [re.sub(r'\s+', ' ', line).strip() for line in ''.join(parts).split('\n')]
+    return '\n'.join(line for line in lines if line)
+
+
+def _html_first(elem, selector):
+    matches = elem.xpath(selector)
+    return matches[0] if matches else None
+
+
+def _html_review(elem):
+    """Tek yorum elementini parse_review ile aynı kurallarla ayrıştırır."""
+    username = None
+    for selector in USERNAME_SELECTORS:
+        node = _html_first(elem, selector)
+        text = _html_text(node) if node is not None else ''
+        if text:
+            username = text
+            break
+    if not username:
+        return None
+    
+    rating = None
+    for node in elem.xpath(".//*[contains(@aria-label, 'yıldız') or contains(@aria-label, 'star') or contains(@aria-label, '★')]"):
+        match = re.search(r'(\d+)', node.get('aria-label') or '')
+        if match:
+            rating = int(match.group(1))
+            break
+    if rating is None:
+        star_icons = elem.xpath(".//span[contains(@class, 'hCCjke')]//span")
+        rating = len(star_icons) if star_icons else None
+    
+    date = None
+    for node in elem.xpath(".//*[contains(text(), 'önce') or contains(text(), 'gün') or contains(text(), 'hafta') or contains(text(), 'ay') or contains(text(), 'yıl')]"):
+        text = _html_text(node)
+        if text and any(word in text.lower() for word in _DATE_WORDS):
+            date = text
+            break
+    if date is None:
+        for node in elem.xpath(".//*[contains(@aria-label, 'önce') or contains(@aria-label, 'gün')]"):
+            if node.get('aria-label'):
+                date = node.get('aria-label')
+                break
+    
+    comment_text = ""
+    for selector in COMMENT_TEXT_SELECTORS:
+        node = _html_first(elem, selector)
+        text = _html_text(node) if node is not None else ''
+        if text and len(text) > 10:
+            comment_text = text
+            break
+    else:
+        lines = _html_text(elem).split('\n')
+        if len(lines) > 2 and len('\n'.join(lines[2:])) > 10:
+            comment_text = '\n'.join(lines[2:])
+    
+    likes = 0
+    for node in elem.xpath(".//*[contains(@aria-label, 'Beğenildi') or contains(@aria-label, 'liked')]"):
+        match = re.search(r'(\d+)', node.get('aria-label') or '')
+        if match:
+            likes = int(match.group(1))
+            break
+    
+    review_ids = [elem.get('data-review-id')] if elem.get('data-review-id') else elem.xpath(".//@data-review-id")
+    
+    return {
+        'username': username,
+        'rating': rating,
+        'date': date,
+        'text': comment_text,
+        'likes': likes,
+        'review_id': str(review_ids[0]) if review_ids else None
+    }
+
+
+def parse_reviews_html(html):
+    """
+    Yorum panelinin outerHTML anlık görüntüsünü tarayıcı olmadan (lxml ile) ayrıştırır.
+    
+    Aynı XPath listelerini (REVIEW/USERNAME/COMMENT_TEXT_SELECTORS) kullanır;
+    saf bir fonksiyon olduğu için worker thread'de çalıştırılabilir.
+    
+    Returns:
+        parse_review ile aynı yapıda dict listesi
+    """
+    from lxml import html as lxml_html
+    
+    root = lxml_html.fromstring(html)
+    elements = []
+    for selector in REVIEW_SELECTORS:
+        elements = root.xpath(selector)
+        if elements:
+            break
+    
+    reviews = []
+    for elem in elements:
+        review_data = _html_review(elem)
+        if review_data:
+            reviews.append(review_data)
+    return reviews
+
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+İşletme başına tarama metrikleri.
+Her işletme için aşama süreleri (arama, consent, yorumlar sekmesi, scroll,
+genişletme, ayrıştırma, DB kaydı) ve sayaçlar (yorum, scroll, selector
+ıskalama) thread'e bağlı bir kayıtta toplanır; toplama bitince scrape_runs
+tablosuna tek satır olarak yazılır. Aktif kayıt yoksa ölçümler yok sayılır.
+
+Aşama süreleri iç içe ölçümlerde dışlayıcıdır: scroll sırasında yapılan
+genişletme süresi scroll'a değil expand'e yazılır.
+"""
+import math
+import time
+import threading
+from contextlib import contextmanager
+
+# scrape_runs kolon sırasıyla aşamalar ve sayaçlar
+PHASES = ('search', 'consent', 'reviews_tab', 'scroll', 'expand', 'parse', 'db_save')
+COUNTERS = ('reviews_found', 'reviews_saved', 'scroll_iterations', 'selector_misses')
+
+_local = threading.local()
+
+
+def new_metrics():
+    """Boş metrik kaydı."""
+    return {
+        'phases': dict.fromkeys(PHASES, 0.0),
+        'counters': dict.fromkeys(COUNTERS, 0),
+        'started': time.time(),
+    }
+
+
+def start_metrics():
+    """Yeni bir kayıt oluşturup bu thread'e bağlar ve döndürür."""
+    _local.metrics = new_metrics()
+    _local.stack = []
+    return _local.metrics
+
+
+def current_metrics():
+    """Bu thread'e bağlı kayıt (yoksa None)."""
+    return getattr(_local, 'metrics', None)
+
+
+@contextmanager
+def use_metrics(metrics):
+    """Kaydı blok boyunca bu thread'e bağlar (ör. boru hattı yazıcısında)."""
+    previous = current_metrics(), getattr(_local, 'stack', [])
+    _local.metrics, _local.stack = metrics, []
+    try:
+        yield metrics
+    finally:
+        _local.metrics, _local.stack = previous
+
+
+def add_phase_time(phase, seconds):
+    """Aşamaya süre ekler."""
+    metrics = current_metrics()
+    if metrics is not None:
+        metrics['phases'][phase] += seconds
+
+
+@contextmanager
+def timed(phase):
+    """Bloğun süresini aşamaya yazar; iç içe ölçülen aşamaların süresi düşülür."""
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    stack.append(0.0)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        nested = stack.pop()
+        if stack:
+            stack[-1] += elapsed
+        add_phase_time(phase, elapsed - nested)
+
+
+def count_metric(name, n=1):
+    """Sayaca ekler."""
+    metrics = current_metrics()
+    if metrics is not None:
+        metrics['counters'][name] += n
+
+
+def save_scrape_run(db_connection, metrics, status, business_name=None, business_id=None,
+                    pending_id=None, mode=None, worker_id=None, run_id=None,
+                    driver_restarts=0, error=None):
+    """İşletmenin metrik kaydını scrape_runs tablosuna tek satır olarak yazar."""
+    phases = metrics['phases']
+    counters = metrics['counters']
+    columns = (
+        ['run_id', 'worker_id', 'pending_id', 'business_id', 'business_name', 'mode', 'status']
+        + [f"{phase}_s" for phase in PHASES] + ['total_s']
+        + list(COUNTERS) + ['driver_restarts', 'error_message']
+    )
+    values = (
+        [run_id, worker_id, pending_id, business_id, business_name, mode, status]
+        + [round(phases[phase], 3) for phase in PHASES] + [round(time.time() - metrics['started'], 3)]
+        + [counters[name] for name in COUNTERS] + [driver_restarts, error]
+    )
+    cursor = db_connection.cursor()
+    try:
+        cursor.execute(
+            f"INSERT INTO scrape_runs ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})",
+            values
+        )
+        db_connection.commit()
+    except Exception as e:
+        print(f"  ! Tarama metrikleri kaydedilemedi: {e}")
+    finally:
+        cursor.close()
+
+
+def _percentile(sorted_values, p):
+    """Sıralı listede en yakın sıra yöntemiyle p. yüzdelik."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def print_scrape_report(db_connection, days=None):
+    """scrape_runs satırlarından aşama başına p50/p95 raporunu basar."""
+    metric_columns = [f"{phase}_s" for phase in PHASES] + ['total_s'] + list(COUNTERS)
+    where = "WHERE created_at >= NOW() - INTERVAL %s DAY" if days else ""
+    cursor = db_connection.cursor()
+    cursor.execute(
+        f"SELECT mode, status, driver_restarts, {', '.join(metric_columns)} FROM scrape_runs {where}",
+        (days,) if days else ()
+    )
+    rows = cursor.fetchall()
+    cursor.close()
+    
+    if not rows:
+        print("scrape_runs tablosunda kayıt yok.")
+        return
+    
+    by_mode = {}
+    for row in rows:
+        by_mode.setdefault(row[0] or '-', []).append(row)
+    
+    for mode, mode_rows in sorted(by_mode.items()):
+        completed = sum(1 for row in mode_rows if row[1] == 'completed')
+        print("\n" + "=" * 60)
+        print(f"MOD: {mode} | işletme: {len(mode_rows)} | başarılı: {completed}"
+              f" | tarayıcı yenileme (son): {max(row[2] for row in mode_rows)}")
+        print("=" * 60)
+        print(f"{'metrik':<20}{'p50':>10}{'p95':>10}{'toplam':>12}")
+        print("-" * 52)
+        for offset, column in enumerate(metric_columns, start=3):
+            values = sorted(float(row[offset] or 0) for row in mode_rows)
+            unit = 's' if column.endswith('_s') else ''
+            print(f"{column:<20}{_percentile(values, 50):>9.2f}{unit or ' '}"
+                  f"{_percentile(values, 95):>9.2f}{unit or ' '}{sum(values):>11.1f}{unit or ' '}")
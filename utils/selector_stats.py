@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Adaptif selector sıralaması.
+Her alan (username, comment_text, review, search_result) için config'deki
+sıra esastır. Bir selector yalnızca art arda SELECTOR_DEMOTE_MISSES kez
+eşleşmeyip yerine yedek bir selector eşleşince listenin sonuna düşürülür;
+isabet almak tek başına bir yedeği öne geçirmez (geniş yedekler her sayfada
+eşleşir). Düşürülen selector'lar her SELECTOR_REPROBE_INTERVAL sıralamada
+bir config sırasıyla yeniden denenir ve eşleşirlerse yerlerine döner.
+İstatistikler SELECTOR_STATS_PATH dosyasında çalıştırmalar arasında korunur.
+"""
+import os
+import json
+import time
+import atexit
+import threading
+from .config import (
+    SELECTOR_STATS_PATH,
+    SELECTOR_DEMOTE_MISSES,
+    SELECTOR_REPROBE_INTERVAL,
+    SELECTOR_STATS_SAVE_INTERVAL
+)
+from .scrape_metrics import count_metric
+
+_lock = threading.Lock()
+_scores = None
+_calls = {}
+_dirty = False
+_last_save = 0.0
+
+
+def _load():
+    """İstatistikleri ilk kullanımda dosyadan okur (lock altında çağrılır)."""
+    global _scores
+    if _scores is None:
+        try:
+            with open(SELECTOR_STATS_PATH, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        # Eski sürümün {selector: skor} kayıtları yok sayılır
+        _scores = {
+            field: {s: v for s, v in stats.items() if isinstance(v, dict)}
+            for field, stats in data.items() if isinstance(stats, dict)
+        }
+    return _scores
+
+
+def _save():
+    """İstatistikleri dosyaya yazar (lock altında çağrılır)."""
+    global _dirty, _last_save
+    if not _dirty:
+        return
+    tmp_path = f"{SELECTOR_STATS_PATH}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(_scores, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, SELECTOR_STATS_PATH)
+    except OSError as e:
+        print(f"Selector istatistikleri kaydedilemedi: {e}")
+    _dirty = False
+    _last_save = time.time()
+
+
+def _demoted(stats, selector):
+    return stats.get(selector, {}).get('misses', 0) >= SELECTOR_DEMOTE_MISSES
+
+
+def ordered_selectors(field, selectors, probe=True):
+    """
+    Selector listesini config sırasıyla, düşürülenler sona alınmış olarak döndürür.
+    
+    probe=True ise her SELECTOR_REPROBE_INTERVAL çağrıda bir config sırası
+    olduğu gibi döner ki düşürülen selector yeniden denensin. Sonucu yalnızca
+    sayım için kullanan (denemeyen) çağrılar probe=False vermelidir.
+    """
+    with _lock:
+        stats = _load().get(field, {})
+        demoted = [s for s in selectors if _demoted(stats, s)]
+        if not demoted:
+            return list(selectors)
+        if probe:
+            _calls[field] = _calls.get(field, 0) + 1
+            if _calls[field] % SELECTOR_REPROBE_INTERVAL == 0:
+                return list(selectors)
+        return [s for s in selectors if s not in demoted] + demoted
+
+
+def record_selector_hits(field, hits, misses=None):
+    """
+    Alan için eşleşen ve eşleşmeyen selector'ları kaydeder.
+    
+    Args:
+        field: Alan adı ('username', 'comment_text', 'review', 'search_result')
+        hits: selector -> isabet sayısı
+        misses: selector -> denenip eşleşmeme sayısı. Yalnızca aynı çağrıda
+            bir isabet varsa sayılır (sayfa henüz yüklenmemişse hepsi ıskalar).
+    """
+    global _dirty
+    if not sum(hits.values()):
+        return
+    misses = {s: n for s, n in (misses or {}).items() if n and s not in hits}
+    
+    with _lock:
+        stats = _load().setdefault(field, {})
+        for selector, count in misses.items():
+            entry = stats.setdefault(selector, {'hits': 0, 'misses': 0})
+            was_demoted = _demoted(stats, selector)
+            entry['misses'] += count
+            if not was_demoted and _demoted(stats, selector):
+                print(f"[selector] {field}: '{selector}' art arda {entry['misses']} kez eşleşmedi, yedeklerin arkasına alındı.")
+        for selector, count in hits.items():
+            entry = stats.setdefault(selector, {'hits': 0, 'misses': 0})
+            if _demoted(stats, selector):
+                print(f"[selector] {field}: '{selector}' yeniden eşleşti, config sırasına döndü.")
+            entry['hits'] += count
+            entry['misses'] = 0
+        
+        _dirty = True
+        if time.time() - _last_save > SELECTOR_STATS_SAVE_INTERVAL:
+            _save()
+    
+    # Öndeki selector'ın tutmayıp yedeğe düşülen denemeler
+    count_metric('selector_misses', sum(misses.values()))
+
+
+def record_selector_hit(field, selector, missed=()):
+    """Tek bir isabeti, ondan önce denenip eşleşmeyen selector'larla birlikte kaydeder."""
+    record_selector_hits(field, {selector: 1}, dict.fromkeys(missed, 1))
+
+
+def save_selector_stats():
+    """Bekleyen istatistikleri hemen diske yazar."""
+    with _lock:
+        if _scores is not None:
+            _save()
+
+
+atexit.register(save_selector_stats)
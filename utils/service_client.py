@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Scraper servisi istemcisi.
+scraper_service.py'ye iş gönderme ve iş durumunu sorgulama fonksiyonları.
+"""
+import json
+import urllib.request
+import urllib.error
+from .config import SCRAPER_SERVICE_HOST, SCRAPER_SERVICE_PORT
+
+SERVICE_URL = f"http://{SCRAPER_SERVICE_HOST}:{SCRAPER_SERVICE_PORT}"
+
+
+def _request(method, path, payload=None, timeout=5):
+    """Servise JSON isteği atar ve yanıtı döndürür."""
+    data = json.dumps(payload).encode('utf-8') if payload is not None else None
+    req = urllib.request.Request(
+        SERVICE_URL + path,
+        data=data,
+        method=method,
+        headers={'Content-Type': 'application/json'}
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return json.loads(resp.read().decode('utf-8'))
+    except urllib.error.HTTPError as e:
+        body = json.loads(e.read().decode('utf-8') or '{}')
+        raise RuntimeError(body.get('error', str(e)))
+
+
+def is_service_running():
+    """Servis ayakta mı kontrol eder."""
+    try:
+        return _request('GET', '/health', timeout=2).get('status') == 'ok'
+    except (OSError, ValueError, RuntimeError):
+        return False
+
+
+def submit_job(job_type, **params):
+    """
+    Servise yeni iş gönderir.
+    
+    Args:
+        job_type: 'discover', 'collect' veya 'retry_failed'
+        **params: İşe özel parametreler (query, limit, mode)
+    
+    Returns:
+        dict: İş özeti (id, status, ...)
+    """
+    return _request('POST', '/jobs', dict(params, type=job_type))
+
+
+def get_job(job_id):
+    """İşin durumunu, sonucunu ve log çıktısını döndürür."""
+    return _request('GET', f'/jobs/{job_id}')
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Yorum paneli HTML anlık görüntü deposu.
+Sıkıştırılmış HTML'ler içerik hash'i ile saklanır (aynı içerik bir kez yazılır),
+her işletme/tarama çalışması için küçük bir referans dosyası tutulur. Parser
+düzeltildiğinde reparse_snapshots.py yeniden scraping yapmadan bu depoyu işler.
+
+Dizin yapısı:
+    SNAPSHOT_DIR/objects/ab/abcdef...html.gz    sha256 ile adreslenen içerik
+    SNAPSHOT_DIR/refs/<business_id>/<run_id>    içerik hash'i
+"""
+import os
+import gzip
+import time
+import hashlib
+from .config import SNAPSHOT_DIR
+
+_current_run_id = None
+
+
+def new_run_id():
+    """Tarama çalışması kimliği (zamana göre sıralanabilir)."""
+    return time.strftime('%Y%m%dT%H%M%S') + f"-{os.getpid()}"
+
+
+def current_run_id():
+    """Bu süreçteki tarama çalışmasının kimliği (ilk çağrıda oluşturulur)."""
+    global _current_run_id
+    if _current_run_id is None:
+        _current_run_id = new_run_id()
+    return _current_run_id
+
+
+def _object_path(digest):
+    return os.path.join(SNAPSHOT_DIR, 'objects', digest[:2], digest + '.html.gz')
+
+
+def save_snapshot(business_id, run_id, html):
+    """
+    HTML'i depoya yazar ve işletme/çalışma referansını kaydeder.
+    
+    Returns:
+        str: İçeriğin sha256 hash'i
+    """
+    data = html.encode('utf-8')
+    digest = hashlib.sha256(data).hexdigest()
+    
+    path = _object_path(digest)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    
+    ref_dir = os.path.join(SNAPSHOT_DIR, 'refs', str(business_id))
+    os.makedirs(ref_dir, exist_ok=True)
+    with open(os.path.join(ref_dir, run_id), 'w', encoding='utf-8') as f:
+        f.write(digest)
+    
+    print(f"HTML anlık görüntüsü kaydedildi: {digest[:12]} ({len(data) / 1024:.0f} KB)")
+    return digest
+
+
+def load_snapshot(digest):
+    """Hash'i verilen HTML'i döndürür."""
+    with gzip.open(_object_path(digest), 'rb') as f:
+        return f.read().decode('utf-8')
+
+
+def list_snapshots(business_ids=None, latest_only=True):
+    """
+    Depodaki anlık görüntüleri listeler.
+    
+    Args:
+        business_ids: Sadece bu işletmeler (None = hepsi)
+        latest_only: True ise her işletmenin sadece son çalışması
+    
+    Returns:
+        (business_id, run_id, digest) listesi
+    """
+    refs_root = os.path.join(SNAPSHOT_DIR, 'refs')
+    if not os.path.isdir(refs_root):
+        return []
+    
+    wanted = {str(b) for b in business_ids} if business_ids else None
+    snapshots = []
+    for business_dir in sorted(os.listdir(refs_root)):
+        if wanted is not None and business_dir not in wanted:
+            continue
+        run_ids = sorted(os.listdir(os.path.join(refs_root, business_dir)))
+        if latest_only:
+            run_ids = run_ids[-1:]
+        for run_id in run_ids:
+            with open(os.path.join(refs_root, business_dir, run_id), encoding='utf-8') as f:
+                snapshots.append((int(business_dir), run_id, f.read().strip()))
+    return snapshots